@@ -0,0 +1,68 @@
+"""
+Compares calculating the progress summary of every student in a cohort one object at a time
+(Student.get_progress_summary()) with calculating them all at once using NumPy (data_tables.batch_status).
+Checks that both give identical results. Requires NumPy.
+
+Run from the directory containing README.md with:
+    python -m benchmarks.bench_batch_status [-n NUM_STUDENTS [NUM_STUDENTS ...]]
+"""
+import argparse
+import datetime as dt
+import random
+import time
+
+from data_tables import SECTION_NAME_MAPPING, batch_status
+from data_tables.data_handling import Resource, ResourceTable, Section, SectionTable, Student, StudentTable
+
+
+def build_cohort(num_students: int):
+    """
+    Returns a StudentTable, SectionTable and ResourceTable of num_students approved students, each with a random
+    number of sections started at random dates in the last year. About half of the sections have a report.
+    """
+    today = dt.datetime.combine(dt.date.today(), dt.time())
+    students, sections, resources = list(), list(), list()
+    for student_id in range(1, num_students + 1):
+        student_fields = {field_name: '' for field_name in Student.fields}
+        student_fields.update(student_id=student_id, centre_id=12345, award_level='gold', year_group='10',
+                              is_approved=1, fullname=f'Test Student {student_id}')
+        for section_type_short in random.sample(list(SECTION_NAME_MAPPING.keys()), random.randint(0, 3)):
+            section_id = len(sections) + 1
+            student_fields[f'{section_type_short}_info_id'] = section_id
+            sections.append(Section.from_field_values({
+                'section_id': section_id, 'activity_timescale': random.choice(['90', '180', '360']),
+                'activity_start_date': today - dt.timedelta(days=random.randint(0, 365)),
+            }))
+            if random.random() < 0.5:
+                resources.append(Resource.from_field_values({
+                    'resource_id': len(resources) + 1, '_file_path': 'uploads\\report.pdf', 'is_section_report': 1,
+                    'resource_type': 'section_evidence', 'parent_link_id': section_id, 'date_uploaded': today,
+                }))
+        students.append(Student.from_field_values(student_fields))
+
+    return StudentTable(students), SectionTable(sections), ResourceTable(resources)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('-n', '--num-students', type=int, nargs='+', default=[10_000, 100_000],
+                        help='numbers of students to time')
+    args = parser.parse_args()
+
+    for num_students in args.num_students:
+        student_table, section_table, resource_table = build_cohort(num_students)
+
+        resource_table.clear_section_status_cache()  # so each section's status is really calculated
+        start_time = time.perf_counter()
+        per_object_summaries = {student_id: student.get_progress_summary(section_table, resource_table)
+                                for student_id, student in student_table.row_dict.items()}
+        per_object_time = time.perf_counter() - start_time
+
+        start_time = time.perf_counter()
+        batch_summaries = batch_status.calculate_cohort_progress(student_table, section_table,
+                                                                 resource_table).summary_dict()
+        batch_time = time.perf_counter() - start_time
+
+        assert batch_summaries == per_object_summaries, 'Batch summaries differ from per-object summaries'
+        print(f'{num_students:>8} students: per object {per_object_time:7.3f}s   '
+              f'batch {batch_time:7.3f}s   ({per_object_time / batch_time:5.1f}x faster)')
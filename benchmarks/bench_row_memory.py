@@ -0,0 +1,78 @@
+"""
+Measures the memory used per row by tables of Student and Resource rows
+(slot-based rows with interned categorical fields and string file paths)
+against the same fields stored in a per-object __dict__ with a Path per resource,
+as the rows used to be stored.
+
+Run from the directory containing README.md with:
+    python -m benchmarks.bench_row_memory [-n NUM_ROWS [NUM_ROWS ...]]
+(tracemalloc slows row creation down a lot so the default 1,000,000 rows take several minutes)
+"""
+import argparse
+import random
+import tracemalloc
+from types import SimpleNamespace
+
+from data_tables.data_handling import Resource, Student, parse_row_string
+
+
+def student_row_strings(num_rows: int):
+    """
+    Yields num_rows tabulated (txt table) strings of fully enrolled students
+    """
+    for i in range(1, num_rows + 1):
+        yield Student(i, 68362, random.choice(['bronze', 'silver', 'gold']), random.randint(7, 13), 1,
+                      f'Test Student {i}', random.choice(['male', 'female']), '2005/01/01',
+                      'Test address, Test Town', '0123456789', f'test{i}@test.com', '0123456789',
+                      random.choice(['english', 'welsh']), '2020/10/10').tabulate()
+
+
+def resource_row_strings(num_rows: int):
+    """
+    Yields num_rows tabulated (txt table) strings of section evidence resources
+    """
+    for i in range(1, num_rows + 1):
+        yield Resource(i, f'uploads\\evidence_{i}.pdf', 0, 'section_evidence', i, '2020/10/10').tabulate()
+
+
+def as_dict_row(row_obj) -> SimpleNamespace:
+    """
+    Returns the fields of row_obj stored in a per-object __dict__ (with file paths as Path objects)
+    """
+    field_values = {field_name: getattr(row_obj, field_name) for field_name in row_obj.fields}
+    for field_name, field_value in field_values.items():
+        if isinstance(field_value, str):
+            field_values[field_name] = ''.join(list(field_value))  # a separate copy as if parsed from file
+    return SimpleNamespace(**field_values)
+
+
+def measure(row_class, row_strings, make_dict_rows: bool) -> int:
+    """
+    Returns the memory (bytes) still allocated after parsing every row string into a row object
+    """
+    tracemalloc.start()
+    rows = list()
+    for row_string in row_strings:
+        row_obj = row_class(*parse_row_string(row_string))
+        rows.append(as_dict_row(row_obj) if make_dict_rows else row_obj)
+    current_memory, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    del rows
+    return current_memory
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('-n', '--num-rows', type=int, nargs='+', default=[10_000, 100_000, 1_000_000],
+                        help='numbers of rows to measure')
+    args = parser.parse_args()
+
+    for row_class, row_strings_func in ((Student, student_row_strings), (Resource, resource_row_strings)):
+        for num_rows in args.num_rows:
+            row_strings = list(row_strings_func(num_rows))
+            slot_memory = measure(row_class, row_strings, make_dict_rows=False)
+            dict_memory = measure(row_class, row_strings, make_dict_rows=True)
+            print(f'{num_rows:>9} {row_class.__name__} rows: '
+                  f'slots {slot_memory / 2 ** 20:8.1f} MiB ({slot_memory / num_rows:5.0f} B/row)   '
+                  f'__dict__ {dict_memory / 2 ** 20:8.1f} MiB ({dict_memory / num_rows:5.0f} B/row)')
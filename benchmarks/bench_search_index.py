@@ -0,0 +1,82 @@
+"""
+Times building a StudentSearchIndex (data_tables.search_index) over a cohort of random students and searching it,
+compared with checking every student's fields for the query. Checks that both find the same students.
+
+Run from the directory containing README.md with:
+    python -m benchmarks.bench_search_index [-n NUM_STUDENTS] [-l LIMIT]
+"""
+import argparse
+import random
+import string
+import time
+
+from data_tables.data_handling import Student, StudentLogin, StudentLoginTable, StudentTable
+from data_tables.search_index import StudentSearchIndex
+
+FIRST_NAMES = ('James', 'Mary', 'John', 'Patricia', 'Robert', 'Jennifer', 'Michael', 'Linda', 'William', 'Elizabeth')
+LAST_NAMES = ('Smith', 'Johnson', 'Williams', 'Brown', 'Jones', 'Garcia', 'Miller', 'Davis', 'Wilson', 'Taylor')
+QUERIES = ('smith', 'mary', 'jo', 'liz', 'williams', 'school', 'a', 'tay')
+
+
+def build_tables(num_students: int):
+    """
+    Returns a StudentTable and StudentLoginTable of num_students students with random names, emails and usernames
+    """
+    students, logins = list(), list()
+    for student_id in range(1, num_students + 1):
+        fullname = f'{random.choice(FIRST_NAMES)} {random.choice(LAST_NAMES)}{random.randint(1, 99)}'
+        student_fields = {field_name: '' for field_name in Student.fields}
+        student_fields.update(student_id=student_id, centre_id=12345, award_level='gold', year_group='10',
+                              is_approved=1, fullname=fullname,
+                              email_primary=f'{fullname.replace(" ", ".").lower()}@school.org')
+        students.append(Student.from_field_values(student_fields))
+        username = ''.join(random.choices(string.ascii_lowercase, k=5)) + str(student_id)
+        logins.append(StudentLogin.from_field_values({'username': username, 'password_hash': '',
+                                                      'student_id': student_id}))
+    return StudentTable(students), StudentLoginTable(logins)
+
+
+def scan_search(student_table: StudentTable, login_table: StudentLoginTable, query: str) -> set:
+    """
+    Returns the ids of the students matching query (see StudentSearchIndex.search()) by checking every student
+    """
+    matching_ids = set()
+    for student_id, student in student_table.row_dict.items():
+        username = ' '.join(login.username for login in login_table.lookup('student_id', student_id))
+        for text in (student.fullname.lower(), username, student.email_primary.lower()):
+            if query in text if len(query) >= 3 else (text.startswith(query) or f' {query}' in text):
+                matching_ids.add(student_id)
+    return matching_ids
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('-n', '--num-students', type=int, default=100_000, help='number of students to search')
+    parser.add_argument('-l', '--limit', type=int, default=200,
+                        help='maximum number of results of each search (as ui.staff.SEARCH_RESULT_LIMIT)')
+    args = parser.parse_args()
+
+    student_table, login_table = build_tables(args.num_students)
+    start_time = time.perf_counter()
+    search_index = StudentSearchIndex(student_table, login_table)
+    print(f'Index of {args.num_students} students built in {time.perf_counter() - start_time:.2f}s')
+
+    for query in QUERIES:
+        start_time = time.perf_counter()
+        limited_results = search_index.search(query, limit=args.limit)
+        limited_time = time.perf_counter() - start_time
+
+        start_time = time.perf_counter()
+        all_results = search_index.search(query)
+        index_time = time.perf_counter() - start_time
+
+        start_time = time.perf_counter()
+        scan_results = scan_search(student_table, login_table, query)
+        scan_time = time.perf_counter() - start_time
+
+        assert set(all_results) == scan_results, f'Index and scan results differ for {query!r}'
+        # equally good matches are in no particular order, so only which students were found can be compared
+        assert len(limited_results) == min(args.limit, len(all_results)) and set(limited_results) <= scan_results, \
+            f'Incorrect limited results for {query!r}'
+        print(f'{query!r:>10}: {len(all_results):>7} matches   limit {args.limit} {limited_time * 1000:7.2f}ms   '
+              f'all {index_time * 1000:7.2f}ms   scan {scan_time * 1000:8.2f}ms')
@@ -0,0 +1,43 @@
+"""
+Compares the throughput of repeat logins verified fully every time (password_logic.verify_pwd_str())
+with those verified by a password_logic.SessionCache after each user's first login.
+
+Run from the directory containing README.md with:
+    python -m benchmarks.bench_session_cache [-u NUM_USERS] [-l LOGINS_PER_USER]
+"""
+import argparse
+import time
+
+from processes import password_logic
+
+
+def login(username: str, password: str, stored_hash: str, session_cache: password_logic.SessionCache = None) -> bool:
+    """
+    Verifies a login the same way as ui.landing.Login.login()
+    """
+    if session_cache is not None and session_cache.verify('Staff', username, password, stored_hash):
+        return True
+    is_verified = password_logic.verify_pwd_str(password, stored_hash)
+    if is_verified and session_cache is not None:
+        session_cache.issue('Staff', username, password, stored_hash)
+    return is_verified
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('-u', '--num-users', type=int, default=10, help='number of users logging in')
+    parser.add_argument('-l', '--logins-per-user', type=int, default=20, help='number of logins by each user')
+    args = parser.parse_args()
+
+    users = [(f'staff{i}', f'Password{i}') for i in range(args.num_users)]
+    stored_hashes = {username: password_logic.hash_pwd_str(password) for username, password in users}
+    num_logins = args.num_users * args.logins_per_user
+
+    for cache_name, session_cache in (('without cache', None), ('with cache', password_logic.SessionCache())):
+        start_time = time.perf_counter()
+        for _ in range(args.logins_per_user):
+            for username, password in users:
+                assert login(username, password, stored_hashes[username], session_cache), 'Login failed'
+        elapsed_time = time.perf_counter() - start_time
+        print(f'{cache_name:>14}: {num_logins} logins in {elapsed_time:7.3f}s '
+              f'({num_logins / elapsed_time:9.1f} logins/s)')
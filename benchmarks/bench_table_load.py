@@ -0,0 +1,91 @@
+"""
+Compares the peak memory used when loading a large StudentTable txt file
+all at once (with readlines(), as Table.load_from_file used to) against
+the current streaming Table.load_from_file.
+Loading the same txt file trusted (without validation) and from a binary table file is also timed.
+
+Run from the directory containing README.md with:
+    python -m benchmarks.bench_table_load [-n NUM_STUDENTS]
+"""
+import argparse
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+from data_tables.data_handling import Student, StudentTable, parse_row_string
+
+
+def write_student_file(file_path: Path, num_students: int) -> None:
+    """
+    Writes num_students fully enrolled students to file_path in the normal txt table format
+    """
+    with file_path.open(mode='w') as fobj:
+        for i in range(1, num_students + 1):
+            student = Student(i, 68362, 'bronze', 10, 1, 'Test Student', 'female', '2005/01/01',
+                              'Test address, Test Town', '0123456789', 'test@test.com',
+                              '0123456789', 'english', '2020/10/10')
+            fobj.write(student.tabulate())
+
+
+def load_with_readlines(file_path: Path) -> StudentTable:
+    table = StudentTable()
+    with file_path.open(mode='r') as fobj:
+        txt_lines = fobj.readlines()
+        for row in txt_lines:
+            table.add_row(*parse_row_string(row))
+    return table
+
+
+def load_streaming(file_path: Path) -> StudentTable:
+    table = StudentTable()
+    table.load_from_file(file_path.open(mode='r'))
+    return table
+
+
+def load_trusted(file_path: Path) -> StudentTable:
+    table = StudentTable()
+    table.load_from_file(file_path.open(mode='r'), trusted=True)
+    return table
+
+
+def load_binary(file_path: Path) -> StudentTable:
+    table = StudentTable()
+    table.load_from_binary_file(file_path.with_suffix('.bin').open(mode='rb'))
+    return table
+
+
+def measure(load_func, file_path: Path):
+    """
+    Returns the time taken (s) and peak memory (bytes) used by load_func(file_path)
+    """
+    tracemalloc.start()
+    start_time = time.perf_counter()
+    table = load_func(file_path)
+    time_taken = time.perf_counter() - start_time
+    _, peak_memory = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    del table
+    return time_taken, peak_memory
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('-n', '--num-students', type=int, default=20000,
+                        help='number of students in the generated StudentTable file')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        test_path = Path(temp_dir) / 'StudentTable (benchmark).txt'
+        write_student_file(test_path, args.num_students)
+        student_table = StudentTable()
+        student_table.load_from_file(test_path.open(mode='r'))
+        student_table.save_to_binary_file(test_path.with_suffix('.bin').open(mode='wb'))
+        del student_table
+        print(f'Loading {args.num_students} students ({test_path.stat().st_size / 2 ** 20:.1f} MiB file)')
+
+        for name, func in (('readlines()', load_with_readlines), ('streaming', load_streaming),
+                           ('trusted', load_trusted), ('binary', load_binary)):
+            seconds, peak = measure(func, test_path)
+            print(f'  {name:<12} {seconds:6.2f} s   peak memory {peak / 2 ** 20:7.1f} MiB')
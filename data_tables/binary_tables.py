@@ -0,0 +1,171 @@
+import datetime as dt
+import logging
+import struct
+import sys
+from array import array
+from itertools import accumulate
+from pathlib import Path
+from typing import Any, BinaryIO, Collection, List, Tuple
+
+# Binary table files are laid out as follows (all little-endian):
+#   header: HEADER_STRUCT (magic bytes, format version, row count, field count)
+#   schema: for each field, FIELD_STRUCT (type code, name length) followed by the utf-8 field name
+#   data: one column per field in schema order (see COLUMN_TYPE_CODES)
+BINARY_MAGIC = b'DOFE-TBL'
+BINARY_FORMAT_VERSION = 1
+HEADER_STRUCT = struct.Struct('<8sHIH')
+FIELD_STRUCT = struct.Struct('<cH')
+BLOB_LENGTH_STRUCT = struct.Struct('<Q')
+
+# Column type codes:
+#   i - integers (or '' if empty) stored as an array of signed 64-bit ints
+#   d - datetimes (or '' if empty) stored as an array of 32-bit day ordinals (see dt.date.toordinal())
+#   s - strings stored as an array of 32-bit character counts followed by one utf-8 'blob' of all the strings
+#   p - pathlib.Path objects stored like strings
+COLUMN_TYPE_CODES = (b'i', b'd', b's', b'p')
+INT_NULL = -2 ** 63  # stored in place of '' in integer columns
+DATE_NULL = 0  # stored in place of '' in datetime columns
+
+
+class BinaryTableError(Exception):
+    pass
+
+
+def _array_to_bytes(arr: array) -> bytes:
+    if sys.byteorder == 'big':  # always stored little-endian
+        arr.byteswap()
+    return arr.tobytes()
+
+
+def _array_from_bytes(type_code: str, data: bytes) -> array:
+    arr = array(type_code)
+    arr.frombytes(data)
+    if sys.byteorder == 'big':
+        arr.byteswap()
+    return arr
+
+
+def get_column_type(column_values: List[Any], field_name: str) -> bytes:
+    """
+    Returns the type code (see COLUMN_TYPE_CODES) to use for a column of values.
+    Empty values ('') are allowed in any column.
+    Raises a BinaryTableError if the column contains a mix of types.
+    """
+    value_types = {type(value) for value in column_values if value != ''}
+    if not value_types or value_types == {str}:
+        return b's'
+    elif value_types == {int}:
+        return b'i'
+    elif value_types == {dt.datetime}:
+        return b'd'
+    elif all(issubclass(value_type, Path) for value_type in value_types):
+        return b'p'
+    else:
+        error_str = f'Field {field_name!r} contains values of mixed or unsupported types ' \
+                    f'({", ".join(sorted(t.__name__ for t in value_types))}) so cannot be stored in binary'
+        logging.error(error_str)
+        raise BinaryTableError(error_str)
+
+
+def _encode_column(column_values: List[Any], type_code: bytes) -> bytes:
+    if type_code == b'i':
+        return _array_to_bytes(array('q', [INT_NULL if v == '' else v for v in column_values]))
+
+    elif type_code == b'd':
+        return _array_to_bytes(array('i', [v.toordinal() if v else DATE_NULL for v in column_values]))
+
+    else:  # strings/paths
+        str_values = [str(v) for v in column_values]
+        blob = ''.join(str_values).encode('utf-8')
+        return _array_to_bytes(array('I', map(len, str_values))) + BLOB_LENGTH_STRUCT.pack(len(blob)) + blob
+
+
+def _decode_column(fobj: BinaryIO, type_code: bytes, row_count: int) -> List[Any]:
+    if type_code == b'i':
+        return [('' if v == INT_NULL else v) for v in _array_from_bytes('q', fobj.read(8 * row_count))]
+
+    elif type_code == b'd':
+        # dates are often repeated so each distinct ordinal is only converted once
+        date_cache = {DATE_NULL: ''}
+        date_list = list()
+        for v in _array_from_bytes('i', fobj.read(4 * row_count)):
+            if v not in date_cache:
+                date_cache[v] = dt.datetime.fromordinal(v)
+            date_list.append(date_cache[v])
+        return date_list
+
+    else:  # strings/paths
+        lengths = _array_from_bytes('I', fobj.read(4 * row_count))
+        blob_length, = BLOB_LENGTH_STRUCT.unpack(fobj.read(BLOB_LENGTH_STRUCT.size))
+        blob = fobj.read(blob_length).decode('utf-8')
+
+        end_positions = list(accumulate(lengths))
+        # low-cardinality values (e.g. award levels) are often repeated so equal strings share one object
+        str_cache = dict()
+        str_values = [str_cache.setdefault(v, v) for v in
+                      (blob[start:end] for start, end in zip([0] + end_positions, end_positions))]
+
+        if type_code == b'p':
+            return [Path(v) for v in str_values]
+        return str_values
+
+
+def write_rows(row_objs: Collection, fobj: BinaryIO) -> None:
+    """
+    Writes the fields of every row object in row_objs (all of the same Row class) to fobj in the binary format.
+    The fields stored are the row class's fields (Row.fields) in the same order as Row.tabulate().
+
+    :param row_objs: a collection of Row objects such as Table.row_dict.values()
+    :param fobj: a file opened for writing in binary mode (e.g. open('wb'))
+    """
+    row_objs = list(row_objs)
+    field_names = list(row_objs[0].fields) if row_objs else []
+
+    columns = [[getattr(row_obj, name) for row_obj in row_objs] for name in field_names]
+    type_codes = [get_column_type(column, name) for column, name in zip(columns, field_names)]
+
+    fobj.write(HEADER_STRUCT.pack(BINARY_MAGIC, BINARY_FORMAT_VERSION, len(row_objs), len(field_names)))
+    for name, type_code in zip(field_names, type_codes):
+        encoded_name = name.encode('utf-8')
+        fobj.write(FIELD_STRUCT.pack(type_code, len(encoded_name)))
+        fobj.write(encoded_name)
+
+    for column, type_code in zip(columns, type_codes):
+        fobj.write(_encode_column(column, type_code))
+
+
+def read_rows(fobj: BinaryIO) -> Tuple[List[str], List[Tuple]]:
+    """
+    Reads a binary table file written by write_rows().
+    Raises a BinaryTableError if the file is not a binary table or uses an unsupported format version.
+
+    :param fobj: a file opened for reading in binary mode (e.g. open('rb'))
+    :return: a list of the field names and a list of tuples of each row's field values (in the same order)
+    """
+    header = fobj.read(HEADER_STRUCT.size)
+    if len(header) != HEADER_STRUCT.size or not header.startswith(BINARY_MAGIC):
+        error_str = f'{getattr(fobj, "name", fobj)} is not a binary table file'
+        logging.error(error_str)
+        raise BinaryTableError(error_str)
+
+    _, version, row_count, field_count = HEADER_STRUCT.unpack(header)
+    if version != BINARY_FORMAT_VERSION:
+        error_str = f'{getattr(fobj, "name", fobj)} uses binary table format version {version} ' \
+                    f'but only version {BINARY_FORMAT_VERSION} is supported'
+        logging.error(error_str)
+        raise BinaryTableError(error_str)
+
+    field_names, type_codes = list(), list()
+    for _ in range(field_count):
+        type_code, name_length = FIELD_STRUCT.unpack(fobj.read(FIELD_STRUCT.size))
+        if type_code not in COLUMN_TYPE_CODES:
+            error_str = f'Unknown column type code {type_code!r} in {getattr(fobj, "name", fobj)}'
+            logging.error(error_str)
+            raise BinaryTableError(error_str)
+
+        field_names.append(fobj.read(name_length).decode('utf-8'))
+        type_codes.append(type_code)
+
+    columns = [_decode_column(fobj, type_code, row_count) for type_code in type_codes]
+    return field_names, list(zip(*columns))
+
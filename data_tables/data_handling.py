@@ -1,19 +1,35 @@
 from __future__ import annotations
 
 import datetime as dt
+import hashlib
+import heapq
+import locale
 import logging  # logging functionality
+import os
 import shutil
+import sys
+from bisect import bisect_right
+from itertools import chain, islice
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager, nullcontext
+from functools import lru_cache
 from pathlib import Path  # file handling
-from typing import Collection, Union, Dict, List, Optional  # type hints in function and class definitions
+from typing import Any, Callable, Collection, ContextManager, Union, Dict, Iterable, Iterator, List, Optional, \
+    Tuple, TYPE_CHECKING  # type hints
 
-from typing.io import TextIO
+from typing.io import BinaryIO, TextIO
 
-from data_tables import SECTION_NAME_MAPPING
+from data_tables import SECTION_NAME_MAPPING, binary_tables
+from data_tables.journal import Journal
 from processes import shorten_string
-from processes.datetime_logic import str_to_date_dict, datetime_to_str, date_in_past, calculate_end_date
+from processes.datetime_logic import str_to_date_dict, datetime_to_str, date_in_past, calculate_end_date, \
+    DeadlineScheduler
 from processes.validation import validate_int, validate_length, validate_lookup, \
     validate_date, validate_regex
 
+if TYPE_CHECKING:
+    from data_tables.storage import StorageBackend
+
 # simplistic and naive regular expression for validating emails
 EMAIL_MAX_LEN = 50  # should match 5,??? above
 # matches abc@def.ghi(.jk)
@@ -24,14 +40,238 @@ INTERNAL_ID_LEN = 5
 FIELD_ESCAPE_STR = r'\e%f'  # used to separate fields in txt files
 LINEBREAK_ESCAPE_STR = r'\e%n'  # used to replace line breaks (\n) in strings
 
+# formats tables can be saved in - 'txt' (escaped text, see Row.tabulate()), 'bin' (see binary_tables)
+# or 'sqlite' (one SQLite database file, see storage.SqliteBackend)
+TABLE_FORMATS = ('txt', 'bin', 'sqlite')
+
+# once the journal holds more records than this, the next save rewrites all tables and empties it
+JOURNAL_MAX_RECORDS = 5000
+# size of the chunks table files are read in when calculating their checksum
+CHECKSUM_CHUNK_SIZE = 2 ** 20
+# txt tables are parsed in parallel (see Database.load_state_from_file()) once their total size reaches
+# PARALLEL_LOAD_MIN_SIZE bytes. Each worker process parses a chunk of about PARALLEL_LOAD_CHUNK_SIZE bytes at a time
+PARALLEL_LOAD_MIN_SIZE = 16 * 2 ** 20
+PARALLEL_LOAD_CHUNK_SIZE = 4 * 2 ** 20
+# size of the write buffer of each table file being saved. Tables are saved to temporary files first
+# (see Database.save_state_to_file()) so a crash mid-write can't leave a half written table behind
+SAVE_BUFFER_SIZE = 2 ** 20
+
+
+def parse_row_string(row: str) -> List[str]:
+    """
+    Splits a single tabulated row (see Row.tabulate()) back into its list of field strings
+    """
+    obj_info = list()
+
+    # split line/row by separator - the final item is just the end of the row (e.g. '\n')
+    padded_fields = row.split(FIELD_ESCAPE_STR)[:-1]
+    for field in padded_fields:
+        field = field.strip()  # remove trailing/padding whitespace
+        field = field.replace(LINEBREAK_ESCAPE_STR, '\n')  # re-insert escaped linebreaks
+        obj_info.append(field)
+
+    return obj_info
+
+
+def get_file_chunks(file_path: Path, chunk_size: int = PARALLEL_LOAD_CHUNK_SIZE) -> List[Tuple[int, int]]:
+    """
+    Splits the txt table file at file_path into chunks of whole lines of roughly chunk_size bytes each
+
+    :return: a list of (start offset, end offset) of each chunk in order
+    """
+    file_size = file_path.stat().st_size
+    chunk_list = list()
+    with file_path.open(mode='rb') as fobj:
+        start = 0
+        while start < file_size:
+            fobj.seek(start + chunk_size)
+            fobj.readline()  # moves to the start of the next line so no line is split between chunks
+            end = min(fobj.tell(), file_size)
+            chunk_list.append((start, end))
+            start = end
+    return chunk_list
+
+
+def parse_table_file_chunk(file_path: Path, start: int, end: int,
+                           validate_row_class: Optional[type] = None) -> List[List[str]]:
+    """
+    Returns the list of field strings (see parse_row_string()) of every row in a chunk of the txt table
+    file at file_path (see get_file_chunks()). Run within worker processes so must be a module level function.
+
+    If validate_row_class (a Row subclass) is given, every row is also validated by creating a row object from it
+    and the field strings of the (normalised) row object are returned instead,
+    so they can then be trusted (see Row.from_field_strings()).
+    """
+    with file_path.open(mode='rb') as fobj:
+        fobj.seek(start)
+        # txt tables are written using the default encoding (see Path.open())
+        chunk_str = fobj.read(end - start).decode(locale.getpreferredencoding(False))
+
+    parsed_rows = [parse_row_string(row) for row in chunk_str.split('\n') if row]
+    if validate_row_class:
+        with suppressed_debug_logging():
+            parsed_rows = [parse_row_string(validate_row_class(*field_strings).tabulate())
+                           for field_strings in parsed_rows]
+    return parsed_rows
+
+
+def compact_row_string(row: str) -> str:
+    """
+    Removes the padding and trailing newline from a tabulated row (see Row.tabulate())
+    so that it can be stored more compactly (e.g. in a Journal).
+    The result can still be read by parse_row_string().
+    """
+    return FIELD_ESCAPE_STR.join(field.rstrip() for field in row.split(FIELD_ESCAPE_STR)[:-1]) + FIELD_ESCAPE_STR
+
+
+@contextmanager
+def suppressed_debug_logging():
+    """
+    Within this context, debug log records are not emitted (e.g. the one logged by every Row's __init__)
+    so that bulk operations can log a single summary instead of a record per row
+    """
+    previous_disable_level = logging.root.manager.disable
+    logging.disable(max(previous_disable_level, logging.DEBUG))
+    try:
+        yield
+    finally:
+        logging.disable(previous_disable_level)
+
+
+def get_temp_path(file_path: Path) -> Path:
+    """
+    Returns the path of the temporary file that the new contents of file_path are written to before replacing it
+    """
+    return file_path.with_name(f'{file_path.name}.tmp')
+
+
+def sync_and_close(fobj: Union[TextIO, BinaryIO]) -> None:
+    """
+    Flushes everything written to the open file fobj, forces it to be physically written to disk and closes it
+    """
+    fobj.flush()
+    os.fsync(fobj.fileno())
+    fobj.close()
+
+
+def sync_directory(dir_path: Path) -> None:
+    """
+    Forces any renamed/replaced files in dir_path to be physically recorded on disk.
+    Only possible (and needed) on POSIX systems.
+    """
+    if os.name == 'posix':
+        dir_fd = os.open(dir_path, os.O_RDONLY)
+        try:
+            os.fsync(dir_fd)
+        finally:
+            os.close(dir_fd)
+
+
+def file_checksum(file_path: Path) -> str:
+    """
+    Returns the SHA-256 hex digest of the contents of the file at file_path
+    """
+    file_hash = hashlib.sha256()
+    with file_path.open(mode='rb') as fobj:
+        for chunk in iter(lambda: fobj.read(CHECKSUM_CHUNK_SIZE), b''):
+            file_hash.update(chunk)
+    return file_hash.hexdigest()
+
+
+def field_sort_key(field_value) -> Tuple[bool, Any]:
+    """
+    Sort key for the values of one field (see Table.select()) so that empty values ('')
+    of otherwise non-string fields (e.g. an unset vol_info_id) are sorted first instead of raising a TypeError
+    """
+    return field_value != '', field_value
+
+
+def parse_int_field(field_str: str) -> Union[int, str]:
+    """
+    Converts a stored optional integer field back to an int (or '' if empty) without validation
+    """
+    return int(field_str) if field_str else ''
+
+
+@lru_cache(maxsize=4096)  # dates are often repeated so equal dates also share one datetime object
+def parse_date_field(field_str: str) -> Union[dt.datetime, str]:
+    """
+    Converts a stored optional date field (see datetime_to_str()) back to a datetime (or '' if empty)
+    without validation
+    """
+    if not field_str:
+        return ''
+    return dt.datetime(int(field_str[:4]), int(field_str[5:7]), int(field_str[8:10]))
+
 
 class Row:
     """
     Base class for row classes/data objects to be stored within tables.
-    Must have a key_field which needs to be unique for each row/record/object in a table
+    Must have a key_field which needs to be unique for each row/record/object in a table.
+
+    Rows use __slots__ rather than a per-object __dict__ to keep large tables compact in memory,
+    so every subclass must declare __slots__ as well as its fields (in the order they are stored).
     """
 
+    # _table: the Table object this row is currently stored within (set by the table itself)
+    __slots__ = ('_table',)
     key_field = ''
+    fields: Tuple[str, ...] = ()  # names of every field of the row in the order they are tabulated
+    # field_name: func converting the field's stored string back to its value (see from_field_strings()).
+    # Fields that aren't given are kept as strings
+    field_parsers: Dict[str, Callable[[str], Any]] = dict()
+
+    def __new__(cls, *args, **kwargs):
+        row_obj = super().__new__(cls)
+        object.__setattr__(row_obj, '_table', None)
+        return row_obj
+
+    def __setattr__(self, attr_name: str, attr_val) -> None:
+        """
+        Sets the attribute as normal. If the row is stored within a table and the attribute
+        is a field (i.e. not protected), the table is told about the change (e.g. to journal it).
+        """
+        table = self._table
+        if attr_name[0] != '_' and table is not None:
+            old_val = getattr(self, attr_name, None)
+            object.__setattr__(self, attr_name, attr_val)
+            table.row_updated(self, attr_name, old_val)
+        else:
+            object.__setattr__(self, attr_name, attr_val)
+
+    def updating(self) -> ContextManager[None]:
+        """
+        Returns a context manager within which changes to the row's fields are recorded by its table
+        (e.g. journaled) as a single change once every field has been set (see Table.updating_row()),
+        so rows part way through a multi-field update (e.g. Student.complete_enrolment()) are never recorded.
+        """
+        if self._table is None:
+            return nullcontext()
+        return self._table.updating_row(self)
+
+    @classmethod
+    def from_field_values(cls, field_values: Dict[str, Any]) -> Row:
+        """
+        Creates a row object directly from a dictionary of already validated field values
+        (e.g. loaded from a binary table file) without calling __init__ and hence without any validation.
+        """
+        row_obj = cls.__new__(cls)
+        for field_name, field_value in field_values.items():
+            object.__setattr__(row_obj, field_name, field_value)
+        return row_obj
+
+    @classmethod
+    def from_field_strings(cls, field_strings: List[str]) -> Row:
+        """
+        Creates a row object from the field strings of a row parsed from a trusted table file
+        (see parse_row_string()) using cls.field_parsers. Unlike cls(*field_strings), nothing is validated
+        so this should only be used for files known to have been written by Table.save_to_file().
+        """
+        field_parsers = cls.field_parsers
+        return cls.from_field_values({
+            field_name: field_parsers[field_name](field_str) if field_name in field_parsers else field_str
+            for field_name, field_str in zip(cls.fields, field_strings)
+        })
 
     def __repr__(self) -> str:
         """
@@ -57,22 +297,22 @@ class Row:
             special_str_funcs = {}
 
         return_string = ''
-        for attr_name, attr_val in self.__dict__.items():
-            if attr_name[0] != '_':  # ignores protected attributes
-                str_func = str  # defaults to just using the str() func on the attribute
-                if attr_name in special_str_funcs:
-                    str_func = special_str_funcs[attr_name]
+        for attr_name in self.fields:
+            str_func = str  # defaults to just using the str() func on the attribute
+            if attr_name in special_str_funcs:
+                str_func = special_str_funcs[attr_name]
 
-                # converts attribute to a string (normally just with str() unless otherwise specified)
-                # also removes escape sequences FIELD_ESCAPE_STR and LINEBREAK_ESCAPE_STR entered maliciously by users
-                field_text = str_func(attr_val).replace(FIELD_ESCAPE_STR, '').replace(LINEBREAK_ESCAPE_STR, '')
+            # converts attribute to a string (normally just with str() unless otherwise specified)
+            # also removes escape sequences FIELD_ESCAPE_STR and LINEBREAK_ESCAPE_STR entered maliciously by users
+            field_text = str_func(getattr(self, attr_name)).replace(FIELD_ESCAPE_STR, '')
+            field_text = field_text.replace(LINEBREAK_ESCAPE_STR, '')
 
-                # replaces 'real' line breaks with escape sequence
-                # so that fields are still confined to one line in txt file
-                field_text = field_text.replace('\n', LINEBREAK_ESCAPE_STR)
+            # replaces 'real' line breaks with escape sequence
+            # so that fields are still confined to one line in txt file
+            field_text = field_text.replace('\n', LINEBREAK_ESCAPE_STR)
 
-                return_string += field_text.ljust(padding_values[attr_name])  # pads into file to align fields
-                return_string += FIELD_ESCAPE_STR  # marks end of a field
+            return_string += field_text.ljust(padding_values[attr_name])  # pads into file to align fields
+            return_string += FIELD_ESCAPE_STR  # marks end of a field
 
         return return_string + '\n'  # newline marks end of row
 
@@ -85,6 +325,8 @@ class Table:
     row_class = Row  # indicates what Row objs will be stored within this table
     # objects are stored in dictionary using key_field of self.row_class as key
     row_dict: Dict[str, Row]
+    # names of (non-key) fields of self.row_class to index so rows can be found by their value (see lookup())
+    secondary_indexes: Tuple[str, ...] = ()
 
     # a Collection is just a sized iterable
     def __init__(self, start_table: Collection[row_class] = None):
@@ -93,9 +335,28 @@ class Table:
         """
 
         self.row_dict = dict()
+        # field_name: {field value: {primary key: row obj}} for every field in self.secondary_indexes
+        self._indexes: Dict[str, Dict[Any, Dict[Any, Row]]] = {field_name: dict()
+                                                               for field_name in self.secondary_indexes}
+        # if set (by the Database), every change to the table's rows is passed to this storage backend
+        # (e.g. appended to a journal or upserted into a SQLite database - see data_tables.storage)
+        self.storage: Optional[StorageBackend] = None
+        # functions called with the op ('put'/'del') and rows of every change to the table's rows
+        # (e.g. to keep a view derived from the table up to date - see data_tables.progress_view)
+        self.change_listeners: List[Callable[[str, Collection[Row]], None]] = list()
+        # id(row_obj): whether the row has changed, for every row within updating_row()
+        self._updating_rows: Dict[int, bool] = dict()
+        # whether the table's rows have changed since it was last loaded from or saved to file
+        self.is_modified = False
+        # integer key allocation (see get_new_key_id()): the largest id ever stored and the ranges of free ids
+        # below it as sorted, non-overlapping [start, end) pairs held in two lists (so the starts can be bisected).
+        # Storing ranges rather than single ids keeps this small however large the gaps between ids are
+        self._max_key_id = 0
+        self._free_key_starts: List[int] = list()
+        self._free_key_ends: List[int] = list()
+
         if start_table:  # if a collection of objects has been provided
-            for row_obj in start_table:
-                self.add_row(row_obj)
+            self.add_rows(start_table)
 
             logging.debug(f'{type(self).__name__} object successfully populated from iterable '
                           f'argument - {len(start_table)} {self.row_class.__name__} object(s) added')
@@ -109,17 +370,14 @@ class Table:
 
     def get_new_key_id(self) -> int:
         """
-        Looks at current row_dict and returns the next
-        available id that can be used as a unique key.
+        Returns the smallest id (from 1) that is not already used as a key in row_dict.
         Should only be used with tables that use an integer-only id key_field.
+        The free ids are tracked as rows are added and deleted so this takes O(1) time.
         """
-        taken_ids = {int(str_id) for str_id in self.row_dict.keys()}
-        if taken_ids:
-            # range(1, max(taken_ids) + 2): a range of all possible ids between 1 and the max taken id+1
-            # set.difference finds any unused ids in this range and min() finds the smallest such id
-            return min(set(range(1, max(taken_ids) + 2)).difference(taken_ids))
+        if self._free_key_starts:
+            return self._free_key_starts[0]
         else:
-            return 1  # ids should start at 1 since sometimes converted to booleans
+            return self._max_key_id + 1  # ids should start at 1 since sometimes converted to booleans
 
     def add_row(self, *args, **kwargs) -> None:
         """
@@ -145,59 +403,460 @@ class Table:
         key_field = self.row_class.key_field
         primary_key = new_row_obj.__getattribute__(key_field)
         if primary_key not in self.row_dict.keys():
-            self.row_dict[primary_key] = new_row_obj
+            self._attach_row(new_row_obj)
+            self._record_change('put', new_row_obj)
         else:
             error_str = f'Tried to add an object to {type(self).__name__} with a ' \
                         f'non-unique primary key - value of "{primary_key}" for field "{key_field}"'
             logging.error(error_str)
             raise KeyError(error_str)
 
+    def add_rows(self, row_objs: Iterable[Row]) -> int:
+        """
+        Adds every row object in row_objs to the table as one batch. Much faster than calling add_row() for each.
+        Key uniqueness is checked once for the whole batch and one summary is logged instead of a debug record
+        per row (including those logged by each row's __init__ if row_objs is a generator creating them).
+        Raises KeyError if any key is non-unique, in which case no rows are added at all.
+        Any other exception raised while consuming row_objs (e.g. a ValidationError) also leaves the table unchanged.
+
+        :param row_objs: an iterable of row objects (of self.row_class) e.g. a list or generator
+        :return: the number of rows added
+        """
+        key_field = self.row_class.key_field
+        with suppressed_debug_logging():
+            new_row_dict = dict()
+            for row_obj in row_objs:
+                primary_key = row_obj.__getattribute__(key_field)
+                if primary_key in new_row_dict or primary_key in self.row_dict:
+                    error_str = f'Tried to add an object to {type(self).__name__} with a non-unique ' \
+                                f'primary key - value of "{primary_key}" for field "{key_field}". No rows were added'
+                    logging.error(error_str)
+                    raise KeyError(error_str)
+                new_row_dict[primary_key] = row_obj
+
+            for row_obj in new_row_dict.values():
+                self._attach_row(row_obj)
+            self._record_changes('put', new_row_dict.values())
+
+        logging.debug(f'Added {len(new_row_dict)} {self.row_class.__name__} object(s) '
+                      f'to {type(self).__name__} as one batch')
+        return len(new_row_dict)
+
     def delete_row(self, primary_key):
         """
         Attempts to delete row with primary key 'primary_key' from table.
         Raises a KeyError if this key is invalid.
         """
         try:
-            del self.row_dict[primary_key]
+            row_obj = self._detach_row(primary_key)
         except KeyError:
             error_str = f'{primary_key} is not a row within {type(self).__name__}'
             logging.error(error_str)
             raise KeyError(error_str)
 
-    def load_from_file(self, txt_file: TextIO):
+        self._record_change('del', row_obj)
+
+    def clear(self) -> None:
+        """
+        Removes every row from the table.
+        Unlike delete_row, no other side effects (e.g. deleting files) occur.
+        """
+        for primary_key in list(self.row_dict.keys()):
+            self._record_change('del', self._detach_row(primary_key))
+
+        self._max_key_id = 0
+        self._free_key_starts = list()
+        self._free_key_ends = list()
+
+    def row_updated(self, row_obj: Row, attr_name: str, old_val) -> None:
         """
-        Given the output from an open() method, populates self with data from lines of text file
+        Called by a row stored within this table whenever one of its fields is changed
+
+        :param row_obj: the row that was changed
+        :param attr_name: name of the field that was changed
+        :param old_val: value of the field before it was changed
+        """
+        if attr_name in self._indexes:
+            primary_key = row_obj.__getattribute__(self.row_class.key_field)
+            self._remove_from_index(attr_name, old_val, primary_key)
+            self._indexes[attr_name].setdefault(row_obj.__getattribute__(attr_name), dict())[primary_key] = row_obj
+
+        if id(row_obj) in self._updating_rows:  # recorded once its update is finished
+            self._updating_rows[id(row_obj)] = True
+        else:
+            self._record_change('put', row_obj)
+
+    @contextmanager
+    def updating_row(self, row_obj: Row) -> Iterator[None]:
+        """
+        Within this context, changes to the fields of row_obj (stored within this table) update the table's
+        indexes as usual but are only recorded (see _record_change()) once, when the context exits,
+        so every row journaled or stored is complete. Usually used through Row.updating().
         """
-        txt_lines = txt_file.readlines()
-        for row in txt_lines:
-            obj_info = list()
+        row_id = id(row_obj)
+        if row_id in self._updating_rows:  # already within this context
+            yield
+            return
+
+        self._updating_rows[row_id] = False
+        try:
+            yield
+        finally:
+            # recorded even if the update failed part way through so storage still matches the row in memory
+            if self._updating_rows.pop(row_id) and row_obj._table is self:
+                self._record_change('put', row_obj)
 
-            padded_fields = row.split(FIELD_ESCAPE_STR)  # split line/row by separator
-            for field in padded_fields:
-                if field != '\n':
-                    field = field.strip()  # remove trailing/padding whitespace
-                    field = field.replace(LINEBREAK_ESCAPE_STR, '\n')  # re-insert escaped linebreaks
-                    obj_info.append(field)
+    def lookup(self, field_name: str, value) -> List[Row]:
+        """
+        Returns a list of every row whose field field_name is equal to value
+        using the index of that field (rather than checking every row).
+        Raises a KeyError if field_name is not in self.secondary_indexes.
+        """
+        try:
+            index = self._indexes[field_name]
+        except KeyError:
+            error_str = f'{field_name} is not an indexed field of {type(self).__name__}. ' \
+                        f'Indexed fields: {", ".join(self.secondary_indexes)}'
+            logging.error(error_str)
+            raise KeyError(error_str)
 
-            self.add_row(*obj_info)  # add new row/obj to table
+        return list(index.get(value, dict()).values())
 
+    def select(self, where: Dict[str, Any] = None, order_by: str = None, limit: int = None) -> Iterator[Row]:
+        """
+        Returns an iterator of the rows matching every condition in where, lazily found and filtered as it is iterated.
+        Uses the primary key or a secondary index to find the matching rows where possible
+        and only checks every row when no condition can use one (see explain()).
+
+        :param where: dictionary of field name: condition. The condition is either a value the field must equal
+            or a function that is passed the field's value and returns whether the row matches
+        :param order_by: name of the field to sort the rows by - prefix with '-' to sort in descending order.
+            Rows are otherwise returned in the order they were added
+        :param limit: maximum number of rows to return
+        """
+        return self._plan_select(where, order_by, limit)[1]
+
+    def explain(self, where: Dict[str, Any] = None, order_by: str = None, limit: int = None) -> str:
+        """
+        Returns a description of each step select() would take to find the rows for the same arguments
+        (e.g. 'index lookup on award_level (120 candidate row(s))') without finding them.
+        Use to diagnose slow queries.
+        """
+        return '\n'.join(self._plan_select(where, order_by, limit)[0])
+
+    def _plan_select(self, where: Optional[Dict[str, Any]], order_by: Optional[str],
+                     limit: Optional[int]) -> Tuple[List[str], Iterator[Row]]:
+        """
+        Returns the description of each step of a select() query (see explain()) and its (not yet started) iterator
+        """
+        where = dict(where or dict())
+        descending = bool(order_by) and order_by.startswith('-')
+        order_field = order_by.lstrip('-') if order_by else None
+        for field_name in list(where) + ([order_field] if order_field else []):
+            if field_name not in self.row_class.fields:
+                error_str = f'{field_name} is not a field of {self.row_class.__name__}. ' \
+                            f'Valid fields: {", ".join(self.row_class.fields)}'
+                logging.error(error_str)
+                raise KeyError(error_str)
+
+        key_field = self.row_class.key_field
+        # fields that must equal a value so can be looked up rather than checked for every row
+        equal_fields = [field_name for field_name, condition in where.items() if not callable(condition)]
+        indexed_fields = [field_name for field_name in equal_fields if field_name in self._indexes]
+        steps = list()
+        if key_field in equal_fields:
+            primary_key = where.pop(key_field)
+            rows = (self.row_dict[primary_key],) if primary_key in self.row_dict else ()
+            steps.append(f'primary key lookup on {key_field} ({len(rows)} row(s))')
+        elif indexed_fields:
+            # the index leaving the fewest rows to check the remaining conditions of
+            field_name = min(indexed_fields, key=lambda f: len(self._indexes[f].get(where[f], ())))
+            rows = tuple(self._indexes[field_name].get(where.pop(field_name), dict()).values())
+            steps.append(f'index lookup on {field_name} ({len(rows)} candidate row(s))')
+        elif order_field in self._indexes:
+            # only the index's distinct values are sorted rather than every row
+            index = self._indexes[order_field]
+            rows = chain.from_iterable(tuple(index.get(value, dict()).values()) for value in
+                                       sorted(index, key=field_sort_key, reverse=descending))
+            steps.append(f'index scan on {order_field} in {"descending" if descending else "ascending"} order '
+                         f'({len(self.row_dict)} row(s))')
+            order_field = None  # already in order
+        else:
+            rows = tuple(self.row_dict.values())  # a copy so rows can be added/deleted while iterating
+            steps.append(f'full scan ({len(rows)} row(s))')
+
+        if where:
+            rows = (row_obj for row_obj in rows if all(
+                condition(row_obj.__getattribute__(field_name)) if callable(condition)
+                else row_obj.__getattribute__(field_name) == condition
+                for field_name, condition in where.items()
+            ))
+            steps.append(f'filter on {", ".join(where)}')
+
+        if order_field:
+            def sort_key(row_obj: Row):
+                return field_sort_key(row_obj.__getattribute__(order_field))
+
+            def sorted_rows(unsorted_rows: Iterable[Row]) -> Iterator[Row]:
+                if limit is None:
+                    yield from sorted(unsorted_rows, key=sort_key, reverse=descending)
+                elif descending:  # only the top rows are kept rather than sorting them all
+                    yield from heapq.nlargest(limit, unsorted_rows, key=sort_key)
+                else:
+                    yield from heapq.nsmallest(limit, unsorted_rows, key=sort_key)
+
+            rows = sorted_rows(rows)
+            steps.append(f'{"sort" if limit is None else f"top {limit} sort"} by {order_by}')
+
+        if limit is not None:
+            rows = islice(rows, limit)
+            steps.append(f'limit {limit}')
+
+        return steps, iter(rows)
+
+    def _attach_row(self, row_obj: Row) -> None:
+        """
+        Stores row_obj in self.row_dict (replacing any row with the same key),
+        adds it to any secondary indexes and links it to self
+        """
+        primary_key = row_obj.__getattribute__(self.row_class.key_field)
+        self.row_dict[primary_key] = row_obj
+        for field_name, index in self._indexes.items():
+            index.setdefault(row_obj.__getattribute__(field_name), dict())[primary_key] = row_obj
+
+        if type(primary_key) is int and primary_key >= 1:
+            self._take_key_id(primary_key)
+
+        row_obj._table = self
+
+    def _detach_row(self, primary_key) -> Row:
+        """
+        Removes and returns the row with key primary_key from self.row_dict (and any secondary indexes).
+        Raises a KeyError if this key is invalid.
+        """
+        row_obj = self.row_dict.pop(primary_key)
+        for field_name in self._indexes:
+            self._remove_from_index(field_name, row_obj.__getattribute__(field_name), primary_key)
+
+        if type(primary_key) is int and primary_key >= 1:
+            self._free_key_range(primary_key, primary_key + 1)
+
+        row_obj._table = None
+        return row_obj
+
+    def _take_key_id(self, key_id: int) -> None:
+        """
+        Removes key_id (now used by a row) from the free id ranges (see get_new_key_id())
+        """
+        if key_id > self._max_key_id:
+            if key_id > self._max_key_id + 1:  # every id between the old and new max is free
+                self._free_key_range(self._max_key_id + 1, key_id)
+            self._max_key_id = key_id
+            return
+
+        starts, ends = self._free_key_starts, self._free_key_ends
+        range_num = bisect_right(starts, key_id) - 1
+        if range_num < 0 or key_id >= ends[range_num]:  # not free (e.g. a row replaced by one with the same key)
+            return
+
+        start, end = starts[range_num], ends[range_num]
+        if start == key_id and end == key_id + 1:
+            del starts[range_num], ends[range_num]
+        elif start == key_id:
+            starts[range_num] = key_id + 1
+        elif end == key_id + 1:
+            ends[range_num] = key_id
+        else:  # split in two
+            ends[range_num] = key_id
+            starts.insert(range_num + 1, key_id + 1)
+            ends.insert(range_num + 1, end)
+
+    def _free_key_range(self, start: int, end: int) -> None:
+        """
+        Adds the ids from start up to (but not including) end, none of which are already free,
+        to the free id ranges (see get_new_key_id()) - merged with any adjacent range
+        """
+        starts, ends = self._free_key_starts, self._free_key_ends
+        range_num = bisect_right(starts, start)  # the first range after start
+        joins_previous = range_num > 0 and ends[range_num - 1] == start
+        joins_next = range_num < len(starts) and starts[range_num] == end
+        if joins_previous and joins_next:
+            ends[range_num - 1] = ends[range_num]
+            del starts[range_num], ends[range_num]
+        elif joins_previous:
+            ends[range_num - 1] = end
+        elif joins_next:
+            starts[range_num] = start
+        else:
+            starts.insert(range_num, start)
+            ends.insert(range_num, end)
+
+    def _remove_from_index(self, field_name: str, value, primary_key) -> None:
+        index = self._indexes[field_name]
+        index[value].pop(primary_key, None)
+        if not index[value]:  # no rows left with this value
+            del index[value]
+
+    def _record_change(self, op: str, row_obj: Row) -> None:
+        """
+        Marks the table as modified and passes the change to row_obj
+        to self.storage (if changes are being stored as they happen)
+
+        :param op: 'put' if row_obj was added/updated or 'del' if it was deleted
+        """
+        self._record_changes(op, (row_obj,))
+
+    def _record_changes(self, op: str, row_objs: Collection[Row]) -> None:
+        """
+        Same as _record_change() but for a batch of rows changed in the same way.
+        The rows are passed to self.storage together (e.g. so journal records are only flushed once).
+        """
+        self.is_modified = True
+        if self.storage:
+            if op == 'put':
+                self.storage.put(type(self), row_objs)
+            else:
+                key_field = self.row_class.key_field
+                self.storage.delete(type(self), [row_obj.__getattribute__(key_field) for row_obj in row_objs])
+
+        for listener in self.change_listeners:
+            listener(op, row_objs)
+
+    def apply_journal_record(self, op: str, payload: str) -> None:
+        """
+        Applies a single record read from a Journal (see Table._record_change()) to the table.
+        The record is not journaled again and no other side effects (e.g. deleting files) occur
+        but self.change_listeners are still told about the change.
+        Rows are validated again as they are created - multi-field updates are only journaled once complete
+        (see Row.updating()) so every record is of a valid row.
+        """
+        self.is_modified = True  # the change isn't in the table's file yet
+        changed_rows = ()
+        if op == 'put':
+            row_obj = self.row_class(*parse_row_string(payload))
+            primary_key = row_obj.__getattribute__(self.row_class.key_field)
+            if primary_key in self.row_dict:
+                self._detach_row(primary_key)
+            self._attach_row(row_obj)
+            changed_rows = (row_obj,)
+
+        elif op == 'del':
+            # keys are stored as text so integer keys (e.g. student_id) need converting back
+            if payload not in self.row_dict and payload.isdigit():
+                payload = int(payload)
+            if payload in self.row_dict:
+                changed_rows = (self._detach_row(payload),)
+
+        if changed_rows:
+            for listener in self.change_listeners:
+                listener(op, changed_rows)
+
+    def load_from_file(self, txt_file: TextIO,
+                       progress_callback: Callable[[int], None] = None, progress_interval: int = 1000,
+                       trusted: bool = False):
+        """
+        Given the output from an open() method, populates self with data from lines of text file.
+        Lines are read and parsed one at a time so the whole file is never held in memory.
+        The rows are then added as one batch (see add_rows()).
+
+        :param txt_file: the opened txt file to read rows from (closed once all rows are loaded)
+        :param progress_callback: if given, called with the number of rows loaded so far
+            every progress_interval rows and once more when loading is complete
+        :param progress_interval: number of rows to load between each call of progress_callback
+        :param trusted: if True, rows are created without validating their fields again
+            (see Row.from_field_strings()). Only for files known to have been written by save_to_file()
+        """
+        # iterating over the file object yields one line at a time
+        self.load_from_parsed_rows(map(parse_row_string, txt_file), progress_callback, progress_interval, trusted)
         txt_file.close()
+
+    def load_from_parsed_rows(self, parsed_rows: Iterable[List[str]],
+                              progress_callback: Callable[[int], None] = None, progress_interval: int = 1000,
+                              trusted: bool = False) -> int:
+        """
+        Populates self with rows created from the lists of field strings in parsed_rows
+        (e.g. parsed from a txt file by parse_row_string() or parse_table_file_chunk()).
+        The rows are added as one batch (see add_rows()).
+        See load_from_file() for the other parameters.
+
+        :return: the number of rows loaded
+        """
+        row_count = self.add_rows(self._rows_from_field_strings(parsed_rows, progress_callback,
+                                                                progress_interval, trusted))
+        if progress_callback:
+            progress_callback(row_count)
+
+        self.is_modified = False
         logging.debug(f'{type(self).__name__} object successfully populated from file - '
-                      f'added {len(txt_lines)} {self.row_class.__name__} objects')
+                      f'added {row_count} {self.row_class.__name__} objects')
+        return row_count
+
+    def _rows_from_field_strings(self, parsed_rows: Iterable[List[str]],
+                                 progress_callback: Optional[Callable[[int], None]],
+                                 progress_interval: int, trusted: bool) -> Iterable[Row]:
+        """
+        Yields a row object for every list of field strings in parsed_rows (see load_from_parsed_rows())
+        """
+        row_count = 0
+        for field_strings in parsed_rows:
+            if trusted:
+                yield self.row_class.from_field_strings(field_strings)
+            else:
+                yield self.row_class(*field_strings)
+            row_count += 1
+
+            if progress_callback and row_count % progress_interval == 0:
+                progress_callback(row_count)
 
     def save_to_file(self, txt_file: TextIO):
         """
-        Given the file output from an open('w') method, writes to the file the data within self
+        Given the file output from an open('w') method, writes to the file the data within self.
+        The file is synced to disk before it is closed.
         """
-        for row_object in self.row_dict.values():
-            txt_file.write(row_object.tabulate())
+        txt_file.writelines(row_object.tabulate() for row_object in self.row_dict.values())
 
-        txt_file.close()
+        sync_and_close(txt_file)
+        self.is_modified = False
         logging.debug(f'{type(self).__name__} object successfully saved to file')
 
+    def load_from_binary_file(self, bin_file: BinaryIO, trusted: bool = True):
+        """
+        Given the output from an open('rb') method, populates self with the rows of a binary table file.
+        Rows are created directly from the stored values without being validated again
+        since they were already validated before they were saved.
+
+        :param bin_file: the opened binary file to read rows from (closed once all rows are loaded)
+        :param trusted: if False, every field is validated again as if the row was loaded from a txt file
+        """
+        field_names, rows = binary_tables.read_rows(bin_file)
+        row_objs = [self.row_class.from_field_values(dict(zip(field_names, row_values))) for row_values in rows]
+        if not trusted:
+            row_objs = (self.row_class(*parse_row_string(row_obj.tabulate())) for row_obj in row_objs)
+        self.add_rows(row_objs)
+
+        bin_file.close()
+        self.is_modified = False
+        logging.debug(f'{type(self).__name__} object successfully populated from binary file - '
+                      f'added {len(rows)} {self.row_class.__name__} objects')
+
+    def save_to_binary_file(self, bin_file: BinaryIO):
+        """
+        Given the file output from an open('wb') method, writes to the file the data within self
+        in the binary table format (see data_tables.binary_tables).
+        The file is synced to disk before it is closed.
+        """
+        binary_tables.write_rows(self.row_dict.values(), bin_file)
+
+        sync_and_close(bin_file)
+        self.is_modified = False
+        logging.debug(f'{type(self).__name__} object successfully saved to binary file')
+
 
 class StudentLogin(Row):
     key_field = 'username'
+    fields = ('username', 'password_hash', 'student_id')
+    __slots__ = fields
+    field_parsers = {'student_id': int}
 
     def __init__(self, username: str, password_hash: str, student_id: Union[int, str]):
         self.username = validate_length(username, 2, 30, 'Username')
@@ -225,10 +884,29 @@ class StudentLogin(Row):
 class StudentLoginTable(Table):
     row_class = StudentLogin
     row_dict: Dict[str, StudentLogin]
+    secondary_indexes = ('student_id',)
 
 
 class Student(Row):
     key_field = 'student_id'
+    fields = ('student_id', 'centre_id', 'award_level', 'year_group', 'is_approved', 'fullname', 'gender',
+              'date_of_birth', 'address', 'phone_primary', 'email_primary', 'phone_emergency', 'primary_lang',
+              'submission_date', 'vol_info_id', 'skill_info_id', 'phys_info_id')
+    __slots__ = fields
+    field_parsers = {
+        'student_id': int,
+        'centre_id': int,
+        'award_level': sys.intern,
+        'year_group': sys.intern,
+        'is_approved': int,
+        'gender': sys.intern,
+        'date_of_birth': parse_date_field,
+        'primary_lang': sys.intern,
+        'submission_date': parse_date_field,
+        'vol_info_id': parse_int_field,
+        'skill_info_id': parse_int_field,
+        'phys_info_id': parse_int_field,
+    }
 
     def __init__(self, student_id: Union[int, str], centre_id: Union[int, str], award_level: str,
                  year_group: Union[int, str], is_approved: Union[int, str] = 0,
@@ -327,15 +1005,16 @@ class Student(Row):
 
         logging.debug('All validation checks passed on input data for student enrolment.')
 
-        self.fullname = fullname
-        self.gender = gender
-        self.date_of_birth = date_of_birth
-        self.address = address
-        self.phone_primary = phone_primary
-        self.email_primary = email_primary
-        self.phone_emergency = phone_emergency
-        self.primary_lang = primary_lang
-        self.submission_date = dt.datetime.now()
+        with self.updating():  # journaled as one complete row
+            self.fullname = fullname
+            self.gender = gender
+            self.date_of_birth = date_of_birth
+            self.address = address
+            self.phone_primary = phone_primary
+            self.email_primary = email_primary
+            self.phone_emergency = phone_emergency
+            self.primary_lang = primary_lang
+            self.submission_date = dt.datetime.now()
 
         logging.debug(f'New Student object fully created '
                       f'- student_id={self.student_id} fullname={self.fullname!r}')
@@ -387,12 +1066,14 @@ class Student(Row):
         else:
             return None
 
-    def get_progress_summary(self, section_table: SectionTable, resource_table: ResourceTable) -> str:
+    def get_progress_summary(self, section_table: SectionTable, resource_table: ResourceTable,
+                             now: dt.datetime = None) -> str:
         """
         Returns a string summarising the student's current progress through the award.
 
         :param section_table: Used to check the sections associated with the student
         :param resource_table: Used to check if an assessor's report exists for a section
+        :param now: the datetime to find the progress at (default: resource_table.clock())
         :return: One of 'Fully complete', 'Partially complete', 'All sections in progress',
             'Partially in progress', 'None started', 'Pending enrolment' or 'Needs approval'
         """
@@ -405,7 +1086,7 @@ class Student(Row):
                 if section_id:
                     section_started_count += 1
                     section_obj = section_table.row_dict[section_id]
-                    if section_obj.get_activity_status(resource_table) == 'Fully completed':
+                    if section_obj.get_activity_status(resource_table, now) == 'Fully completed':
                         section_finished_count += 1
 
             if section_finished_count == 3:  # todo: doesn't consider expeditions
@@ -430,9 +1111,9 @@ class Student(Row):
         Returns the username of self using the login_table provided.
         If the student does not have a login for whatever reason, returns None
         """
-        for username, login in login_table.row_dict.items():
-            if login.student_id == self.student_id:
-                return username
+        login_list = login_table.lookup('student_id', self.student_id)
+        if login_list:
+            return login_list[0].username
 
         return None
 
@@ -440,10 +1121,20 @@ class Student(Row):
 class StudentTable(Table):
     row_class = Student
     row_dict: Dict[int, Student]
+    secondary_indexes = ('award_level',)
 
 
 class Section(Row):
     key_field = 'section_id'
+    fields = ('section_id', 'section_type', 'activity_start_date', 'activity_timescale', 'activity_type',
+              'activity_details', 'activity_goals', 'assessor_fullname', 'assessor_phone', 'assessor_email')
+    __slots__ = fields
+    field_parsers = {
+        'section_id': int,
+        'section_type': sys.intern,
+        'activity_start_date': parse_date_field,
+        'activity_timescale': sys.intern,
+    }
 
     def __init__(self, section_id: Union[int, str], section_type: str,
                  activity_start_date: str, activity_timescale: str,
@@ -505,26 +1196,43 @@ class Section(Row):
         }
         return super().tabulate(padding_values, special_str_funcs)
 
-    def get_activity_status(self, resource_table: ResourceTable) -> str:
+    def get_activity_status(self, resource_table: ResourceTable, now: dt.datetime = None) -> str:
         """
         Returns a string describing the student's current progress through the section.
         Note that a status of ‘Not Started’ must be set at call and not from this method
         since there will be no Section obj to call this method from.
 
+        The status is cached by resource_table until it could change (see ResourceTable.get_cached_section_status()).
+        The cache is neither read nor written if now is given since its statuses are only valid at
+        the time of resource_table.clock().
+
         :param resource_table: Needed to check for the presence of an assessor's report for the section
+        :param now: the datetime to find the status at (default: resource_table.clock())
         :return: One of 'Fully completed', 'Needs report' or 'In progress'
         """
+        use_cache = now is None
+        if use_cache:
+            cached_status = resource_table.get_cached_section_status(self)
+            if cached_status:
+                return cached_status
+            now = resource_table.clock()
+
         proposed_end_date = calculate_end_date(int(self.activity_timescale), self.activity_start_date)
 
-        if date_in_past(proposed_end_date):
-            section_resources = [r for r in resource_table.row_dict.values() if r.parent_link_id == self.section_id]
+        if date_in_past(proposed_end_date, now):
+            section_resources = resource_table.lookup('parent_link_id', self.section_id)
             report_is_present = any([r.is_section_report for r in section_resources])
             if report_is_present:
-                return 'Fully completed'
+                status = 'Fully completed'
             else:
-                return 'Needs report'
+                status = 'Needs report'
+            if use_cache:
+                resource_table.cache_section_status(self, status)
         else:
-            return 'In progress'
+            status = 'In progress'
+            if use_cache:
+                resource_table.cache_section_status(self, status, expiry_date=proposed_end_date)
+        return status
         # ‘Not Started’ status handled at method call (and not here) since section object won't exist in this case
 
 
@@ -535,6 +1243,17 @@ class SectionTable(Table):
 
 class Resource(Row):
     key_field = 'resource_id'
+    fields = ('resource_id', 'file_path', 'is_section_report', 'resource_type', 'parent_link_id', 'date_uploaded')
+    # file_path is stored as a string (much smaller than a Path object) - see the file_path property
+    __slots__ = ('resource_id', '_file_path', 'is_section_report', 'resource_type', 'parent_link_id',
+                 'date_uploaded')
+    field_parsers = {
+        'resource_id': int,
+        'is_section_report': int,
+        'resource_type': sys.intern,
+        'parent_link_id': int,
+        'date_uploaded': parse_date_field,
+    }
 
     def __init__(self, resource_id: Union[int, str], file_path: Union[Path, str],
                  is_section_report: Union[int, str], resource_type: str,
@@ -567,6 +1286,14 @@ class Resource(Row):
                f'is_section_report={self.is_section_report} ' \
                f'resource_type={self.resource_type!r} parent_link_id={self.parent_link_id}>'
 
+    @property
+    def file_path(self) -> Path:
+        return Path(self._file_path)
+
+    @file_path.setter
+    def file_path(self, file_path: Union[Path, str]) -> None:
+        self._file_path = str(file_path)
+
     def tabulate(self, padding_values=None, special_str_funcs=None):
         padding_values = {
             'resource_id': INTERNAL_ID_LEN,
@@ -585,6 +1312,80 @@ class Resource(Row):
 class ResourceTable(Table):
     row_class = Resource
     row_dict: Dict[int, Resource]
+    secondary_indexes = ('parent_link_id',)
+
+    def __init__(self, start_table: Collection[Resource] = None,
+                 clock: Callable[[], dt.datetime] = dt.datetime.now):
+        """
+        :param clock: function returning the current datetime, used to find section statuses and when
+            they expire (replace to control time in tests - see set_clock())
+        """
+        self.clock = clock
+        # section_id: (activity_start_date, activity_timescale, status)
+        # for sections whose status has been found since their resources last changed (see get_cached_section_status())
+        self._section_status_cache: Dict[int, Tuple[dt.datetime, str, str]] = dict()
+        # section_id: date its cached status expires (e.g. 'In progress' once the section's end date passes)
+        self.section_status_deadlines = DeadlineScheduler(clock)
+        super().__init__(start_table)
+
+    def get_cached_section_status(self, section_obj: Section) -> Optional[str]:
+        """
+        Returns the status of section_obj last found by Section.get_activity_status() (see cache_section_status())
+        or None if it must be found again - i.e. a resource of the section has since been added, deleted or changed,
+        the section's start date or timescale has changed or the status has expired (the section's end date passed).
+        """
+        for section_id in self.section_status_deadlines.pop_due():
+            self._section_status_cache.pop(section_id, None)
+
+        cached = self._section_status_cache.get(section_obj.section_id)
+        if cached is None:
+            return None
+
+        start_date, timescale, status = cached
+        if start_date != section_obj.activity_start_date or timescale != section_obj.activity_timescale:
+            return None
+        return status
+
+    def cache_section_status(self, section_obj: Section, status: str, expiry_date: dt.datetime = None) -> None:
+        """
+        Caches the status of section_obj (see get_cached_section_status())
+
+        :param expiry_date: date after which the status is no longer valid, if any (e.g. the section's end date)
+        """
+        self._section_status_cache[section_obj.section_id] = (section_obj.activity_start_date,
+                                                              section_obj.activity_timescale, status)
+        if expiry_date:
+            self.section_status_deadlines.schedule(section_obj.section_id, expiry_date)
+        else:
+            self.section_status_deadlines.cancel(section_obj.section_id)
+
+    def set_clock(self, clock: Callable[[], dt.datetime]) -> None:
+        """
+        Replaces the function returning the current datetime (see __init__()).
+        The section status cache is cleared since cached statuses may have expired by the new clock.
+        """
+        self.clock = clock
+        self.section_status_deadlines.clock = clock
+        self.clear_section_status_cache()
+
+    def clear_section_status_cache(self) -> None:
+        self._section_status_cache.clear()
+        self.section_status_deadlines.clear()
+
+    def _attach_row(self, row_obj: Resource) -> None:
+        super()._attach_row(row_obj)
+        self._section_status_cache.pop(row_obj.parent_link_id, None)
+
+    def _detach_row(self, primary_key) -> Resource:
+        row_obj = super()._detach_row(primary_key)
+        self._section_status_cache.pop(row_obj.parent_link_id, None)
+        return row_obj
+
+    def row_updated(self, row_obj: Resource, attr_name: str, old_val) -> None:
+        if attr_name == 'parent_link_id':  # the resource has moved from another section
+            self._section_status_cache.pop(old_val, None)
+        self._section_status_cache.pop(row_obj.parent_link_id, None)
+        super().row_updated(row_obj, attr_name, old_val)
 
     def add_student_resources(self, selected_file_list: List[TextIO], student_id: int,
                               section_id: int) -> int:
@@ -636,11 +1437,8 @@ class ResourceTable(Table):
         :param section_id: id of section to check
         :return: boolean of whether there is a report associated with section already
         """
-        for resource in self.row_dict.values():
-            if resource.resource_type == 'section_evidence' and resource.parent_link_id == section_id:
-                if resource.is_section_report:
-                    return True
-        return False
+        section_evidence = self.select(where={'parent_link_id': section_id, 'resource_type': 'section_evidence'})
+        return any(resource.is_section_report for resource in section_evidence)
 
     def delete_row(self, primary_key):
         file_path = self.row_dict[primary_key].file_path
@@ -654,6 +1452,8 @@ class ResourceTable(Table):
 
 class Staff(Row):
     key_field = 'username'
+    fields = ('username', 'password_hash', 'fullname')
+    __slots__ = fields
 
     def __init__(self, username: str, password_hash: str, fullname: str):
         # wouldbenice: staff detail table (similar to student table)
@@ -684,17 +1484,29 @@ class StaffTable(Table):
 
 
 class Database:
-    def __init__(self):
+    def __init__(self, table_format: str = 'txt'):
         """
         When initialised, automatically initialises one instance of each 'Table' in this .py file.
         These are all added to the self.database dict for access.
+
+        :param table_format: format (one of TABLE_FORMATS) that tables are loaded from and saved in
         """
+        self.table_format = validate_lookup(table_format, set(TABLE_FORMATS), 'Table format')
+
         table_list = Table.__subclasses__()
         self.database: Dict[str, Table] = dict()
         for table_cls in table_list:
             # creates instance of table and adds to database with key of table name
             self.database[table_cls.__name__] = table_cls()
 
+        # the storage backend (if open) that all table changes are passed to as they happen,
+        # the journal it appends them to (txt/bin tables only) and the suffix of the tables they belong to
+        self.storage: Optional[StorageBackend] = None
+        self.journal: Optional[Journal] = None
+        self.journal_suffix = ''
+        # filename suffix of the tables last loaded/saved - unmodified tables are identical to these files
+        self.state_suffix: Optional[str] = None
+
         logging.debug(f'Database initialisation created {len(table_list)} '
                       f'table(s) automatically: {", ".join(self.database)}')
 
@@ -717,18 +1529,157 @@ class Database:
 
         return txt_db_path
 
-    def load_state_from_file(self, suffix=''):
+    def get_table_path(self, table_name: str, suffix='') -> Path:
+        """
+        Returns the path of the file that table table_name is stored in (using self.table_format)
+        """
+        return self.get_txt_database_dir() / f'{table_name}{suffix}.{self.table_format}'
+
+    def get_storage(self, suffix='', journal: Optional[Journal] = None, create: bool = True) -> StorageBackend:
+        """
+        Returns a new storage backend (see data_tables.storage) for the tables with filename suffix 'suffix'
+        in self.table_format. It should be closed once it is no longer needed.
+
+        :param journal: the journal that a txt/bin file backend appends changes to (see open_journal())
+        :param create: if False, a FileNotFoundError is raised instead of creating a missing SQLite database file
+        """
+        # only imported here to prevent circular import
+        from data_tables.storage import FileBackend, SqliteBackend
+
+        if self.table_format == 'sqlite':
+            return SqliteBackend(self.get_txt_database_dir(), suffix, create)
+        return FileBackend(self.get_txt_database_dir(), suffix, self.table_format, journal)
+
+    def get_journal_path(self, suffix='') -> Path:
+        """
+        Returns the path of the journal file belonging to the tables with filename suffix 'suffix'
+        """
+        return self.get_txt_database_dir() / f'Journal{suffix}.txt'
+
+    def get_checksum_path(self, suffix='') -> Path:
+        """
+        Returns the path of the file holding the checksums of the table files with filename suffix 'suffix'
+        """
+        return self.get_txt_database_dir() / f'Checksums{suffix}.txt'
+
+    def read_checksums(self, suffix='') -> Dict[str, str]:
+        """
+        Returns a dictionary of table filename: SHA-256 checksum of every table file with filename suffix 'suffix'
+        as recorded when they were last saved by save_state_to_file().
+        The dictionary is empty if no checksums have been saved.
+        """
+        checksum_path = self.get_checksum_path(suffix)
+        if not checksum_path.exists():
+            return dict()
+
+        checksum_dict = dict()
+        with checksum_path.open(mode='r', encoding='utf-8') as fobj:
+            for line in fobj:
+                if line.strip():
+                    # filenames can contain spaces (e.g. suffix ' (backup)') but checksums can't
+                    file_name, checksum = line.rstrip('\n').rsplit(' ', maxsplit=1)
+                    checksum_dict[file_name] = checksum
+        return checksum_dict
+
+    def open_journal(self, suffix=''):
+        """
+        Starts storing every change made to the database's tables as it happens.
+        For txt/bin tables, changes are appended to the journal for the tables with filename suffix 'suffix'
+        (see data_tables.journal.Journal). SQLite tables are updated directly (see storage.SqliteBackend).
+        Should be called after the database state has been loaded from these tables.
+        """
+        self.close_journal()
+
+        if self.table_format != 'sqlite':
+            self.journal = Journal(self.get_journal_path(suffix))
+            self.journal.open()
+        self.storage = self.get_storage(suffix, self.journal)
+        self.journal_suffix = suffix
+        for table_obj in self.database.values():
+            table_obj.storage = self.storage
+
+        logging.info(f'Journaling of database changes started (using {suffix!r} as table filename suffix)')
+
+    def close_journal(self):
+        """
+        Stops storing changes made to the database's tables as they happen. Any stored changes are kept on disk.
+        """
+        if self.storage:
+            self.storage.close()
+            self.storage = None
+            self.journal = None
+            for table_obj in self.database.values():
+                table_obj.storage = None
+
+    def write_checksums(self, checksum_dict: Dict[str, str], suffix='') -> None:
         """
-        Loads the entire database state from txt files into memory
+        Replaces the checksum file for the tables with filename suffix 'suffix' (see read_checksums())
+        with the checksums in checksum_dict. The file is replaced atomically so is always complete.
+        """
+        checksum_path = self.get_checksum_path(suffix)
+        temp_path = get_temp_path(checksum_path)
+        with temp_path.open(mode='w', encoding='utf-8') as fobj:
+            fobj.writelines(f'{file_name} {checksum}\n' for file_name, checksum in checksum_dict.items())
+            sync_and_close(fobj)
+        os.replace(temp_path, checksum_path)
+        sync_directory(self.get_txt_database_dir())
+
+    def recover_interrupted_save(self, suffix='') -> None:
+        """
+        Finishes or undoes a save of the tables with filename suffix 'suffix' that was interrupted (e.g. by a crash)
+        using the temporary table files left behind (see save_state_to_file()).
+        Temporary files matching the saved checksums were committed so replace their tables.
+        Any others were never committed so are deleted, leaving the previously saved tables as they were.
+        """
+        checksum_dict = self.read_checksums(suffix)
+        for table_name in self.database.keys():
+            table_path = self.get_table_path(table_name, suffix)
+            temp_path = get_temp_path(table_path)
+            if not temp_path.exists():
+                continue
+
+            if checksum_dict.get(table_path.name) == file_checksum(temp_path):
+                os.replace(temp_path, table_path)
+                logging.warning(f'Completed interrupted save of "{table_path!s}"')
+            else:
+                temp_path.unlink()
+                logging.warning(f'Discarded uncommitted save of "{table_path!s}" left by an interrupted save')
+
+        sync_directory(self.get_txt_database_dir())
+
+    def load_state_from_file(self, suffix='', verify=False, parallel: Optional[bool] = None):
+        """
+        Loads the entire database state from txt (or binary) files into memory
         after clearing current state.
-        Handled using each Table object's load_from_file method.
+        Handled using each Table object's load_from_file (or load_from_binary_file) method.
+        Any changes recorded in the journal for these tables are then replayed on top.
         If even one table is missing, no tables are loaded (due to links between tables)
         and a FileNotFoundError is raised.
         If suffix is given, appends this to each table's filename when saving (use for backups).
+
+        A save that was interrupted is first completed or undone (see recover_interrupted_save()).
+
+        Table files whose checksum matches the one recorded when they were saved by save_state_to_file()
+        are trusted and loaded without validating every field again. Any other file (e.g. edited by hand)
+        is fully validated, as is every file if verify is True.
+
+        If parallel is True, txt tables are parsed by a pool of worker processes (one per CPU core).
+        By default (None), this is only done once the tables are at least PARALLEL_LOAD_MIN_SIZE bytes in total
+        since starting the worker processes takes longer than parsing small tables.
+        Binary tables are always loaded in this process since they don't need parsing.
+
+        SQLite tables (see storage.SqliteBackend) are loaded from the database file with filename suffix 'suffix'.
+        SQLite commits are already atomic so they have no checksums and are trusted unless verify is True.
         """
+        if self.table_format == 'sqlite':
+            self._load_state_from_storage(suffix, verify)
+            return
+
+        self.recover_interrupted_save(suffix)
+
         load_path_list = list()
         for table_name in self.database.keys():
-            new_load_path = self.get_txt_database_dir() / f'{table_name}{suffix}.txt'
+            new_load_path = self.get_table_path(table_name, suffix)
             load_path_list.append(new_load_path)
             if not new_load_path.exists():  # a table is missing
                 error_str = f'The file {new_load_path} does not exist but should. ' \
@@ -736,36 +1687,257 @@ class Database:
                 logging.error(error_str)
                 raise FileNotFoundError(error_str)
 
+        self.close_journal()  # the journal no longer matches the state in memory
+
+        checksum_dict = dict() if verify else self.read_checksums(suffix)
+        trusted_list = list()
         for load_path, table_obj in zip(load_path_list, self.database.values()):
             previous_row_count = len(table_obj.row_dict)
-            table_obj.row_dict = dict()  # clears table
+            table_obj.clear()
             logging.debug(f'Cleared {previous_row_count} rows/{table_obj.row_class.__name__} '
                           f'object(s) from {type(table_obj).__name__} table successfully')
 
-            with load_path.open(mode='r') as fobj:
-                table_obj.load_from_file(fobj)
+            is_trusted = load_path.name in checksum_dict and checksum_dict[load_path.name] == file_checksum(load_path)
+            if not is_trusted and not verify:
+                logging.warning(f'"{load_path!s}" has no matching saved checksum - all fields will be validated')
+            trusted_list.append(is_trusted)
+        trusted_count = sum(trusted_list)
+
+        if parallel is None:
+            total_size = sum(load_path.stat().st_size for load_path in load_path_list)
+            parallel = total_size >= PARALLEL_LOAD_MIN_SIZE and (os.cpu_count() or 1) > 1
+
+        if parallel and self.table_format == 'txt':
+            self._load_txt_tables_in_parallel(load_path_list, trusted_list)
+        else:
+            storage = self.get_storage(suffix)
+            for table_obj, is_trusted in zip(self.database.values(), trusted_list):
+                storage.load(table_obj, trusted=is_trusted)
+
+        self.state_suffix = suffix
+
+        replayed_count = 0
+        for op, table_name, payload in Journal(self.get_journal_path(suffix)).read_records():
+            self.get_table_by_name(table_name).apply_journal_record(op, payload)
+            replayed_count += 1
 
         logging.info(
-            f'{len(load_path_list)} populated table(s) successfully loaded into Database object. '
+            f'{len(load_path_list)} populated table(s) ({trusted_count} trusted without validation) '
+            f'successfully loaded into Database object and {replayed_count} journaled change(s) replayed. '
             f'(from "{self.get_txt_database_dir()!s}" using {suffix!r} as table filename suffix)')
 
-    def save_state_to_file(self, suffix=''):
+    def _load_state_from_storage(self, suffix: str, verify: bool):
         """
-        Saves the entire database state to txt files from memory.
-        Handled using each Table object's save_to_file method.
-        If suffix is given, appends this to each table's filename when saving (use for backups).
+        Loads the entire database state from the SQLite database with filename suffix 'suffix'
+        (see load_state_from_file()). Raises a FileNotFoundError if any table is missing.
+        """
+        self.close_journal()  # changes are no longer being stored for the state in memory
+
+        storage = self.get_storage(suffix, create=False)
+        try:
+            for table_name in self.database.keys():
+                if not storage.exists(table_name):
+                    error_str = f'The table {table_name} does not exist in {storage!r} but should. ' \
+                                f'Table load aborted and no tables loaded into memory.'
+                    logging.error(error_str)
+                    raise FileNotFoundError(error_str)
+
+            for table_obj in self.database.values():
+                table_obj.clear()
+                storage.load(table_obj, trusted=not verify)
+        finally:
+            storage.close()
+
+        self.state_suffix = suffix
+        logging.info(f'{len(self.database)} populated table(s) successfully loaded into Database object '
+                     f'from {storage!r}')
+
+    def _load_txt_tables_in_parallel(self, load_path_list: List[Path], trusted_list: List[bool]):
         """
-        for table_name, table_obj in self.database.items():
-            save_path = self.get_txt_database_dir() / f'{table_name}{suffix}.txt'
+        Loads every txt table file in load_path_list into its table (in the same order as self.database).
+        Each file is split into chunks (see get_file_chunks()) which are parsed by a pool of worker processes.
+        Rows of untrusted files are validated by the workers too. The parsed field strings are handed back in order
+        and the rows are created (without validating them again) and added in this process.
 
-            with save_path.open(mode='w+') as fobj:
-                table_obj.save_to_file(fobj)
+        :param load_path_list: path of each table's txt file
+        :param trusted_list: whether each table's file is trusted (see load_state_from_file())
+        """
+        file_chunk_lists = [get_file_chunks(load_path) for load_path in load_path_list]
+        chunk_paths, chunk_starts, chunk_ends, chunk_row_classes = list(), list(), list(), list()
+        for load_path, chunk_list, table_obj, is_trusted in zip(load_path_list, file_chunk_lists,
+                                                                self.database.values(), trusted_list):
+            for start, end in chunk_list:
+                chunk_paths.append(load_path)
+                chunk_starts.append(start)
+                chunk_ends.append(end)
+                chunk_row_classes.append(None if is_trusted else table_obj.row_class)
+
+        max_workers = max(1, min(len(chunk_paths), os.cpu_count() or 1))
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            # results are returned in order as soon as each is ready, while later chunks are still being parsed
+            parsed_chunks = executor.map(parse_table_file_chunk, chunk_paths, chunk_starts, chunk_ends,
+                                         chunk_row_classes)
+            for table_obj, chunk_list in zip(self.database.values(), file_chunk_lists):
+                table_rows = chain.from_iterable(next(parsed_chunks) for _ in chunk_list)
+                table_obj.load_from_parsed_rows(table_rows, trusted=True)  # validated by the workers if needed
+
+        logging.debug(f'{len(chunk_paths)} chunk(s) of {len(load_path_list)} txt table(s) '
+                      f'parsed by {max_workers} worker process(es)')
+
+    def save_state_to_file(self, suffix='', full_save=False):
+        """
+        Saves the entire database state to txt (or binary) files from memory.
+        Handled using each Table object's save_to_file (or save_to_binary_file) method.
+        Tables that haven't been modified since they were last loaded from/saved to
+        these same files are skipped.
+        If suffix is given, appends this to each table's filename when saving (use for backups).
+
+        If the journal for these tables is open, it already holds every change since the last
+        full save so it is just synced to disk instead - unless full_save is True,
+        the journal has grown larger than JOURNAL_MAX_RECORDS or a table file is missing.
+        After a full save, the journal for these tables is emptied.
+
+        Saves are crash-safe: each table is written to a temporary file (see get_temp_path()) and synced to disk.
+        Once every table has been written, the checksum file (see get_checksum_path()) is replaced,
+        committing all the new tables as one generation, and only then do the temporary files replace the tables.
+        If the program crashes before the commit, the old tables are kept; if it crashes after,
+        the remaining new tables are moved into place on the next load (see recover_interrupted_save()).
+
+        SQLite tables are saved to their database file instead (see storage.SqliteBackend).
+        """
+        if self.table_format == 'sqlite':
+            self._save_state_to_storage(suffix, full_save)
+            return
+
+        save_path_dict = {table_name: self.get_table_path(table_name, suffix)
+                          for table_name in self.database.keys()}
+
+        journal_in_use = self.journal is not None and self.journal_suffix == suffix
+        if journal_in_use and not full_save and self.journal.record_count <= JOURNAL_MAX_RECORDS:
+            if all(save_path.exists() for save_path in save_path_dict.values()):
+                self.journal.sync()
+                logging.info(
+                    f'{self.journal.record_count} journaled change(s) synced to disk instead of '
+                    f'saving all tables. (in "{self.get_journal_path(suffix)!s}")')
+                return
+
+        # checksums of skipped (unchanged) files are kept so they are still trusted on the next load
+        checksum_dict = self.read_checksums(suffix)
+        saved_table_dict: Dict[Path, Table] = dict()  # save path: table saved to that path's temporary file
+        storage = self.get_storage(suffix)
+        try:
+            for table_name, table_obj in self.database.items():
+                save_path = save_path_dict[table_name]
+                if suffix == self.state_suffix and not table_obj.is_modified and save_path.exists():
+                    logging.debug(f'{table_name} not modified since last load/save - skipped saving')
+                    if save_path.name not in checksum_dict:  # file was validated when loaded so can now be trusted
+                        checksum_dict[save_path.name] = file_checksum(save_path)
+                    continue
+
+                temp_path = get_temp_path(save_path)
+                saved_table_dict[save_path] = table_obj
+                storage.save(table_obj, save_path=temp_path)
+                checksum_dict[save_path.name] = file_checksum(temp_path)
+
+            # the commit point - from now on the new tables are the saved state, even if they haven't been moved yet
+            self.write_checksums(checksum_dict, suffix)
+        except BaseException:
+            for save_path, table_obj in saved_table_dict.items():
+                get_temp_path(save_path).unlink(missing_ok=True)
+                table_obj.is_modified = True  # its changes still haven't been saved
+            raise
+
+        for save_path in saved_table_dict:
+            os.replace(get_temp_path(save_path), save_path)
+        sync_directory(self.get_txt_database_dir())
+        saved_count = len(saved_table_dict)
+
+        self.state_suffix = suffix
+
+        # all journaled changes are now included in the saved tables.
+        # A journal left over from another session is also emptied since replaying it would undo newer changes
+        if journal_in_use:
+            self.journal.reset()
+        elif self.get_journal_path(suffix).exists():
+            Journal(self.get_journal_path(suffix)).reset()
 
         logging.info(
-            f'All {len(self.database.items())} table(s) in Database object '
-            f'successfully saved to txt files. '
+            f'{saved_count} modified table(s) out of {len(self.database.items())} in Database object '
+            f'successfully saved to {self.table_format} files. '
             f'(in "{self.get_txt_database_dir()!s}" using {suffix!r} as table filename suffix)')
 
+    def _save_state_to_storage(self, suffix: str, full_save: bool):
+        """
+        Saves the entire database state to the SQLite database with filename suffix 'suffix'
+        (see save_state_to_file()). If changes are already being stored in this database as they happen
+        (see open_journal()), it is just synced to disk instead unless full_save is True.
+        """
+        storage_in_use = self.storage is not None and self.journal_suffix == suffix
+        if storage_in_use and not full_save:
+            self.storage.sync()
+            logging.info(f'Changes stored as they happened synced to disk instead of saving all tables. '
+                         f'(in {self.storage!r})')
+            return
+
+        storage = self.storage if storage_in_use else self.get_storage(suffix)
+        saved_count = 0
+        try:
+            for table_name, table_obj in self.database.items():
+                if suffix == self.state_suffix and not table_obj.is_modified and storage.exists(table_name):
+                    logging.debug(f'{table_name} not modified since last load/save - skipped saving')
+                    continue
+
+                storage.save(table_obj)
+                saved_count += 1
+            storage.sync()
+        finally:
+            if not storage_in_use:
+                storage.close()
+
+        self.state_suffix = suffix
+        logging.info(f'{saved_count} modified table(s) out of {len(self.database)} in Database object '
+                     f'successfully saved to {storage!r}')
+
+    def convert_table_format(self, new_format: str, suffix=''):
+        """
+        Saves every table in the new format new_format (one of TABLE_FORMATS)
+        using filename suffix 'suffix' and uses this format for all future loads/saves.
+        Tables in the old format are left as they are but any journaled changes are only included in the new files.
+        If changes were being stored as they happen (see open_journal()), they are stored in the new format from now on.
+        """
+        reopen_suffix = self.journal_suffix if self.storage else None
+        self.close_journal()
+
+        self.table_format = validate_lookup(new_format, set(TABLE_FORMATS), 'Table format')
+        self.state_suffix = None  # no files in the new format have been loaded/saved yet
+        self.save_state_to_file(suffix=suffix, full_save=True)
+        if new_format == 'sqlite' and self.get_journal_path(suffix).exists():
+            Journal(self.get_journal_path(suffix)).reset()  # already emptied by saving txt/bin tables
+
+        if reopen_suffix is not None:
+            self.open_journal(reopen_suffix)
+
+        logging.info(f'Database tables converted to {new_format} format (using {suffix!r} as table filename suffix)')
+
+    def open_record_index(self, table_name: str, suffix=''):
+        """
+        Returns a TableFileIndex (see data_tables.record_index) of the saved txt file for table_name
+        with filename suffix 'suffix', including any changes journaled since it was saved.
+        Single rows can then be read from the file by key without loading the whole table into memory.
+        Raises a KeyError if table_name is not a valid table name
+        and a FileNotFoundError if the table's file does not exist.
+        """
+        from data_tables.record_index import TableFileIndex  # only imported here to prevent circular import
+
+        table_cls = type(self.get_table_by_name(table_name))
+        txt_path = self.get_txt_database_dir() / f'{table_name}{suffix}.txt'
+        if not txt_path.exists():
+            error_str = f'The file {txt_path} does not exist so it cannot be indexed.'
+            logging.error(error_str)
+            raise FileNotFoundError(error_str)
+
+        return TableFileIndex(table_cls, txt_path, self.get_journal_path(suffix))
+
     def get_table_by_name(self, table_name) -> Table:
         """
         Returns the table_name Table object from the database
@@ -0,0 +1,110 @@
+import logging
+import os
+from pathlib import Path
+from typing import Iterable, Iterator, Optional, TextIO, Tuple
+
+# Each journal record takes up exactly one line in the form '{op} {table_name} {payload}'
+# op is one of JOURNAL_OPS; the payload is a (compacted) tabulated row for 'put' or a primary key for 'del'
+JOURNAL_OPS = ('put', 'del')
+
+
+class Journal:
+    def __init__(self, journal_path: Path):
+        """
+        An append-only write-ahead journal of changes made to a Database's tables.
+        Every added, updated or deleted row is appended to the journal file as one record
+        so that changes made since the last full save survive a crash.
+        The records are replayed on top of the last full save when the database is next loaded.
+
+        Records are idempotent ('put' stores the full row, 'del' removes a row if present)
+        so replaying a journal on top of a newer full save still results in the correct state.
+
+        :param journal_path: path to the journal txt file (created on open() if it doesn't exist)
+        """
+        self.journal_path = journal_path
+        self.record_count = 0  # total number of records currently in the journal file
+        self._fobj: Optional[TextIO] = None
+
+    def __repr__(self) -> str:
+        return f'<Journal object at "{self.journal_path!s}" with {self.record_count} record(s)>'
+
+    def open(self) -> None:
+        """
+        Opens the journal file so that new records can be appended.
+        Any records already in the file (e.g. from a session that crashed) are kept.
+        """
+        self.record_count = sum(1 for _ in self.read_records())
+        self._fobj = self.journal_path.open(mode='a', encoding='utf-8')
+        logging.debug(f'Opened journal "{self.journal_path!s}" containing {self.record_count} record(s)')
+
+    def close(self) -> None:
+        if self._fobj:
+            self.sync()
+            self._fobj.close()
+            self._fobj = None
+            logging.debug(f'Closed journal "{self.journal_path!s}"')
+
+    def append(self, op: str, table_name: str, payload: str) -> None:
+        """
+        Appends a single record to the journal.
+        The record is flushed straight away so that it is not lost if the program crashes.
+
+        :param op: one of JOURNAL_OPS
+        :param table_name: name of the Table object the change was made to (e.g. 'StudentTable')
+        :param payload: one line string describing the change (see JOURNAL_OPS)
+        """
+        self.append_many(op, table_name, (payload,))
+
+    def append_many(self, op: str, table_name: str, payloads: Iterable[str]) -> None:
+        """
+        Appends a record for each payload in payloads (all with the same op and table) to the journal.
+        The records are written together and flushed once at the end (see append()).
+        """
+        if op not in JOURNAL_OPS:
+            raise ValueError(f'{op!r} is not a valid journal operation. Valid options: {", ".join(JOURNAL_OPS)}')
+
+        record_count = 0
+        for payload in payloads:
+            self._fobj.write(f'{op} {table_name} {payload}\n')
+            record_count += 1
+        self._fobj.flush()
+        self.record_count += record_count
+
+    def sync(self) -> None:
+        """
+        Forces all appended records to be physically written to disk.
+        """
+        if self._fobj:
+            self._fobj.flush()
+            os.fsync(self._fobj.fileno())
+
+    def reset(self) -> None:
+        """
+        Empties the journal. Should only be called once all its changes are included in a full save.
+        """
+        if self._fobj:
+            self._fobj.seek(0)
+            self._fobj.truncate()
+            self.sync()
+        else:
+            self.journal_path.open(mode='w').close()
+
+        logging.debug(f'Reset journal "{self.journal_path!s}" - {self.record_count} record(s) removed')
+        self.record_count = 0
+
+    def read_records(self) -> Iterator[Tuple[str, str, str]]:
+        """
+        Yields each complete record in the journal file as a tuple of (op, table_name, payload).
+        A partially written final record (e.g. from a crash mid-write) is ignored.
+        """
+        if not self.journal_path.exists():
+            return
+
+        with self.journal_path.open(mode='r', encoding='utf-8') as fobj:
+            for line in fobj:
+                if not line.endswith('\n'):  # record was never completely written
+                    logging.warning(f'Ignored incomplete final record in journal "{self.journal_path!s}"')
+                    return
+
+                op, table_name, payload = line[:-1].split(' ', maxsplit=2)
+                yield op, table_name, payload
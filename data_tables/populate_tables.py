@@ -2,11 +2,12 @@ import random
 import string
 from typing import Tuple
 
-from data_tables.data_handling import Database, Student, StudentLogin
+from data_tables.data_handling import Database, Student, StudentLogin, suppressed_debug_logging
 from processes import password_logic
 
 
-def new_student_objs(username, id_num, centre_id, award_level, year_group) -> Tuple[StudentLogin, Student]:
+def new_student_objs(username, id_num, centre_id, award_level, year_group,
+                     password_hash: str = None) -> Tuple[StudentLogin, Student]:
     """
     Creates and returns a StudentLogin and a Student object
 
@@ -15,10 +16,11 @@ def new_student_objs(username, id_num, centre_id, award_level, year_group) -> Tu
     :param centre_id: centre number to use for object creation
     :param award_level: award level to use for object creation
     :param year_group: year group to use for object creation
+    :param password_hash: hash of the student's password (default: a new hash of 'password')
     :return: login_obj, student_obj
     """
     login_obj = StudentLogin(
-        username, password_logic.hash_pwd_str('password'), id_num
+        username, password_hash or password_logic.hash_pwd_str('password'), id_num
     )
     student_obj = Student(id_num, centre_id, award_level, year_group)
     return login_obj, student_obj
@@ -49,34 +51,47 @@ def populate_db(db_obj: Database, num_students) -> set:
     login_table = db_obj.get_table_by_name('StudentLoginTable')
     student_table = db_obj.get_table_by_name('StudentTable')
 
+    # hashing is by far the slowest part, so every password is hashed at once over all CPU cores
+    password_hashes = password_logic.hash_pwd_strs(
+        ['password'] * num_students,
+        progress_callback=lambda num_hashed, total: print(
+            f'Hashing password num {num_hashed:>{len(str(total))}}/{total}...', end='\r')
+    )
+
     usernames_created = set()
-    for i in range(num_students):
-        print(f'Generating student num {i + 1:>{len(str(num_students))}}/{num_students}...', end='\r')
-        random_username = get_random_username(5, usernames_created)
-        usernames_created.add(random_username)
-
-        # creates a student with random username, sequential id, random award level and random year group (valid only)
-        login_obj, student_obj = new_student_objs(
-            username=random_username,
-            id_num=i,
-            centre_id=68362,
-            award_level=random.choice(['bronze', 'silver', 'gold']),
-            year_group=random.choice(range(7, 14))
-        )
-        login_table.add_row(login_obj)
-        student_table.add_row(student_obj)
+    login_objs, student_objs = list(), list()
+    with suppressed_debug_logging():  # rows are added in bulk below so their individual debug logs aren't needed
+        for i in range(num_students):
+            random_username = get_random_username(5, usernames_created)
+            usernames_created.add(random_username)
+
+            # creates a student with random username, sequential id, random award level
+            # and random year group (valid only)
+            login_obj, student_obj = new_student_objs(
+                username=random_username,
+                id_num=i,
+                centre_id=68362,
+                award_level=random.choice(['bronze', 'silver', 'gold']),
+                year_group=random.choice(range(7, 14)),
+                password_hash=password_hashes[i]
+            )
+            login_objs.append(login_obj)
+            student_objs.append(student_obj)
+
+    login_table.add_rows(login_objs)
+    student_table.add_rows(student_objs)
 
     return usernames_created
 
 
-def populate(base_table_suffix):
-    db = Database()
+def populate(base_table_suffix, table_format='txt'):
+    db = Database(table_format=table_format)
     db.load_state_from_file(suffix=base_table_suffix)
 
     print('Purging existing tables (except StaffTable)...')
     for name, table in db.database.items():
         if name != 'StaffTable':
-            table.row_dict = {}  # clears row_dict
+            table.clear()
 
     print('Populating Student and StudentLogin tables with new student data...')
     username_set = populate_db(db, int(input('Num of random students to generate: ')))
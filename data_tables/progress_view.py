@@ -0,0 +1,209 @@
+import datetime as dt
+import logging
+from typing import Callable, Collection, Dict, NamedTuple, Optional, Set
+
+from data_tables import SECTION_NAME_MAPPING
+from data_tables.data_handling import Resource, ResourceTable, Row, Section, SectionTable, Student, StudentTable
+from processes.datetime_logic import DeadlineScheduler, calculate_end_date
+
+
+class ProgressViewError(Exception):
+    pass
+
+
+class StudentProgress(NamedTuple):
+    summary: str  # see Student.get_progress_summary()
+    vol_status: str  # see Section.get_activity_status() - 'Not started' if the student has no such section
+    skill_status: str
+    phys_status: str
+    # the earliest end date of the student's sections still in progress, after which the progress changes
+    expiry_date: Optional[dt.datetime] = None
+
+
+class ProgressView:
+    def __init__(self, student_table: StudentTable, section_table: SectionTable, resource_table: ResourceTable,
+                 check_consistency: bool = False, clock: Callable[[], dt.datetime] = None):
+        """
+        A materialized view of every student's progress (see StudentProgress) so that it doesn't have to be
+        recalculated from all of their sections and resources every time it is shown (e.g. in StudentOverview).
+
+        The view listens for changes to the three tables (see Table.change_listeners). A change only marks the
+        progress of the students it affects as stale - e.g. a new section, an uploaded/deleted resource, a resource
+        marked as a report, approval or completed enrolment - and stale progress is recalculated when next read.
+        Progress that changes with time (a section in progress passing its end date) is marked as stale
+        by run_deadlines() (see self.deadlines) so reads don't check the time.
+
+        :param check_consistency: if True, every read also recalculates the progress from scratch and raises
+            a ProgressViewError if it differs from the view (for testing - see find_inconsistencies())
+        Statuses are found at the time given by clock (not through resource_table's status cache, which is
+        only valid at the time of resource_table.clock() - see Section.get_activity_status()), so the view
+        never changes or clears any state shared with other users of the tables.
+
+        :param clock: function returning the current datetime used for deadlines and section statuses
+            (replace to control time in tests). Default: the clock of resource_table
+        """
+        self.clock = clock or resource_table.clock
+        self.student_table = student_table
+        self.section_table = section_table
+        self.resource_table = resource_table
+        self.check_consistency = check_consistency
+
+        self._progress_dict: Dict[int, StudentProgress] = dict()
+        self._stale_student_ids: Set[int] = set()
+        # student_id: expiry date of their progress (see StudentProgress.expiry_date)
+        self.deadlines = DeadlineScheduler(clock)
+        # links used to find the students affected by a change - including links that a change has just removed
+        self._section_owners: Dict[int, int] = dict()  # section_id: student_id
+        self._student_sections: Dict[int, Set[int]] = dict()  # student_id: section_ids
+        self._resource_sections: Dict[int, int] = dict()  # resource_id: section_id (parent_link_id)
+
+        self.student_table.change_listeners.append(self._on_student_change)
+        self.section_table.change_listeners.append(self._on_section_change)
+        self.resource_table.change_listeners.append(self._on_resource_change)
+        self.refresh()
+
+    def __repr__(self) -> str:
+        return f'<ProgressView object of {len(self._progress_dict)} student(s) ' \
+               f'({len(self._stale_student_ids)} stale)>'
+
+    def close(self) -> None:
+        """
+        Stops listening for changes to the tables. The view can no longer be used.
+        """
+        self.student_table.change_listeners.remove(self._on_student_change)
+        self.section_table.change_listeners.remove(self._on_section_change)
+        self.resource_table.change_listeners.remove(self._on_resource_change)
+
+    def refresh(self) -> None:
+        """
+        Rebuilds the whole view from the tables. Every student's progress is stale until it is next read.
+        """
+        self._progress_dict.clear()
+        self.deadlines.clear()
+        self._section_owners.clear()
+        self._student_sections.clear()
+        self._resource_sections = {resource.resource_id: resource.parent_link_id
+                                   for resource in self.resource_table.row_dict.values()}
+        self._on_student_change('put', self.student_table.row_dict.values())
+
+        logging.debug(f'{self!r} refreshed')
+
+    def run_deadlines(self) -> int:
+        """
+        Marks the progress of every student whose expiry date has passed as stale.
+        Call before reading the view (e.g. once per render).
+
+        :return: the number of students whose progress expired
+        """
+        expired_student_ids = self.deadlines.pop_due()
+        self._stale_student_ids.update(expired_student_ids)
+        return len(expired_student_ids)
+
+    def get(self, student_id: int) -> StudentProgress:
+        """
+        Returns the progress of the student with id student_id, recalculating it only if it is stale.
+        Raises a KeyError if there is no such student.
+        """
+        progress = self._progress_dict.get(student_id)
+        if student_id in self._stale_student_ids or progress is None:
+            progress = self._update(student_id)
+
+        if self.check_consistency:
+            expected_progress = self.calculate_progress(self.student_table.row_dict[student_id])
+            if progress != expected_progress:
+                error_str = f'Progress of student {student_id} in {self!r} is {progress} ' \
+                            f'but should be {expected_progress}'
+                logging.error(error_str)
+                raise ProgressViewError(error_str)
+        return progress
+
+    def find_inconsistencies(self) -> Dict[int, tuple]:
+        """
+        Recalculates the progress of every student from scratch (see calculate_progress()) and returns a dictionary
+        of student_id: (progress in the view, recalculated progress) for each student whose progress differs.
+        Stale progress that would be recalculated when read (including expired progress) is not counted.
+        """
+        self.run_deadlines()
+        differences = dict()
+        for student_id, student in self.student_table.row_dict.items():
+            progress = self._progress_dict.get(student_id)
+            if student_id in self._stale_student_ids:
+                continue
+
+            expected_progress = self.calculate_progress(student)
+            if progress != expected_progress:
+                differences[student_id] = (progress, expected_progress)
+
+        for student_id in self._progress_dict.keys() - self.student_table.row_dict.keys():
+            differences[student_id] = (self._progress_dict[student_id], None)  # progress of a deleted student
+        return differences
+
+    def calculate_progress(self, student: Student) -> StudentProgress:
+        """
+        Calculates the progress of student from its sections and their resources without using the view
+        (or any cached section status)
+        """
+        now = self.clock()  # the same time for every section
+        section_statuses = list()
+        expiry_date = None
+        for section_type_short in SECTION_NAME_MAPPING.keys():
+            section = student.get_section_obj(section_type_short, self.section_table)
+            if section is None:
+                section_statuses.append('Not started')
+                continue
+
+            status = section.get_activity_status(self.resource_table, now)
+            section_statuses.append(status)
+            if status == 'In progress':
+                end_date = calculate_end_date(int(section.activity_timescale), section.activity_start_date)
+                expiry_date = min(expiry_date, end_date) if expiry_date else end_date
+
+        return StudentProgress(student.get_progress_summary(self.section_table, self.resource_table, now),
+                               *section_statuses, expiry_date=expiry_date)
+
+    def _update(self, student_id: int) -> StudentProgress:
+        self._stale_student_ids.discard(student_id)
+        progress = self.calculate_progress(self.student_table.row_dict[student_id])
+        self._progress_dict[student_id] = progress
+        if progress.expiry_date:
+            self.deadlines.schedule(student_id, progress.expiry_date)
+        else:
+            self.deadlines.cancel(student_id)
+        return progress
+
+    def _mark_section_stale(self, section_id) -> None:
+        if section_id in self._section_owners:
+            self._stale_student_ids.add(self._section_owners[section_id])
+
+    def _on_student_change(self, op: str, row_objs: Collection[Row]) -> None:
+        student: Student
+        for student in row_objs:
+            student_id = student.student_id
+            for section_id in self._student_sections.pop(student_id, ()):
+                self._section_owners.pop(section_id, None)
+
+            if op == 'put':
+                section_ids = {student.__getattribute__(f'{section_type_short}_info_id')
+                               for section_type_short in SECTION_NAME_MAPPING.keys()} - {''}
+                self._student_sections[student_id] = section_ids
+                for section_id in section_ids:
+                    self._section_owners[section_id] = student_id
+                self._stale_student_ids.add(student_id)
+            else:
+                self._progress_dict.pop(student_id, None)
+                self._stale_student_ids.discard(student_id)
+                self.deadlines.cancel(student_id)
+
+    def _on_section_change(self, op: str, row_objs: Collection[Row]) -> None:
+        section: Section
+        for section in row_objs:
+            self._mark_section_stale(section.section_id)
+
+    def _on_resource_change(self, op: str, row_objs: Collection[Row]) -> None:
+        resource: Resource
+        for resource in row_objs:
+            # the resource may have moved from another section
+            self._mark_section_stale(self._resource_sections.pop(resource.resource_id, None))
+            if op == 'put':
+                self._resource_sections[resource.resource_id] = resource.parent_link_id
+                self._mark_section_stale(resource.parent_link_id)
@@ -0,0 +1,147 @@
+from __future__ import annotations
+
+import locale
+import logging
+import mmap
+from pathlib import Path
+from typing import Dict, Iterator, Optional, Tuple, Type
+
+from data_tables.data_handling import FIELD_ESCAPE_STR, Row, Table, parse_row_string
+from data_tables.journal import Journal
+
+
+class TableFileIndex:
+    def __init__(self, table_cls: Type[Table], txt_path: Path, journal_path: Optional[Path] = None):
+        """
+        A read-only index of the rows stored in a txt table file (see Table.save_to_file()).
+        The file is memory-mapped and only scanned for the start of each line and its key field
+        (always the first, padded field of a row) so no other fields are parsed.
+        A single row can then be fetched by its key in constant time without loading the rest of the table.
+
+        If journal_path is given, changes to the table recorded in that journal
+        since the file was last saved are taken into account.
+
+        :param table_cls: the Table class whose rows are stored in the file (e.g. StudentTable)
+        :param txt_path: path to the txt table file to index
+        :param journal_path: path to the Journal file belonging to the table's database (optional)
+        """
+        self.table_cls = table_cls
+        self.row_class: Type[Row] = table_cls.row_class
+        self.txt_path = txt_path
+
+        # txt tables are written using the default encoding (see Path.open())
+        self._encoding = locale.getpreferredencoding(False)
+        self._fobj = self.txt_path.open(mode='rb')
+        self._mmap: Optional[mmap.mmap] = None
+        # key (as a string) -> (start offset, end offset) of the row's line in the file
+        self._offsets: Dict[str, Tuple[int, int]] = dict()
+        # key (as a string) -> compacted row string or None if the row was deleted
+        self._journal_rows: Dict[str, Optional[str]] = dict()
+
+        self._build_offsets()
+        if journal_path:
+            self._build_journal_overlay(journal_path)
+
+        logging.debug(f'Indexed {len(self)} {self.row_class.__name__} row(s) in "{self.txt_path!s}"')
+
+    def __repr__(self) -> str:
+        return f'<TableFileIndex object of "{self.txt_path!s}" with {len(self)} row(s)>'
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self.keys())
+
+    def __contains__(self, key) -> bool:
+        key = str(key)
+        if key in self._journal_rows:
+            return self._journal_rows[key] is not None
+        return key in self._offsets
+
+    def __enter__(self) -> TableFileIndex:
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def _build_offsets(self) -> None:
+        """
+        Scans the memory-mapped file once, storing the offsets of each row by its key
+        """
+        if self.txt_path.stat().st_size == 0:  # empty files can't be memory-mapped
+            return
+
+        self._mmap = mmap.mmap(self._fobj.fileno(), 0, access=mmap.ACCESS_READ)
+        field_sep = FIELD_ESCAPE_STR.encode('ascii')
+
+        line_start = 0
+        file_size = len(self._mmap)
+        while line_start < file_size:
+            line_end = self._mmap.find(b'\n', line_start)
+            if line_end == -1:  # final line doesn't end with a line break
+                line_end = file_size
+
+            key_end = self._mmap.find(field_sep, line_start, line_end)
+            if key_end != -1:  # ignores blank lines
+                key = self._mmap[line_start:key_end].decode(self._encoding).strip()
+                self._offsets[key] = (line_start, line_end + 1)
+
+            line_start = line_end + 1
+
+    def _build_journal_overlay(self, journal_path: Path) -> None:
+        """
+        Reads the changes to this table from the journal so that they take priority over the file
+        """
+        table_name = self.table_cls.__name__
+        for op, record_table_name, payload in Journal(journal_path).read_records():
+            if record_table_name != table_name:
+                continue
+
+            if op == 'put':
+                key = payload.split(FIELD_ESCAPE_STR, maxsplit=1)[0].strip()
+                self._journal_rows[key] = payload
+            else:  # op == 'del'
+                self._journal_rows[payload] = None
+
+    def get_row_string(self, key) -> str:
+        """
+        Returns the (padded or compacted) tabulated string of the row with key 'key'.
+        Raises a KeyError if there is no such row.
+        """
+        key = str(key)
+        if key in self._journal_rows:
+            row_string = self._journal_rows[key]
+        elif key in self._offsets:
+            start, end = self._offsets[key]
+            row_string = self._mmap[start:end].decode(self._encoding)
+        else:
+            row_string = None
+
+        if row_string is None:
+            error_str = f'{key} is not a row within "{self.txt_path!s}"'
+            logging.error(error_str)
+            raise KeyError(error_str)
+
+        return row_string
+
+    def get_row(self, key) -> Row:
+        """
+        Parses and returns the row object with key 'key' only.
+        Raises a KeyError if there is no such row.
+        """
+        return self.row_class(*parse_row_string(self.get_row_string(key)))
+
+    def keys(self) -> Iterator[str]:
+        """
+        Yields the keys (as strings) of every row in the indexed table
+        """
+        for key in self._offsets:
+            if self._journal_rows.get(key, '') is not None:  # not deleted in journal
+                yield key
+        for key, row_string in self._journal_rows.items():
+            if row_string is not None and key not in self._offsets:  # added in journal
+                yield key
+
+    def close(self) -> None:
+        if self._mmap:
+            self._mmap.close()
+            self._mmap = None
+        self._fobj.close()
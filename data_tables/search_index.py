@@ -0,0 +1,222 @@
+import logging
+from functools import partial
+from itertools import chain
+from typing import Callable, Collection, Container, Dict, Iterable, List, Optional, Set, Tuple
+
+from data_tables.data_handling import Row, Student, StudentLogin, StudentLoginTable, StudentTable
+
+# fields of each student that are searched by default, in order of importance (used to rank results).
+# 'username' is the username of the student's login (in StudentLoginTable) rather than a field of Student
+DEFAULT_SEARCH_FIELDS = ('fullname', 'username', 'email_primary')
+NGRAM_LEN = 3
+
+
+def get_ngrams(text: str) -> Set[str]:
+    """
+    Returns the set of every substring of text that is NGRAM_LEN characters long
+    """
+    return {text[i:i + NGRAM_LEN] for i in range(len(text) - NGRAM_LEN + 1)}
+
+
+def get_word_prefixes(text: str) -> Set[str]:
+    """
+    Returns the set of every prefix of each word in text up to NGRAM_LEN characters long
+    """
+    return {word[:i] for word in text.split() for i in range(1, min(len(word), NGRAM_LEN) + 1)}
+
+
+def has_word_starting_with(text: str, query: str) -> bool:
+    return text.startswith(query) or f' {query}' in text
+
+
+class StudentSearchIndex:
+    def __init__(self, student_table: StudentTable, login_table: StudentLoginTable,
+                 search_fields: Tuple[str, ...] = DEFAULT_SEARCH_FIELDS):
+        """
+        An inverted n-gram index of the searchable fields of every student (e.g. for StudentOverview's search box)
+        so that finding the students containing a query doesn't need every student to be checked.
+
+        Each field is lowercased and split into its n-grams (substrings NGRAM_LEN characters long).
+        For each field, the index maps each n-gram to the ids of the students whose field contains it,
+        so the students matching a query are within the intersection of the sets of its n-grams.
+        The prefixes of each word (up to NGRAM_LEN characters) and whole field values are indexed the same way
+        to find (and rank) matches at the start of words and exact matches.
+
+        Like ProgressView, the index listens for changes to the tables (see Table.change_listeners),
+        so it is updated as students are created or enrolled and their logins change.
+
+        :param search_fields: names of the Student fields to search (and/or 'username'),
+            in order of importance - results matching earlier fields are ranked higher
+        """
+        self.student_table = student_table
+        self.login_table = login_table
+        self.search_fields = search_fields
+
+        # one dictionary per search field (in the order of self.search_fields) of:
+        self._field_texts: List[Dict[int, str]] = [dict() for _ in search_fields]  # student_id: lowercase text
+        self._ngram_indexes: List[Dict[str, Set[int]]] = [dict() for _ in search_fields]  # n-gram: student ids
+        self._prefix_indexes: List[Dict[str, Set[int]]] = [dict() for _ in search_fields]  # word prefix: student ids
+        self._exact_indexes: List[Dict[str, Set[int]]] = [dict() for _ in search_fields]  # text: student ids
+        # username: student_id of every login as last indexed, so a login moved to another student
+        # is removed from its previous student too
+        self._login_students: Dict[str, int] = dict()
+
+        self.student_table.change_listeners.append(self._on_student_change)
+        self.login_table.change_listeners.append(self._on_login_change)
+        self.refresh()
+
+    def __repr__(self) -> str:
+        return f'<StudentSearchIndex object of {len(self._field_texts[0]) if self.search_fields else 0} ' \
+               f'student(s) over {len(self.search_fields)} field(s)>'
+
+    def close(self) -> None:
+        """
+        Stops listening for changes to the tables. The index can no longer be used.
+        """
+        self.student_table.change_listeners.remove(self._on_student_change)
+        self.login_table.change_listeners.remove(self._on_login_change)
+
+    def refresh(self) -> None:
+        """
+        Rebuilds the whole index from the tables
+        """
+        for index in chain(self._field_texts, self._ngram_indexes, self._prefix_indexes, self._exact_indexes):
+            index.clear()
+        self._login_students = {login.username: login.student_id for login in self.login_table.row_dict.values()}
+        for student in self.student_table.row_dict.values():
+            self._add_student(student)
+
+        logging.debug(f'{self!r} refreshed')
+
+    def search(self, query: str, limit: int = None, student_ids: Container[int] = None) -> List[int]:
+        """
+        Returns the ids of the students with a search field containing query (ignoring case), best matches first:
+        exact matches of a whole field, then matches at the start of a word, then matches anywhere
+        (queries shorter than NGRAM_LEN only match the start of words). Within each of these, students are ranked
+        by which field matched (see self.search_fields) - students matching equally well are in no particular order.
+
+        Matches are found by intersecting sets of ids from the index. Given a limit, the sets are intersected
+        lazily so that only about limit ids are looked at, however many students match.
+
+        :param limit: maximum number of ids to return (default: all matches)
+        :param student_ids: if given, only ids within it are returned (e.g. the students shown at one award level)
+            - checked before the limit is applied
+        """
+        query = ' '.join(query.lower().split())  # same whitespace as the indexed text
+        if not query or (limit is not None and limit <= 0):
+            return list()
+
+        # (sets of ids whose intersection contains the matches, function checking whether the text of the field
+        # really matches - or None if every id in the intersection does, field texts) in order of rank
+        ranked_candidates: List[Tuple[List[Set[int]], Optional[Callable[[str], bool]], Dict[int, str]]] = list()
+        substring_candidates = list()
+        for field_num in range(len(self.search_fields)):
+            ranked_candidates.append(([self._exact_indexes[field_num].get(query, set())], None,
+                                      self._field_texts[field_num]))
+
+        for field_num in range(len(self.search_fields)):
+            field_texts = self._field_texts[field_num]
+            prefix_set = self._prefix_indexes[field_num].get(query[:NGRAM_LEN], set())
+            if len(query) <= NGRAM_LEN:
+                ranked_candidates.append(([prefix_set], None, field_texts))
+                if len(query) == NGRAM_LEN:  # otherwise queries are too short to search within words
+                    substring_candidates.append((self._get_ngram_sets(query, field_num), None, field_texts))
+            else:
+                # n-grams can all be in a field without the query being (e.g. 'abcab' in 'cabc') so matches are checked
+                ngram_sets = self._get_ngram_sets(query, field_num)
+                ranked_candidates.append((ngram_sets + [prefix_set], partial(has_word_starting_with, query=query),
+                                          field_texts))
+                substring_candidates.append((ngram_sets, lambda text: query in text, field_texts))
+        ranked_candidates.extend(substring_candidates)
+
+        results = list()
+        seen_ids = set()
+        for id_sets, is_match, field_texts in ranked_candidates:
+            id_sets.sort(key=len)  # intersecting the smallest sets first keeps intermediate sets small
+            if limit is None:
+                candidate_ids = id_sets[0].intersection(*id_sets[1:])
+            else:  # lazy intersection
+                candidate_ids = (student_id for student_id in id_sets[0]
+                                 if all(student_id in id_set for id_set in id_sets[1:]))
+
+            for student_id in candidate_ids:
+                if student_id not in seen_ids and (student_ids is None or student_id in student_ids) \
+                        and (is_match is None or is_match(field_texts[student_id])):
+                    seen_ids.add(student_id)
+                    results.append(student_id)
+                    if len(results) == limit:
+                        return results
+        return results
+
+    def _get_ngram_sets(self, query: str, field_num: int) -> List[Set[int]]:
+        """
+        Returns the sets of ids of the students whose field contains each n-gram of query (at least NGRAM_LEN long)
+        """
+        ngram_index = self._ngram_indexes[field_num]
+        return [ngram_index.get(ngram, set()) for ngram in get_ngrams(query)]
+
+    def _get_text(self, student: Student, field_name: str) -> str:
+        if field_name == 'username':
+            field_value = ' '.join(login.username for login in self.login_table.lookup('student_id',
+                                                                                      student.student_id))
+        else:
+            field_value = student.__getattribute__(field_name)
+        return ' '.join(str(field_value).lower().split())
+
+    def _add_student(self, student: Student) -> None:
+        student_id = student.student_id
+        for field_num, field_name in enumerate(self.search_fields):
+            text = self._get_text(student, field_name)
+            self._field_texts[field_num][student_id] = text
+            if not text:
+                continue
+
+            for index, keys in ((self._ngram_indexes[field_num], get_ngrams(text)),
+                                (self._prefix_indexes[field_num], get_word_prefixes(text)),
+                                (self._exact_indexes[field_num], (text,))):
+                for key in keys:
+                    index.setdefault(key, set()).add(student_id)
+
+    def _remove_student(self, student_id: int) -> None:
+        for field_num in range(len(self.search_fields)):
+            text = self._field_texts[field_num].pop(student_id, '')
+            for index, keys in ((self._ngram_indexes[field_num], get_ngrams(text)),
+                                (self._prefix_indexes[field_num], get_word_prefixes(text)),
+                                (self._exact_indexes[field_num], (text,) if text else ())):
+                for key in keys:
+                    posting_set = index[key]
+                    posting_set.discard(student_id)
+                    if not posting_set:  # stops the index growing with keys no student has any more
+                        del index[key]
+
+    def _reindex_students(self, student_ids: Iterable[int]) -> None:
+        for student_id in student_ids:
+            self._remove_student(student_id)
+            student = self.student_table.row_dict.get(student_id)
+            if student is not None:
+                self._add_student(student)
+
+    def _on_student_change(self, op: str, row_objs: Collection[Row]) -> None:
+        student: Student
+        if op == 'put':
+            self._reindex_students(student.student_id for student in row_objs)
+        else:
+            for student in row_objs:
+                self._remove_student(student.student_id)
+
+    def _on_login_change(self, op: str, row_objs: Collection[Row]) -> None:
+        if 'username' not in self.search_fields:
+            return
+
+        login: StudentLogin
+        student_ids = set()
+        for login in row_objs:
+            # the student the login belonged to when last indexed (if it has moved to another student)
+            previous_student_id = self._login_students.pop(login.username, None)
+            if previous_student_id is not None:
+                student_ids.add(previous_student_id)
+            if op == 'put':
+                self._login_students[login.username] = login.student_id
+            student_ids.add(login.student_id)
+        # a login may be added before its student (e.g. in CreateStudent) - then the student is indexed when added
+        self._reindex_students(student_ids)
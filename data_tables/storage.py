@@ -0,0 +1,297 @@
+from __future__ import annotations
+
+import logging
+import sqlite3
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import Collection, Iterator, List, Optional, Type
+
+from data_tables.data_handling import SAVE_BUFFER_SIZE, Row, Table, compact_row_string, parse_row_string
+from data_tables.journal import Journal
+
+
+class StorageBackend(ABC):
+    """
+    Base class for the ways a Database's tables can be stored (selected by Database.table_format).
+    A backend stores every table of a Database that uses one filename suffix.
+
+    Whole tables are loaded and saved with load() and save() while get(), put(), delete() and iterate()
+    work on single rows. Once a Database has been loaded, every change made to a table is passed to put()
+    or delete() straight away (see Table.storage) so changes are stored incrementally as they happen.
+    """
+
+    def __init__(self, db_dir: Path, suffix=''):
+        """
+        :param db_dir: directory the tables are stored in (see Database.get_txt_database_dir())
+        :param suffix: filename suffix of the stored tables (e.g. ' (backup)')
+        """
+        self.db_dir = db_dir
+        self.suffix = suffix
+
+    def __repr__(self) -> str:
+        return f'<{type(self).__name__} object in "{self.db_dir!s}" using {self.suffix!r} as filename suffix>'
+
+    @abstractmethod
+    def exists(self, table_name: str) -> bool:
+        """
+        Returns whether the table table_name has been stored (even if it has no rows)
+        """
+
+    @abstractmethod
+    def load(self, table_obj: Table, trusted: bool = True) -> None:
+        """
+        Populates table_obj (which should be empty) with every stored row of its table
+
+        :param trusted: if False, every field is validated again as the rows are created
+        """
+
+    @abstractmethod
+    def save(self, table_obj: Table) -> None:
+        """
+        Replaces every stored row of the table with the rows currently in table_obj
+        """
+
+    @abstractmethod
+    def get(self, table_cls: Type[Table], key) -> Row:
+        """
+        Returns the stored row with primary key 'key' from the table table_cls.
+        Raises a KeyError if there is no such row.
+        """
+
+    @abstractmethod
+    def iterate(self, table_cls: Type[Table]) -> Iterator[Row]:
+        """
+        Yields every stored row of the table table_cls
+        """
+
+    @abstractmethod
+    def put(self, table_cls: Type[Table], row_objs: Collection[Row]) -> None:
+        """
+        Stores every row in row_objs, replacing any stored rows with the same primary key
+        """
+
+    @abstractmethod
+    def delete(self, table_cls: Type[Table], keys: Collection) -> None:
+        """
+        Removes the stored rows with the primary keys in keys (if they are stored)
+        """
+
+    @abstractmethod
+    def sync(self) -> None:
+        """
+        Forces every change passed to put() or delete() to be physically written to disk
+        """
+
+    @abstractmethod
+    def close(self) -> None:
+        pass
+
+
+class FileBackend(StorageBackend):
+    def __init__(self, db_dir: Path, suffix='', table_format='txt', journal: Optional[Journal] = None):
+        """
+        Stores each table in its own file - either a txt file (see Row.tabulate()) or
+        a binary table file (see data_tables.binary_tables) depending on table_format.
+        Rows passed to put() and delete() are appended to the journal (see data_tables.journal)
+        and only included in the table files when they are next saved (see Database.save_state_to_file()).
+
+        :param table_format: 'txt' or 'bin'
+        :param journal: the open journal of the tables with filename suffix 'suffix' (required for put/delete)
+        """
+        super().__init__(db_dir, suffix)
+        self.table_format = table_format
+        self.journal = journal
+
+    def get_table_path(self, table_name: str) -> Path:
+        return self.db_dir / f'{table_name}{self.suffix}.{self.table_format}'
+
+    def exists(self, table_name: str) -> bool:
+        return self.get_table_path(table_name).exists()
+
+    def load(self, table_obj: Table, trusted: bool = True) -> None:
+        load_path = self.get_table_path(type(table_obj).__name__)
+        if self.table_format == 'bin':
+            with load_path.open(mode='rb') as fobj:
+                table_obj.load_from_binary_file(fobj, trusted=trusted)
+        else:
+            with load_path.open(mode='r') as fobj:
+                table_obj.load_from_file(fobj, trusted=trusted)
+
+    def save(self, table_obj: Table, save_path: Optional[Path] = None) -> None:
+        """
+        Writes every row of table_obj to its table file, or to save_path instead if given
+        (e.g. a temporary file - see Database.save_state_to_file())
+        """
+        save_path = save_path or self.get_table_path(type(table_obj).__name__)
+        if self.table_format == 'bin':
+            with save_path.open(mode='wb', buffering=SAVE_BUFFER_SIZE) as fobj:
+                table_obj.save_to_binary_file(fobj)
+        else:
+            with save_path.open(mode='w', buffering=SAVE_BUFFER_SIZE) as fobj:
+                table_obj.save_to_file(fobj)
+
+    def get(self, table_cls: Type[Table], key) -> Row:
+        if self.table_format == 'txt':
+            # only the requested row is parsed (see data_tables.record_index)
+            from data_tables.record_index import TableFileIndex  # only imported here to prevent circular import
+
+            journal_path = self.journal.journal_path if self.journal else None
+            with TableFileIndex(table_cls, self.get_table_path(table_cls.__name__), journal_path) as index:
+                return index.get_row(key)
+
+        for row_obj in self.iterate(table_cls):
+            if row_obj.__getattribute__(table_cls.row_class.key_field) == key:
+                return row_obj
+
+        error_str = f'{key} is not a row within "{self.get_table_path(table_cls.__name__)!s}"'
+        logging.error(error_str)
+        raise KeyError(error_str)
+
+    def iterate(self, table_cls: Type[Table]) -> Iterator[Row]:
+        table_obj = table_cls()
+        self.load(table_obj)
+        if self.journal:
+            for op, table_name, payload in self.journal.read_records():
+                if table_name == table_cls.__name__:
+                    table_obj.apply_journal_record(op, payload)
+
+        yield from table_obj.row_dict.values()
+
+    def put(self, table_cls: Type[Table], row_objs: Collection[Row]) -> None:
+        self.journal.append_many('put', table_cls.__name__,
+                                 [compact_row_string(row_obj.tabulate()) for row_obj in row_objs])
+
+    def delete(self, table_cls: Type[Table], keys: Collection) -> None:
+        self.journal.append_many('del', table_cls.__name__, [str(key) for key in keys])
+
+    def sync(self) -> None:
+        if self.journal:
+            self.journal.sync()
+
+    def close(self) -> None:
+        if self.journal:
+            self.journal.close()
+
+
+class SqliteBackend(StorageBackend):
+    def __init__(self, db_dir: Path, suffix='', create: bool = True):
+        """
+        Stores every table in one SQLite database file (e.g. 'Database (backup).sqlite3').
+        Each table has a column per field holding its string form (as in a txt table file)
+        with indexes on the primary key, the table's secondary indexes and any other id (foreign key) fields.
+
+        Rows passed to put() are upserted and committed straight away. The database uses write-ahead logging
+        (WAL mode) so these small commits are fast and readers aren't blocked by writes.
+
+        :param create: if False (e.g. when loading), a FileNotFoundError is raised if the database file
+            doesn't exist rather than an empty one being created
+        """
+        super().__init__(db_dir, suffix)
+        self.db_path = db_dir / f'Database{suffix}.sqlite3'
+        if not create and not self.db_path.exists():
+            error_str = f'The file {self.db_path} does not exist but should.'
+            logging.error(error_str)
+            raise FileNotFoundError(error_str)
+
+        self.connection = sqlite3.connect(self.db_path)
+        self.connection.execute('PRAGMA journal_mode=WAL')
+        # in WAL mode, commits are still atomic and survive the program crashing without syncing every time
+        self.connection.execute('PRAGMA synchronous=NORMAL')
+        self._created_tables = set()
+
+        logging.debug(f'Opened SQLite database "{self.db_path!s}"')
+
+    @staticmethod
+    def _get_indexed_fields(table_cls: Type[Table]) -> List[str]:
+        row_class = table_cls.row_class
+        return [field_name for field_name in row_class.fields if field_name != row_class.key_field and
+                (field_name in table_cls.secondary_indexes or field_name.endswith('_id'))]
+
+    def _create_table(self, table_cls: Type[Table]) -> None:
+        """
+        Creates the SQL table (and its indexes) for table_cls if it doesn't exist yet
+        """
+        table_name = table_cls.__name__
+        if table_name in self._created_tables:
+            return
+
+        row_class = table_cls.row_class
+        column_list = ', '.join(f'"{field_name}" TEXT NOT NULL' for field_name in row_class.fields)
+        with self.connection:
+            self.connection.execute(f'CREATE TABLE IF NOT EXISTS "{table_name}" '
+                                    f'({column_list}, PRIMARY KEY ("{row_class.key_field}"))')
+            for field_name in self._get_indexed_fields(table_cls):
+                self.connection.execute(f'CREATE INDEX IF NOT EXISTS "{table_name}_{field_name}" '
+                                        f'ON "{table_name}" ("{field_name}")')
+        self._created_tables.add(table_name)
+
+    def _select_field_strings(self, table_cls: Type[Table], where: str = '', params: tuple = ()) -> Iterator[List]:
+        self._create_table(table_cls)
+        column_list = ', '.join(f'"{field_name}"' for field_name in table_cls.row_class.fields)
+        # rows are returned in the order they were first added
+        for sql_row in self.connection.execute(f'SELECT {column_list} FROM "{table_cls.__name__}" {where} '
+                                               f'ORDER BY rowid', params):
+            yield list(sql_row)
+
+    def exists(self, table_name: str) -> bool:
+        return self.connection.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?",
+                                       (table_name,)).fetchone() is not None
+
+    def load(self, table_obj: Table, trusted: bool = True) -> None:
+        table_obj.load_from_parsed_rows(self._select_field_strings(type(table_obj)), trusted=trusted)
+
+    def save(self, table_obj: Table) -> None:
+        table_cls = type(table_obj)
+        self._create_table(table_cls)
+        with self.connection:  # one transaction so the table is never partly saved
+            self.connection.execute(f'DELETE FROM "{table_cls.__name__}"')
+            self._upsert(table_cls, table_obj.row_dict.values())
+        table_obj.is_modified = False
+        logging.debug(f'{table_cls.__name__} object successfully saved to "{self.db_path!s}"')
+
+    def get(self, table_cls: Type[Table], key) -> Row:
+        key_field = table_cls.row_class.key_field
+        for field_strings in self._select_field_strings(table_cls, f'WHERE "{key_field}" = ?', (str(key),)):
+            return table_cls.row_class.from_field_strings(field_strings)
+
+        error_str = f'{key} is not a row within {table_cls.__name__} in "{self.db_path!s}"'
+        logging.error(error_str)
+        raise KeyError(error_str)
+
+    def iterate(self, table_cls: Type[Table]) -> Iterator[Row]:
+        for field_strings in self._select_field_strings(table_cls):
+            yield table_cls.row_class.from_field_strings(field_strings)
+
+    def _upsert(self, table_cls: Type[Table], row_objs: Collection[Row]) -> None:
+        row_class = table_cls.row_class
+        column_list = ', '.join(f'"{field_name}"' for field_name in row_class.fields)
+        value_list = ', '.join('?' for _ in row_class.fields)
+        update_list = ', '.join(f'"{field_name}" = excluded."{field_name}"' for field_name in row_class.fields)
+        self.connection.executemany(
+            f'INSERT INTO "{table_cls.__name__}" ({column_list}) VALUES ({value_list}) '
+            f'ON CONFLICT ("{row_class.key_field}") DO UPDATE SET {update_list}',
+            (parse_row_string(row_obj.tabulate()) for row_obj in row_objs)
+        )
+
+    def put(self, table_cls: Type[Table], row_objs: Collection[Row]) -> None:
+        self._create_table(table_cls)
+        with self.connection:
+            self._upsert(table_cls, row_objs)
+
+    def delete(self, table_cls: Type[Table], keys: Collection) -> None:
+        self._create_table(table_cls)
+        with self.connection:
+            self.connection.executemany(
+                f'DELETE FROM "{table_cls.__name__}" WHERE "{table_cls.row_class.key_field}" = ?',
+                ((str(key),) for key in keys)
+            )
+
+    def sync(self) -> None:
+        self.connection.commit()
+        # moves the changes in the write-ahead log into the main database file
+        self.connection.execute('PRAGMA wal_checkpoint(FULL)')
+
+    def close(self) -> None:
+        self.connection.commit()
+        self.connection.close()
+        logging.debug(f'Closed SQLite database "{self.db_path!s}"')
@@ -1,4 +1,5 @@
 import argparse
+import datetime as dt
 import logging
 import tkinter as tk
 from getpass import getpass
@@ -12,10 +13,6 @@ from data_tables import data_handling, populate_tables
 from processes import validation, password_logic
 from ui import RootWindow
 
-logging.basicConfig(filename='main_program.log',
-                    filemode='w', level=logging.DEBUG,
-                    format='%(asctime)s - %(levelname)6s: %(message)s')
-
 
 def close_window_call(db_obj: data_handling.Database, tk_root: tk.Tk, file_save_suffix: str) -> None:
     """
@@ -33,12 +30,13 @@ def close_window_call(db_obj: data_handling.Database, tk_root: tk.Tk, file_save_
         logging.info('User chose to destroy window and exit program')
         # saves current database state from memory to file before closing
         db_obj.save_state_to_file(suffix=file_save_suffix)
+        db_obj.close_journal()
         tk_root.destroy()  # closes tkinter window
     else:
         logging.debug('User chose not to exit')
 
 
-def create_gui(file_save_suffix):
+def create_gui(file_save_suffix, session_minutes: int = 0):
     root = tk.Tk()
 
     # some font constants set here as Tk needs to be initialised to use nametofont()
@@ -49,7 +47,10 @@ def create_gui(file_save_suffix):
     font_obj['weight'], font_obj['slant'] = 'bold', 'roman'
     ui.BOLD_CAPTION_FONT = font.Font(**font_obj.actual())
 
-    main_window = RootWindow(tk_root=root, db=MAIN_DATABASE_OBJ)  # initialises tkinter root/base
+    # repeat logins within session_minutes skip full password verification (disabled if 0)
+    session_cache = password_logic.SessionCache(dt.timedelta(minutes=session_minutes)) if session_minutes else None
+    # initialises tkinter root/base
+    main_window = RootWindow(tk_root=root, db=MAIN_DATABASE_OBJ, session_cache=session_cache)
 
     page_obj_list = list()
     for cls in ui.GenericPage.__subclasses__():
@@ -66,6 +67,7 @@ def create_gui(file_save_suffix):
     root.resizable(width=False, height=False)
     root.protocol("WM_DELETE_WINDOW", lambda: close_window_call(MAIN_DATABASE_OBJ, root, file_save_suffix))
     root.mainloop()
+    main_window.task_executor.shutdown()  # abandons any tasks still running once the window is closed
 
 
 def create_staff_account(file_save_suffix):
@@ -113,16 +115,37 @@ def create_staff_account(file_save_suffix):
                 break
 
     MAIN_DATABASE_OBJ.save_state_to_file(suffix=file_save_suffix)
+    MAIN_DATABASE_OBJ.close_journal()
     print('Tables successfully saved to txt files.')
 
 
 if __name__ == '__main__':
+    # only configured here since worker processes (see Database.load_state_from_file()) may import this module
+    # and would otherwise empty the log file
+    logging.basicConfig(filename='main_program.log',
+                        filemode='w', level=logging.DEBUG,
+                        format='%(asctime)s - %(levelname)6s: %(message)s')
+
     parser = argparse.ArgumentParser()
     parser.format_help()
     parser.add_argument('-f', '--file-save-suffix',
                         type=str, metavar='SUFFIX',
                         help='optional suffix to add when loading files (use to load specific tables)',
                         default='')
+    format_group = parser.add_mutually_exclusive_group()
+    format_group.add_argument('-b', '--binary-tables',
+                              help='load and save tables in the binary format instead of as txt files',
+                              action='store_const', dest='table_format', const='bin', default='txt')
+    format_group.add_argument('--sqlite-tables',
+                              help='load and save tables in a SQLite database instead of as txt files',
+                              action='store_const', dest='table_format', const='sqlite', default='txt')
+    parser.add_argument('--verify',
+                        help='fully validate every loaded table, even those unchanged since they were last saved',
+                        action='store_true')
+    parser.add_argument('--session-minutes',
+                        type=int, metavar='MINUTES', default=0,
+                        help='let users who switch user (rather than log out) log in again within MINUTES of their '
+                             'last full login without the slow password check (GUI only; default: disabled)')
     group = parser.add_mutually_exclusive_group(required=True)
     group.add_argument('-g', '--show-gui',
                        help='show GUI to log in to system as staff or student',
@@ -133,12 +156,15 @@ if __name__ == '__main__':
     group.add_argument('-p', '--populate-tables',
                        help='launch interactive command line to create random test student data',
                        action='store_true')
+    group.add_argument('-c', '--convert-tables',
+                       help='save a copy of the loaded tables in the file format FORMAT and exit',
+                       choices=data_handling.TABLE_FORMATS, metavar='FORMAT')
     args = parser.parse_args()
 
-    MAIN_DATABASE_OBJ = data_handling.Database()
+    MAIN_DATABASE_OBJ = data_handling.Database(table_format=args.table_format)
     try:
         # attempts to load last database state from files into memory
-        MAIN_DATABASE_OBJ.load_state_from_file(suffix=args.file_save_suffix)
+        MAIN_DATABASE_OBJ.load_state_from_file(suffix=args.file_save_suffix, verify=args.verify)
     except FileNotFoundError as fe:
         if args.file_save_suffix:
             print(f'Tried looking for the following file:\n{fe}\n')
@@ -150,20 +176,29 @@ if __name__ == '__main__':
                 f'Create new tables for file suffix "{args.file_save_suffix}"? y/n '
             )
             if create_new_tables.lower() == 'y':
-                print('No existing complete database. New txt files will be created on program termination.')
+                print(f'No existing complete database. New {MAIN_DATABASE_OBJ.table_format} files '
+                      f'will be created on program termination.')
             else:
                 raise Exception('No existing complete database. User chose to abort txt file table load.')
         else:
             print('No existing complete database. New files will be created on program termination.')
     else:
-        print(f'Loaded complete database from txt files with suffix "{args.file_save_suffix}"')
+        print(f'Loaded complete database from {MAIN_DATABASE_OBJ.table_format} files '
+              f'with suffix "{args.file_save_suffix}"')
+        # from now on every change is journaled so that it isn't lost if the program crashes
+        MAIN_DATABASE_OBJ.open_journal(suffix=args.file_save_suffix)
 
     if args.show_gui:
         logging.debug('show-gui argument provided: creating tkinter instance')
-        create_gui(args.file_save_suffix)
+        create_gui(args.file_save_suffix, args.session_minutes)
     elif args.create_staff_account:
         logging.debug('create-staff-account argument provided: launching command line function to create account')
         create_staff_account(args.file_save_suffix)
     elif args.populate_tables:
         logging.debug('populate-tables argument provided: launching command line function to generate test students')
-        populate_tables.populate(args.file_save_suffix)
+        populate_tables.populate(args.file_save_suffix, MAIN_DATABASE_OBJ.table_format)
+    elif args.convert_tables:
+        logging.debug(f'convert-tables argument provided: converting tables to {args.convert_tables} format')
+        MAIN_DATABASE_OBJ.convert_table_format(args.convert_tables, suffix=args.file_save_suffix)
+        MAIN_DATABASE_OBJ.close_journal()
+        print(f'Tables successfully saved in {args.convert_tables} format.')
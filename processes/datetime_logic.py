@@ -1,7 +1,9 @@
 import datetime as dt
+import heapq
 import logging
 import re
-from typing import TypedDict, Set, Union
+from itertools import count
+from typing import Callable, Dict, Hashable, List, Tuple, TypedDict, Set, Union
 
 from data_tables import SECTION_NAME_MAPPING
 
@@ -63,11 +65,79 @@ def calculate_end_date(time_offset: int, start_datetime_obj: dt.datetime = dt.da
     return start_datetime_obj + dt.timedelta(days=time_offset)
 
 
-def date_in_past(date: dt.datetime) -> bool:
+def date_in_past(date: dt.datetime, now: dt.datetime = None) -> bool:
     """
     Returns True is date is in the past, False otherwise
+
+    :param now: the current datetime (default: dt.datetime.now())
     """
-    return date < dt.datetime.now()
+    return date < (now or dt.datetime.now())
+
+
+class DeadlineScheduler:
+    def __init__(self, clock: Callable[[], dt.datetime] = dt.datetime.now):
+        """
+        Keeps track of the deadlines (e.g. section end dates) of a set of keys (e.g. section ids) in a min-heap
+        so the keys whose deadlines have passed can be found without checking every deadline.
+        pop_due() only reads the clock while a deadline is scheduled and then only compares it with the earliest one.
+
+        :param clock: function returning the current datetime (replace to control time in tests)
+        """
+        self.clock = clock
+        self._deadlines: Dict[Hashable, dt.datetime] = dict()  # key: its current deadline
+        # (deadline, insertion count, key) - entries for cancelled/rescheduled keys are skipped once they reach the top
+        self._heap: List[Tuple[dt.datetime, int, Hashable]] = list()
+        self._counter = count()  # so keys never need comparing
+
+    def __len__(self) -> int:
+        return len(self._deadlines)
+
+    def __repr__(self) -> str:
+        return f'<DeadlineScheduler object with {len(self)} deadline(s)>'
+
+    def schedule(self, key: Hashable, deadline: dt.datetime) -> None:
+        """
+        Sets the deadline of key, replacing any deadline it already had
+        """
+        self._deadlines[key] = deadline
+        heapq.heappush(self._heap, (deadline, next(self._counter), key))
+        if len(self._heap) > 2 * len(self._deadlines) + 32:  # mostly cancelled entries
+            self._heap = [(deadline, next(self._counter), key) for key, deadline in self._deadlines.items()]
+            heapq.heapify(self._heap)
+
+    def cancel(self, key: Hashable) -> None:
+        """
+        Removes the deadline of key (if it has one)
+        """
+        self._deadlines.pop(key, None)
+
+    def clear(self) -> None:
+        self._deadlines.clear()
+        self._heap.clear()
+
+    def pop_due(self) -> List[Hashable]:
+        """
+        Removes and returns every key whose deadline is in the past (see date_in_past()), earliest first
+        """
+        if not self._deadlines:
+            self._heap.clear()
+            return []
+
+        now = self.clock()
+        due_keys = list()
+        while self._heap and self._heap[0][0] < now:
+            deadline, _, key = heapq.heappop(self._heap)
+            if self._deadlines.get(key) == deadline:
+                del self._deadlines[key]
+                due_keys.append(key)
+        return due_keys
+
+    def next_deadlines(self, n: int) -> List[Tuple[dt.datetime, Hashable]]:
+        """
+        Returns the n earliest (deadline, key) pairs still scheduled, earliest first
+        """
+        return heapq.nsmallest(n, ((deadline, key) for key, deadline in self._deadlines.items()),
+                               key=lambda deadline_key: deadline_key[0])
 
 
 def get_possible_timeframes(level: str, section_type: str,
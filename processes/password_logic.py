@@ -1,9 +1,13 @@
 import binascii
+import datetime as dt
 import hashlib
+import hmac
 import logging
 import os
 import string
-from typing import Dict
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
 
 
 class PasswordError(Exception):
@@ -32,36 +36,247 @@ class PasswordError(Exception):
         super().__init__(self.message)
 
 
+# Password hashes are stored as self-describing strings of at most 128 chars:
+#   '<algorithm>$<parameters>$<salt hex>$<digest hex>'
+# e.g. 'pbkdf2_sha256$100000$<32 hex chars>$<64 hex chars>' or 'scrypt$16384,8,1$<32 hex chars>$<64 hex chars>'
+# so the algorithm and its cost can be changed below without invalidating existing passwords:
+# outdated hashes are still verified and are replaced after the next successful login (see needs_rehash()).
+HASH_SEPARATOR = '$'
+DEFAULT_HASH_ALGORITHM = 'pbkdf2_sha256'
+# algorithm: parameters used for new hashes - tune so that hashing takes ~0.1s on the hardware used
+HASH_PARAMETERS = {
+    # 100000 iterations of sha256 recommended at
+    # https://docs.python.org/3/library/hashlib.html#hashlib.pbkdf2_hmac
+    'pbkdf2_sha256': (100000,),
+    'scrypt': (2 ** 14, 8, 1),  # n (cost), r (block size), p (parallelisation)
+}
+SALT_BYTES = 16
+DIGEST_BYTES = 32
+
+
 # Functions for hashing and verifying password adapted from code at
 # https://www.vitoshacademy.com/hashing-passwords-in-python/
-def hash_pwd_str(provided_password: str) -> str:
+# (hashes in its original format are still verified - see parse_pwd_hash())
+def _calculate_digest(algorithm: str, parameters: Tuple[int, ...], password: bytes, salt: bytes) -> str:
+    """
+    Returns the hex digest of password and salt using the algorithm with the given parameters
+    """
+    if algorithm == 'pbkdf2_sha256':
+        iterations, = parameters
+        digest = hashlib.pbkdf2_hmac('sha256', password, salt, iterations)
+    elif algorithm == 'scrypt':
+        n, r, p = parameters
+        digest = hashlib.scrypt(password, salt=salt, n=n, r=r, p=p, maxmem=2 * 128 * n * r * p, dklen=DIGEST_BYTES)
+    else:
+        error_str = f'Unknown password hash algorithm {algorithm!r}'
+        logging.error(error_str)
+        raise ValueError(error_str)
+    return binascii.hexlify(digest).decode('ascii')
+
+
+def parse_pwd_hash(stored_hash: str) -> Tuple[str, Tuple[int, ...], bytes, str]:
     """
-    Returns a 128 char hashed str of the provided_password string to be stored.
+    Returns the (algorithm, parameters, salt, digest) of a stored password hash.
+    Hashes in the original fixed format (64 hex chars of salt then the digest, always 100000 iterations
+    of pbkdf2_sha256) are returned with the algorithm 'pbkdf2_sha256_legacy'.
+    Raises a ValueError if stored_hash isn't in either format.
+    """
+    if HASH_SEPARATOR not in stored_hash and len(stored_hash) == 128:
+        # the legacy salt was the hex string itself rather than the bytes it represents
+        return 'pbkdf2_sha256_legacy', (100000,), stored_hash[:64].encode('ascii'), stored_hash[64:]
+
+    try:
+        algorithm, parameters_str, salt_hex, digest = stored_hash.split(HASH_SEPARATOR)
+        parameters = tuple(int(parameter) for parameter in parameters_str.split(','))
+        salt = binascii.unhexlify(salt_hex)
+    except (ValueError, binascii.Error):
+        error_str = f'Password hash {stored_hash[:20]!r}... is not in a recognised format'
+        logging.error(error_str)
+        raise ValueError(error_str) from None
+    return algorithm, parameters, salt, digest
+
+
+def hash_pwd_str(provided_password: str, algorithm: str = None) -> str:
+    """
+    Returns a hashed str (at most 128 chars) of the provided_password string to be stored.
+
+    :param algorithm: a key of HASH_PARAMETERS (default: DEFAULT_HASH_ALGORITHM)
     """
     if len(provided_password) > 100:
         raise PasswordError('length')
 
-    random_bytes = os.urandom(60)
-    salt = hashlib.sha256(random_bytes).hexdigest().encode('ascii')
-
-    provided_password = provided_password.encode('utf-8')
-    # 100000 iterations of sha256 recommended at
-    # https://docs.python.org/3/library/hashlib.html#hashlib.pbkdf2_hmac
-    pwdhash = hashlib.pbkdf2_hmac('sha256', provided_password, salt, 100000)
-    pwdhash = binascii.hexlify(pwdhash)
-    return (salt + pwdhash).decode('ascii')
+    algorithm = algorithm or DEFAULT_HASH_ALGORITHM
+    parameters = HASH_PARAMETERS[algorithm]
+    salt = os.urandom(SALT_BYTES)
+    digest = _calculate_digest(algorithm, parameters, provided_password.encode('utf-8'), salt)
+    return HASH_SEPARATOR.join((algorithm, ','.join(map(str, parameters)),
+                                binascii.hexlify(salt).decode('ascii'), digest))
 
 
 def verify_pwd_str(provided_password: str, stored_hash: str) -> bool:
     """
-    Returns a boolean of whether provided_password matches the stored password/hash
+    Returns a boolean of whether provided_password matches the stored password/hash (in any format)
+    """
+    try:
+        algorithm, parameters, salt, stored_digest = parse_pwd_hash(stored_hash)
+        if algorithm == 'pbkdf2_sha256_legacy':
+            algorithm = 'pbkdf2_sha256'
+        digest = _calculate_digest(algorithm, parameters, provided_password.encode('utf-8'), salt)
+    except ValueError:  # unreadable hashes can't match any password (already logged)
+        return False
+    return hmac.compare_digest(digest, stored_digest)
+
+
+def needs_rehash(stored_hash: str) -> bool:
+    """
+    Returns whether stored_hash was made with a different algorithm or parameters
+    to those currently used for new hashes (see DEFAULT_HASH_ALGORITHM and HASH_PARAMETERS)
+    """
+    try:
+        algorithm, parameters, _, _ = parse_pwd_hash(stored_hash)
+    except ValueError:
+        return True
+    return algorithm != DEFAULT_HASH_ALGORITHM or parameters != HASH_PARAMETERS[DEFAULT_HASH_ALGORITHM]
+
+
+def verify_and_update_pwd_str(provided_password: str, stored_hash: str) -> Tuple[bool, Optional[str]]:
+    """
+    Verifies provided_password against stored_hash (see verify_pwd_str()).
+    Returns a tuple of whether it matched and, if it did but stored_hash is outdated (see needs_rehash()),
+    a new hash of provided_password to store in its place (otherwise None).
+    """
+    if not verify_pwd_str(provided_password, stored_hash):
+        return False, None
+    if needs_rehash(stored_hash):
+        return True, hash_pwd_str(provided_password)
+    return True, None
+
+
+def _hash_pwd_chunk(provided_passwords: Sequence[str]) -> List[str]:
+    return [hash_pwd_str(provided_password) for provided_password in provided_passwords]
+
+
+def hash_pwd_strs(provided_passwords: Sequence[str], max_workers: int = None, chunk_size: int = None,
+                  progress_callback: Callable[[int, int], None] = None) -> List[str]:
     """
-    salt = stored_hash[:64].encode('ascii')
-    stored_password = stored_hash[64:]
-    provided_password = provided_password.encode('utf-8')
-    pwdhash = hashlib.pbkdf2_hmac('sha256', provided_password, salt, 100000)
-    pwdhash = binascii.hexlify(pwdhash).decode('ascii')
-    return pwdhash == stored_password
+    Returns a list of the hashes (see hash_pwd_str()) of each of provided_passwords, in the same order.
+    Hashing is spread over a pool of processes (one per CPU core by default) in chunks,
+    so bulk account creation (e.g. populate_tables.populate_db()) takes less time on machines with more cores.
+
+    :param max_workers: maximum number of processes to use (default: number of CPU cores).
+        If 1, or there is only one chunk, the passwords are hashed in this process.
+    :param chunk_size: number of passwords hashed by a process at a time
+        (default: so that each process gets about 4 chunks, to balance load while keeping overhead low)
+    :param progress_callback: called with (number of passwords hashed so far, total number of passwords)
+        every time a chunk is finished
+    """
+    for provided_password in provided_passwords:
+        if len(provided_password) > 100:  # checked first so no passwords are hashed if any are invalid
+            raise PasswordError('length')
+
+    total = len(provided_passwords)
+    max_workers = max_workers or os.cpu_count() or 1
+    chunk_size = chunk_size or max(1, -(-total // (max_workers * 4)))  # ceiling division
+    chunks = [provided_passwords[i:i + chunk_size] for i in range(0, total, chunk_size)]
+
+    if max_workers == 1 or len(chunks) <= 1:
+        pwd_hashes = list()
+        for chunk in chunks:
+            pwd_hashes.extend(_hash_pwd_chunk(chunk))
+            if progress_callback is not None:
+                progress_callback(len(pwd_hashes), total)
+        return pwd_hashes
+
+    chunk_hashes: List[List[str]] = [list() for _ in chunks]
+    num_hashed = 0
+    with ProcessPoolExecutor(max_workers=min(max_workers, len(chunks))) as executor:
+        future_indexes = {executor.submit(_hash_pwd_chunk, chunk): i for i, chunk in enumerate(chunks)}
+        for future in as_completed(future_indexes):  # chunks may finish out of order
+            chunk_hashes[future_indexes[future]] = future.result()
+            num_hashed += len(chunk_hashes[future_indexes[future]])
+            if progress_callback is not None:
+                progress_callback(num_hashed, total)
+
+    logging.debug(f'{total} passwords hashed in {len(chunks)} chunks by up to {max_workers} processes')
+    return [pwd_hash for chunk in chunk_hashes for pwd_hash in chunk]
+
+
+class SessionCache:
+    def __init__(self, lifetime: dt.timedelta = dt.timedelta(minutes=30), max_sessions: int = 256,
+                 clock: Callable[[], dt.datetime] = dt.datetime.now):
+        """
+        An optional in-memory cache of login sessions so that users logging in repeatedly (e.g. staff on shared
+        terminals) only pay the full cost of verify_pwd_str() once per lifetime.
+
+        After a successful verification, issue() stores a token for the user: an HMAC (keyed by a secret
+        random to this cache, so tokens don't survive restarts) of the user type, username, password and stored hash.
+        Tokens are kept per user type (e.g. 'Staff' or 'Student') since staff and students may share usernames.
+        A later login with the same password is accepted by verify() if the token hasn't expired - changing the
+        password (or its hash being replaced) invalidates the token. At most max_sessions tokens are kept,
+        dropping the least recently used. Tokens should be revoked when their user logs out
+        (but not when they only switch user - see ui.staff.StudentOverview.logout()).
+        Not thread-safe - only use from one thread (e.g. the tkinter main thread).
+
+        :param lifetime: time after being issued that each token expires
+        :param clock: function returning the current datetime (replace to control time in tests)
+        """
+        self.lifetime = lifetime
+        self.max_sessions = max_sessions
+        self.clock = clock
+
+        self._secret = os.urandom(32)
+        # (user_type, username): (token, expiry)
+        self._sessions: OrderedDict[Tuple[str, str], Tuple[str, dt.datetime]] = OrderedDict()
+
+    def __repr__(self) -> str:
+        return f'<SessionCache object of {len(self._sessions)} session(s)>'
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+    def _make_token(self, user_type: str, username: str, provided_password: str, stored_hash: str) -> str:
+        message = '\0'.join((user_type, username, provided_password, stored_hash)).encode('utf-8')
+        return hmac.new(self._secret, message, hashlib.sha256).hexdigest()
+
+    def issue(self, user_type: str, username: str, provided_password: str, stored_hash: str) -> str:
+        """
+        Stores and returns a new token for username of user_type. Only call once provided_password
+        has been verified against stored_hash (see verify_pwd_str()).
+        """
+        key = (user_type, username)
+        token = self._make_token(user_type, username, provided_password, stored_hash)
+        self._sessions[key] = (token, self.clock() + self.lifetime)
+        self._sessions.move_to_end(key)
+        while len(self._sessions) > self.max_sessions:
+            self._sessions.popitem(last=False)  # least recently used
+        return token
+
+    def verify(self, user_type: str, username: str, provided_password: str, stored_hash: str) -> bool:
+        """
+        Returns whether username of user_type has an unexpired token matching provided_password and stored_hash.
+        False only means that the password must be verified normally (see verify_pwd_str()).
+        """
+        key = (user_type, username)
+        session = self._sessions.get(key)
+        if session is None:
+            return False
+
+        token, expiry = session
+        if self.clock() >= expiry:
+            del self._sessions[key]
+            return False
+
+        self._sessions.move_to_end(key)
+        return hmac.compare_digest(token, self._make_token(user_type, username, provided_password, stored_hash))
+
+    def revoke(self, user_type: str, username: str) -> None:
+        """
+        Removes the token of username of user_type (if it has one) so their next login is fully verified
+        """
+        self._sessions.pop((user_type, username), None)
+
+    def clear(self) -> None:
+        self._sessions.clear()
 
 
 PASSWORD_NOTICE = """Passwords should be between 6 and 100 characters long and contain at least one each of:
@@ -1,6 +1,7 @@
 import datetime as dt
 import logging
 import re
+import sys
 from typing import Union, Set, Tuple
 
 from processes.datetime_logic import str_to_date_dict, date_dict_to_str, datetime_to_str, DATE_SEPARATOR
@@ -44,9 +45,10 @@ def validate_lookup(value: str, lookup_set: Set[str], attribute_name: str) -> st
     """
     Validates whether value is in lookup_set.
     If this fails, a ValidationError is raised with a descriptive error message.
+    The value returned is interned since there are only a few possible values which are often stored many times.
     """
     if value in lookup_set:
-        return value
+        return sys.intern(value)
     else:
         error_str = f'{attribute_name} provided ("{value}") ' \
                     f'is not in the list of possible options: {", ".join(sorted(lookup_set))}'
@@ -0,0 +1,19 @@
+import os
+import tempfile
+from pathlib import Path
+from unittest import TestCase
+
+
+class TempDirTestCase(TestCase):
+    def setUp(self):
+        """
+        Runs each test within its own empty temporary directory (self.temp_dir) containing a data_tables directory,
+        as Database.get_txt_database_dir() works relative to the current working directory.
+        The original working directory is restored after tearDown().
+        """
+        org_cwd = Path.cwd()
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.temp_dir.cleanup)
+        os.chdir(self.temp_dir.name)
+        self.addCleanup(os.chdir, org_cwd)  # cleanups are run last-in, first-out
+        Path('data_tables').mkdir()
@@ -0,0 +1,65 @@
+import datetime as dt
+import unittest
+from unittest import TestCase
+
+from data_tables import batch_status
+from data_tables.data_handling import Resource, ResourceTable, Section, SectionTable, Student, StudentTable
+
+
+@unittest.skipUnless(batch_status.np is not None, 'NumPy is not installed')
+class TestCohortProgress(TestCase):
+    def setUp(self):
+        now = dt.datetime.now()
+        self.section_table = SectionTable([
+            Section.from_field_values({'section_id': section_id, 'activity_start_date': start_date,
+                                       'activity_timescale': '90'})
+            for section_id, start_date in ((1, dt.datetime(2020, 1, 1)), (2, dt.datetime(2020, 1, 1)),
+                                           (3, dt.datetime(now.year, now.month, now.day)),
+                                           (4, dt.datetime(2020, 1, 1)))
+        ])
+        self.resource_table = ResourceTable([Resource(1, 'uploads\\report.pdf', 1, 'section_evidence', 1, '2020/10/10'),
+                                             Resource(2, 'uploads\\evidence.pdf', 0, 'section_evidence', 2,
+                                                      '2020/10/10')])
+
+        students = [Student(1, 12345, 'gold', 10, is_approved=1), Student(2, 12345, 'gold', 10, is_approved=1),
+                    Student(3, 12345, 'gold', 10, is_approved=1), Student(4, 12345, 'gold', 10),
+                    Student(5, 12345, 'gold', 10)]
+        students[1].vol_info_id, students[1].skill_info_id = 1, 2
+        students[2].vol_info_id, students[2].skill_info_id, students[2].phys_info_id = 3, 4, ''
+        students[4].fullname = 'Test Student'
+        self.student_table = StudentTable(students)
+
+    def test_matches_per_object_methods(self):
+        progress = batch_status.calculate_cohort_progress(self.student_table, self.section_table, self.resource_table)
+        expected_summaries = {student.student_id: student.get_progress_summary(self.section_table, self.resource_table)
+                              for student in self.student_table.row_dict.values()}
+        self.assertEqual(progress.summary_dict(), expected_summaries, 'Summaries differ from per-object method')
+
+        section_statuses = batch_status.calculate_section_statuses(self.section_table, self.resource_table)
+        self.assertEqual([batch_status.SECTION_STATUS_STRINGS[code] for code in section_statuses.status_codes],
+                         [section.get_activity_status(self.resource_table)
+                          for section in self.section_table.row_dict.values()],
+                         'Section statuses differ from per-object method')
+
+    def test_injected_clock(self):
+        self.resource_table.set_clock(lambda: dt.datetime(2020, 2, 1))  # before the end date of every section
+        progress = batch_status.calculate_cohort_progress(self.student_table, self.section_table, self.resource_table)
+        expected_summaries = {student.student_id: student.get_progress_summary(self.section_table, self.resource_table)
+                              for student in self.student_table.row_dict.values()}
+        self.assertEqual(progress.summary_dict(), expected_summaries, 'Summaries differ at injected clock time')
+        self.assertEqual(progress.summary_dict()[2], 'Partially in progress',
+                         'Clock of resource_table not used')
+
+    def test_missing_section(self):
+        self.student_table.row_dict[1].phys_info_id = 99
+        with self.assertRaises(KeyError):
+            batch_status.calculate_cohort_progress(self.student_table, self.section_table, self.resource_table)
+
+
+class TestDefaultClock(TestCase):
+    def test_resource_table_clock(self):
+        resource_table = ResourceTable(clock=lambda: dt.datetime(1970, 1, 2))
+        self.assertEqual(batch_status._now_microseconds(resource_table), batch_status.MICROSECONDS_PER_DAY,
+                         'Clock of resource_table not used by default')
+        self.assertEqual(batch_status._now_microseconds(resource_table, dt.datetime(1970, 1, 1)), 0,
+                         'Explicit time not used')
@@ -1,9 +1,15 @@
+import datetime as dt
+import random
+import tempfile
 from copy import deepcopy
 from pathlib import Path
 from unittest import TestCase
 
-from data_tables.data_handling import StudentLogin, StudentLoginTable
+from data_tables.data_handling import Database, Resource, ResourceTable, Section, Student, StudentLogin, \
+    StudentLoginTable, StudentTable, file_checksum, get_file_chunks, get_temp_path, parse_row_string, \
+    parse_table_file_chunk
 from processes.validation import ValidationError
+from tests.temp_dir_test_case import TempDirTestCase
 
 TEST_STUDENT_SAVE_STRING = f'{"test name".ljust(30)}\\%s' \
                            f'{"test pwd hash".ljust(128)}\\%s{"1".ljust(5)}\\%s\n'
@@ -60,6 +66,57 @@ class TestStudentLoginTable(TestCase):
         )
         self.assertEqual(len(test_table.row_dict), 2, 'Unique row incorrectly not added')
 
+    def test_add_rows(self):
+        test_table = StudentLoginTable()
+        self.assertEqual(test_table.add_rows(StudentLogin(f'name {i}', 'test pwd hash', i) for i in range(3)), 3,
+                         'Wrong number of rows added')
+
+        with self.assertRaises(KeyError):
+            test_table.add_rows([StudentLogin('new name', 'test pwd hash', 3),
+                                 StudentLogin('new name', 'test pwd hash', 4)])
+        with self.assertRaises(KeyError):
+            test_table.add_rows([StudentLogin('other name', 'test pwd hash', 3),
+                                 StudentLogin('name 0', 'test pwd hash', 4)])
+        self.assertEqual(sorted(test_table.row_dict), ['name 0', 'name 1', 'name 2'],
+                         'Rows from a batch with a non-unique key were added')
+        self.assertEqual(test_table.lookup('student_id', 3), [], 'Index not rolled back')
+
+    def test_lookup(self):
+        test_table = StudentLoginTable([StudentLogin('name a', 'test pwd hash', 1),
+                                        StudentLogin('name b', 'test pwd hash', 1)])
+        self.assertEqual(sorted(r.username for r in test_table.lookup('student_id', 1)), ['name a', 'name b'],
+                         'Rows missing from index')
+
+        test_table.row_dict['name a'].student_id = 2
+        test_table.delete_row('name b')
+        self.assertEqual(test_table.lookup('student_id', 1), [], 'Index not updated after change/deletion')
+        self.assertEqual([r.username for r in test_table.lookup('student_id', 2)], ['name a'],
+                         'Changed row not moved within index')
+
+        test_table.clear()
+        self.assertEqual(test_table.lookup('student_id', 2), [], 'Index not emptied by clear()')
+        with self.assertRaises(KeyError):
+            test_table.lookup('password_hash', 'test pwd hash')
+
+    def test_select(self):
+        test_table = StudentLoginTable([StudentLogin('name c', 'hash 1', 2), StudentLogin('name a', 'hash 2', 1),
+                                        StudentLogin('name b', 'hash 1', 1)])
+        self.assertEqual([r.username for r in test_table.select(where={'student_id': 1})], ['name a', 'name b'],
+                         'Indexed rows not selected in order added')
+        self.assertIn('index lookup on student_id', test_table.explain(where={'student_id': 1}),
+                      'Index not used for indexed field')
+        self.assertEqual([r.username for r in test_table.select(where={'username': 'name b', 'student_id': 1})],
+                         ['name b'], 'Row not selected by primary key')
+
+        selected = test_table.select(where={'password_hash': 'hash 1'}, order_by='-username', limit=1)
+        self.assertEqual([r.username for r in selected], ['name c'], 'Rows not filtered, ordered and limited')
+        self.assertIn('full scan', test_table.explain(where={'password_hash': 'hash 1'}), 'Unindexed field not scanned')
+
+        selected = test_table.select(where={'username': lambda username: username != 'name b'}, order_by='student_id')
+        self.assertEqual([r.username for r in selected], ['name a', 'name c'], 'Rows not ordered using index')
+        with self.assertRaises(KeyError):
+            test_table.select(where={'fullname': 'test'})
+
     def test_load_from_file(self):
         test_file_path = Path.cwd() / 'test_student_load.txt'
         with test_file_path.open('w+') as fobj:
@@ -70,6 +127,20 @@ class TestStudentLoginTable(TestCase):
         self.assertEqual(test_table.row_dict['test name'].student_id, 1,
                          'New row not correctly loaded from txt file')
 
+    def test_load_from_file_progress(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            test_file_path = Path(temp_dir) / 'test_student_load.txt'
+            with test_file_path.open('w+') as fobj:
+                for i in range(5):
+                    fobj.write(StudentLogin(f'test name {i}', 'test pwd hash', i).tabulate())
+
+            progress_list = []
+            test_table = StudentLoginTable()
+            test_table.load_from_file(test_file_path.open('r'), progress_callback=progress_list.append,
+                                      progress_interval=2)
+            self.assertEqual(progress_list, [2, 4, 5], 'Progress callback not called with row counts')
+            self.assertEqual(len(test_table.row_dict), 5, 'Not all rows loaded from txt file')
+
     def test_save_to_file(self):
         test_file_path = Path.cwd() / 'test_student_save.txt'
 
@@ -81,6 +152,107 @@ class TestStudentLoginTable(TestCase):
                                  'Held rows not correctly saved to txt file')
 
 
+class TestStudentTable(TestCase):
+    def test_compact_rows(self):
+        student = Student(1, 68362, 'Bronze', 10)
+        self.assertFalse(hasattr(student, '__dict__'), 'Rows should only use __slots__')
+        self.assertIs(student.award_level, Student(2, 68362, 'bronze', 11).award_level,
+                      'Categorical field values not interned')
+        self.assertEqual(len(parse_row_string(student.tabulate())), len(Student.fields),
+                         'Not every field tabulated')
+
+    def test_get_new_key_id(self):
+        test_table = StudentTable()
+        self.assertEqual(test_table.get_new_key_id(), 1, 'Ids should start at 1')
+
+        for student_id in (1, 2, 5):
+            test_table.add_row(Student(student_id, 68362, 'bronze', 10))
+        self.assertEqual(test_table.get_new_key_id(), 3, 'Smallest free id not returned')
+
+        test_table.add_row(Student(3, 68362, 'bronze', 10))
+        test_table.add_row(Student(4, 68362, 'bronze', 10))
+        self.assertEqual(test_table.get_new_key_id(), 6, 'Id after the largest id not returned')
+
+        test_table.delete_row(2)
+        self.assertEqual(test_table.get_new_key_id(), 2, 'Deleted id not reused')
+
+        test_table.clear()
+        self.assertEqual(test_table.get_new_key_id(), 1, 'Ids not reset by clear()')
+
+    def test_free_key_ids_bounded(self):
+        test_table = StudentTable([Student(1, 68362, 'bronze', 10), Student(10 ** 9, 68362, 'bronze', 10)])
+        for _ in range(100):  # e.g. replayed journal records replacing a row
+            test_table.delete_row(1)
+            test_table.add_row(Student(1, 68362, 'bronze', 10))
+        self.assertEqual(test_table.get_new_key_id(), 2, 'Smallest free id not returned')
+        self.assertEqual(len(test_table._free_key_starts), 1, 'Free ids not stored as one range')
+
+        random_ids = random.Random(0).sample(range(2, 200), 100)
+        for student_id in random_ids:
+            test_table.add_row(Student(student_id, 68362, 'bronze', 10))
+        for student_id in random_ids[::2]:
+            test_table.delete_row(student_id)
+        expected_id = next(key_id for key_id in range(1, 10 ** 9) if key_id not in test_table.row_dict)
+        self.assertEqual(test_table.get_new_key_id(), expected_id, 'Smallest free id not returned after deletes')
+
+
+    def test_grouped_update(self):
+        test_table = StudentTable([Student(1, 68362, 'bronze', 10)])
+        changes = list()
+        test_table.change_listeners.append(lambda op, row_objs: changes.append((op, [row_obj.fullname
+                                                                                     for row_obj in row_objs])))
+        with test_table.row_dict[1].updating():
+            test_table.row_dict[1].fullname = 'Test Student'
+            test_table.row_dict[1].gender = 'female'
+            self.assertEqual(changes, [], 'Change recorded before update finished')
+        self.assertEqual(changes, [('put', ['Test Student'])], 'Update not recorded once')
+
+        with test_table.row_dict[1].updating():
+            pass
+        self.assertEqual(len(changes), 1, 'Unchanged row recorded')
+
+class TestSectionStatusCache(TestCase):
+    def setUp(self):
+        self.section = Section.from_field_values({'section_id': 1, 'activity_start_date': dt.datetime(2020, 1, 1),
+                                                  'activity_timescale': '90'})
+        self.resource_table = ResourceTable([Resource(1, 'uploads\\evidence.pdf', 0, 'section_evidence', 1,
+                                                      '2020/10/10')])
+
+    def test_invalidated_by_resource_change(self):
+        self.assertEqual(self.section.get_activity_status(self.resource_table), 'Needs report', 'Incorrect status')
+        self.assertEqual(self.resource_table.get_cached_section_status(self.section), 'Needs report',
+                         'Status not cached')
+
+        self.resource_table.row_dict[1].is_section_report = 1
+        self.assertIsNone(self.resource_table.get_cached_section_status(self.section),
+                          'Status not invalidated by report being marked')
+        self.assertEqual(self.section.get_activity_status(self.resource_table), 'Fully completed',
+                         'Incorrect status after report marked')
+
+        self.resource_table.delete_row(1)
+        self.assertEqual(self.section.get_activity_status(self.resource_table), 'Needs report',
+                         'Incorrect status after report deleted')
+
+    def test_expiry(self):
+        self.resource_table.cache_section_status(self.section, 'In progress', expiry_date=dt.datetime(2020, 3, 31))
+        self.assertIsNone(self.resource_table.get_cached_section_status(self.section), 'Expired status returned')
+
+        self.resource_table.cache_section_status(self.section, 'In progress', expiry_date=dt.datetime(9999, 1, 1))
+        self.assertEqual(self.resource_table.get_cached_section_status(self.section), 'In progress',
+                         'Unexpired status not returned')
+
+    def test_explicit_now(self):
+        self.resource_table.set_clock(lambda: dt.datetime(2020, 2, 1))
+        self.assertEqual(self.section.get_activity_status(self.resource_table, dt.datetime(2021, 1, 1)),
+                         'Needs report', 'Incorrect status at explicit time')
+        self.assertIsNone(self.resource_table.get_cached_section_status(self.section),
+                          'Status at explicit time cached')
+        self.assertEqual(self.section.get_activity_status(self.resource_table), 'In progress',
+                         'Incorrect status at clock time')
+        self.assertEqual(self.section.get_activity_status(self.resource_table, dt.datetime(2021, 1, 1)),
+                         'Needs report', 'Cached status returned for explicit time')
+
+
 class TestDatabase(TestCase):
     # wouldbenice: add Database tests
     def test_get_txt_database_dir(self):
@@ -91,3 +263,161 @@ class TestDatabase(TestCase):
 
     def test_save_state_to_file(self):
         self.fail()
+
+
+class TestDatabaseModifiedTables(TempDirTestCase):
+    def setUp(self):
+        super().setUp()
+        self.db = Database()
+        self.db.save_state_to_file()
+
+    def test_is_modified(self):
+        login_table = self.db.get_table_by_name('StudentLoginTable')
+        self.assertFalse(login_table.is_modified, 'Table marked as modified after save')
+
+        login_table.add_row(StudentLogin('test name', 'test pwd hash', 1))
+        self.assertTrue(login_table.is_modified, 'Added row did not mark table as modified')
+
+        self.db.save_state_to_file()
+        login_table.row_dict['test name'].student_id = 2  # in-place edit
+        self.assertTrue(login_table.is_modified, 'Edited row did not mark table as modified')
+
+    def test_unmodified_tables_skipped(self):
+        staff_path = self.db.get_txt_database_dir() / 'StaffTable.txt'
+        staff_path.write_text('not overwritten')
+
+        self.db.get_table_by_name('StudentLoginTable').add_row(StudentLogin('test name', 'test pwd hash', 1))
+        self.db.save_state_to_file()
+
+        self.assertEqual(staff_path.read_text(), 'not overwritten', 'Unmodified table was saved')
+        login_path = self.db.get_txt_database_dir() / 'StudentLoginTable.txt'
+        self.assertIn('test name', login_path.read_text(), 'Modified table was not saved')
+
+        # saving under a different suffix must still write every table
+        self.db.save_state_to_file(suffix=' (backup)')
+        self.assertTrue((self.db.get_txt_database_dir() / 'StaffTable (backup).txt').exists(),
+                        'Table skipped when saving to new files')
+
+
+class TestTrustedLoad(TempDirTestCase):
+    def setUp(self):
+        super().setUp()
+        self.student = Student(1, 68362, 'bronze', 10, 1, 'Test Student', 'female', '2005/01/01',
+                               'Test address', '0123456789', 'test@test.com', '0123456789', 'english', '2020/10/10',
+                               vol_info_id=3)
+
+    def test_from_field_strings(self):
+        trusted_student = Student.from_field_strings(parse_row_string(self.student.tabulate()))
+        for field_name in Student.fields:
+            self.assertEqual(getattr(trusted_student, field_name), getattr(self.student, field_name),
+                             f'Field {field_name} not converted back to its original value')
+
+    def test_checksum_mismatch_validated(self):
+        db = Database()
+        db.get_table_by_name('StudentTable').add_row(self.student)
+        db.save_state_to_file()
+
+        new_db = Database()
+        new_db.load_state_from_file()
+        self.assertEqual(new_db.get_table_by_name('StudentTable').row_dict[1].tabulate(), self.student.tabulate(),
+                         'Student not identical after trusted load')
+        new_db.load_state_from_file(verify=True)
+        self.assertIn(1, new_db.get_table_by_name('StudentTable').row_dict, 'Student missing after verified load')
+
+        # an invalid edit made outside the program must still be caught
+        student_path = db.get_table_path('StudentTable')
+        student_path.write_text(student_path.read_text().replace('bronze', 'purple'))
+        with self.assertRaises(ValidationError):
+            new_db.load_state_from_file()
+
+
+class TestParallelLoad(TempDirTestCase):
+    def setUp(self):
+        super().setUp()
+        self.db = Database()
+        self.db.get_table_by_name('StudentLoginTable').add_rows(
+            StudentLogin(f'name {i}', 'test pwd hash', i) for i in range(1, 101))
+        self.db.save_state_to_file()
+
+    def test_file_chunks(self):
+        login_path = self.db.get_table_path('StudentLoginTable')
+        chunk_list = get_file_chunks(login_path, chunk_size=1000)
+        self.assertGreater(len(chunk_list), 1, 'File not split into chunks')
+        self.assertEqual(chunk_list[-1][1], login_path.stat().st_size, 'Chunks do not cover whole file')
+
+        parsed_rows = [field_strings for start, end in chunk_list
+                       for field_strings in parse_table_file_chunk(login_path, start, end)]
+        with login_path.open(mode='r') as fobj:
+            self.assertEqual(parsed_rows, [parse_row_string(row) for row in fobj], 'Rows split between chunks')
+
+    def test_parallel_load(self):
+        new_db = Database()
+        new_db.load_state_from_file(parallel=True)
+        self.assertEqual(list(new_db.get_table_by_name('StudentLoginTable').row_dict),
+                         list(self.db.get_table_by_name('StudentLoginTable').row_dict),
+                         'Rows missing or out of order after parallel load')
+
+        new_db.load_state_from_file(verify=True, parallel=True)  # rows validated by the worker processes
+        self.assertEqual(new_db.get_table_by_name('StudentLoginTable').row_dict['name 1'].student_id, 1,
+                         'Validated row not loaded correctly')
+
+
+class TestCrashSafeSave(TempDirTestCase):
+    def setUp(self):
+        super().setUp()
+        self.db = Database()
+        self.login_table = self.db.get_table_by_name('StudentLoginTable')
+        self.login_table.add_row(StudentLogin('test name', 'test pwd hash', 1))
+        self.db.save_state_to_file()
+        self.login_path = self.db.get_table_path('StudentLoginTable')
+
+    def test_uncommitted_save_discarded(self):
+        get_temp_path(self.login_path).write_text('half written ro')
+
+        new_db = Database()
+        new_db.load_state_from_file()
+        self.assertIn('test name', new_db.get_table_by_name('StudentLoginTable').row_dict, 'Saved table not kept')
+        self.assertFalse(get_temp_path(self.login_path).exists(), 'Uncommitted temporary file not deleted')
+
+    def test_committed_save_completed(self):
+        # as if the program crashed after committing the new checksums but before replacing the table
+        self.login_table.add_row(StudentLogin('new name', 'test pwd hash', 2))
+        temp_path = get_temp_path(self.login_path)
+        self.login_table.save_to_file(temp_path.open(mode='w'))
+        checksum_dict = self.db.read_checksums()
+        checksum_dict[self.login_path.name] = file_checksum(temp_path)
+        self.db.write_checksums(checksum_dict)
+
+        new_db = Database()
+        new_db.load_state_from_file()
+        self.assertIn('new name', new_db.get_table_by_name('StudentLoginTable').row_dict,
+                      'Committed table not moved into place')
+        self.assertFalse(temp_path.exists(), 'Temporary file left behind')
+
+
+class TestBinaryTables(TempDirTestCase):
+    def test_convert_table_format(self):
+        db = Database()
+        db.get_table_by_name('StudentLoginTable').add_row(StudentLogin('test name', 'test pwd hash', 1))
+        db.get_table_by_name('StudentTable').add_row(
+            Student(1, 68362, 'bronze', 10, 1, 'Test Student', 'female', '2005/01/01',
+                    'Test address', '0123456789', 'test@test.com', '0123456789', 'english', '2020/10/10',
+                    vol_info_id=3)
+        )
+        db.save_state_to_file()
+        db.convert_table_format('bin')
+
+        bin_db = Database(table_format='bin')
+        bin_db.load_state_from_file()
+        org_student = db.get_table_by_name('StudentTable').row_dict[1]
+        bin_student = bin_db.get_table_by_name('StudentTable').row_dict[1]
+        self.assertEqual(bin_student.tabulate(), org_student.tabulate(), 'Student not identical after conversion')
+        self.assertEqual((bin_student.vol_info_id, bin_student.skill_info_id), (3, ''),
+                         'Optional integer fields not loaded correctly')
+
+        # and back to txt again
+        bin_db.convert_table_format('txt', suffix=' (converted)')
+        txt_db = Database()
+        txt_db.load_state_from_file(suffix=' (converted)')
+        self.assertIn('test name', txt_db.get_table_by_name('StudentLoginTable').row_dict,
+                      'StudentLogin missing after conversion')
@@ -0,0 +1,34 @@
+import datetime as dt
+from unittest import TestCase
+
+from processes.datetime_logic import DeadlineScheduler
+
+
+class TestDeadlineScheduler(TestCase):
+    def setUp(self):
+        self.now = dt.datetime(2021, 1, 1)
+        self.scheduler = DeadlineScheduler(clock=lambda: self.now)
+
+    def test_pop_due(self):
+        self.scheduler.schedule('b', dt.datetime(2021, 1, 3))
+        self.scheduler.schedule('a', dt.datetime(2021, 1, 2))
+        self.scheduler.schedule('c', dt.datetime(2021, 1, 4))
+        self.assertEqual(self.scheduler.pop_due(), [], 'Future deadlines popped')
+
+        self.now = dt.datetime(2021, 1, 3, 12)
+        self.assertEqual(self.scheduler.pop_due(), ['a', 'b'], 'Passed deadlines not popped in order')
+        self.assertEqual(self.scheduler.pop_due(), [], 'Deadlines popped twice')
+        self.assertEqual(len(self.scheduler), 1, 'Incorrect number of deadlines left')
+
+    def test_reschedule_and_cancel(self):
+        self.scheduler.schedule('a', dt.datetime(2021, 1, 2))
+        self.scheduler.schedule('a', dt.datetime(2021, 1, 5))  # replaces the earlier deadline
+        self.scheduler.schedule('b', dt.datetime(2021, 1, 3))
+        self.scheduler.schedule('c', dt.datetime(2021, 1, 4))
+        self.scheduler.cancel('c')
+        self.assertEqual(self.scheduler.next_deadlines(2), [(dt.datetime(2021, 1, 3), 'b'),
+                                                            (dt.datetime(2021, 1, 5), 'a')],
+                         'Incorrect next deadlines')
+
+        self.now = dt.datetime(2021, 1, 4, 12)
+        self.assertEqual(self.scheduler.pop_due(), ['b'], 'Rescheduled or cancelled deadline popped')
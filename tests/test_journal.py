@@ -0,0 +1,105 @@
+import tempfile
+from pathlib import Path
+from unittest import TestCase
+
+from data_tables.data_handling import Database, Student, StudentLogin
+from data_tables.journal import Journal
+from tests.temp_dir_test_case import TempDirTestCase
+
+
+class TestJournal(TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.journal = Journal(Path(self.temp_dir.name) / 'Journal.txt')
+
+    def tearDown(self):
+        self.journal.close()
+        self.temp_dir.cleanup()
+
+    def test_append_and_read(self):
+        self.journal.open()
+        self.journal.append('put', 'StudentLoginTable', 'a b\\e%f')
+        self.journal.append('del', 'StudentLoginTable', 'a b')
+        self.assertEqual(self.journal.record_count, 2, 'Appended records not counted')
+        self.assertEqual(list(self.journal.read_records()),
+                         [('put', 'StudentLoginTable', 'a b\\e%f'), ('del', 'StudentLoginTable', 'a b')],
+                         'Records not read back in the order they were written')
+
+        with self.assertRaises(ValueError):
+            self.journal.append('update', 'StudentLoginTable', 'a b')
+
+    def test_incomplete_record_ignored(self):
+        self.journal.journal_path.write_text('del StudentTable 1\ndel StudentTa')
+        self.assertEqual(list(self.journal.read_records()), [('del', 'StudentTable', '1')],
+                         'Partially written record should be ignored')
+
+    def test_reset(self):
+        self.journal.open()
+        self.journal.append('del', 'StudentTable', '1')
+        self.journal.reset()
+        self.assertEqual(self.journal.record_count, 0, 'Journal record count not reset')
+        self.assertEqual(list(self.journal.read_records()), [], 'Journal file not emptied')
+
+
+class TestDatabaseJournal(TempDirTestCase):
+    def setUp(self):
+        super().setUp()
+        self.db = Database()
+        self.db.save_state_to_file()
+        self.db.open_journal()
+
+    def tearDown(self):
+        self.db.close_journal()
+
+    def test_replay(self):
+        login_table = self.db.get_table_by_name('StudentLoginTable')
+        login_table.add_row(StudentLogin('test name', 'test pwd hash', 1))
+        login_table.add_row(StudentLogin('other name', 'test pwd hash', 2))
+        login_table.row_dict['test name'].student_id = 3
+        login_table.delete_row('other name')
+
+        # no tables are rewritten while the journal is open
+        self.db.save_state_to_file()
+        self.assertEqual(self.db.journal.record_count, 4, 'Changes not journaled')
+
+        new_db = Database()
+        new_db.load_state_from_file()
+        new_login_table = new_db.get_table_by_name('StudentLoginTable')
+        self.assertEqual(list(new_login_table.row_dict.keys()), ['test name'],
+                         'Journaled additions/deletions not replayed')
+        self.assertEqual(new_login_table.row_dict['test name'].student_id, 3,
+                         'Journaled field update not replayed')
+
+    def test_full_save_resets_journal(self):
+        login_table = self.db.get_table_by_name('StudentLoginTable')
+        login_table.add_row(StudentLogin('test name', 'test pwd hash', 1))
+
+        self.db.save_state_to_file(full_save=True)
+        self.assertEqual(self.db.journal.record_count, 0, 'Journal not emptied after full save')
+
+        new_db = Database()
+        new_db.load_state_from_file()
+        self.assertIn('test name', new_db.get_table_by_name('StudentLoginTable').row_dict,
+                      'Row missing from full save')
+
+    def test_replay_enrolment(self):
+        student_table = self.db.get_table_by_name('StudentTable')
+        student_table.add_row(Student(1, 12345, 'bronze', 10))
+        student_table.row_dict[1].complete_enrolment('Test Student', 'female', '2008/01/01', '1 Test Road',
+                                                     '0123456789', 'test@test.com', '0123456789', 'English')
+        self.assertEqual(len(list(Journal(self.db.get_journal_path()).read_records())), 2,
+                         'Enrolment not journaled as one record')
+        self.db.save_state_to_file()
+
+        new_db = Database()
+        new_db.load_state_from_file()
+        new_student = new_db.get_table_by_name('StudentTable').row_dict[1]
+        self.assertEqual((new_student.fullname, new_student.gender, new_student.primary_lang),
+                         ('Test Student', 'female', 'english'), 'Enrolment not replayed')
+
+        # the replayed tables are saved and loaded again as normal
+        new_db.save_state_to_file(full_save=True)
+        newer_db = Database()
+        newer_db.load_state_from_file()
+        self.assertEqual(newer_db.get_table_by_name('StudentTable').row_dict[1].email_primary, 'test@test.com',
+                         'Replayed enrolment not saved')
@@ -0,0 +1,65 @@
+import tkinter as tk
+from unittest import SkipTest, TestCase
+
+from ui import LazyTreeview
+
+
+class TestLazyTreeview(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        try:
+            cls.tk_root = tk.Tk()
+        except tk.TclError:  # e.g. no display
+            raise SkipTest('Tk could not be initialised')
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.tk_root.destroy()
+
+    def setUp(self):
+        self.built_rows = list()
+        self.tv = LazyTreeview(self.tk_root, page_size=20, columns=('double',), height=10)
+        self.tv.pack()
+
+    def tearDown(self):
+        self.tv.destroy()
+
+    def build_item(self, row: int):
+        self.built_rows.append(row)
+        return f'Row {row}', (row * 2,)
+
+    def test_pages(self):
+        self.tv.set_rows(range(1000), self.build_item)
+        self.tk_root.update()
+        self.assertEqual(self.tv.row_count(), 1000, 'Incorrect row count')
+        self.assertLess(len(self.tv.get_children()), 100, 'Items created for rows not scrolled to')
+        self.assertEqual(self.built_rows, list(range(len(self.built_rows))), 'Rows built out of order')
+        self.assertEqual(self.tv.item(self.tv.get_children()[3])['values'], [6], 'Incorrect item values')
+
+        num_items = len(self.tv.get_children())
+        self.tv.yview_moveto(1)
+        self.tk_root.update()
+        self.assertGreater(len(self.tv.get_children()), num_items, 'More items not created on scroll')
+
+        self.tv.set_rows([1, 2], self.build_item)
+        self.tk_root.update()
+        self.assertEqual([self.tv.item(item_id)['text'] for item_id in self.tv.get_children()], ['Row 1', 'Row 2'],
+                         'Items not replaced')
+
+    def test_filter(self):
+        self.tv.set_rows(range(100), self.build_item)
+        self.tk_root.update()
+        first_item_ids = self.tv.get_children()
+        num_built = len(self.built_rows)
+
+        self.tv.filter([15, 3, 7])
+        self.assertEqual([self.tv.item(item_id)['text'] for item_id in self.tv.get_children()],
+                         ['Row 15', 'Row 3', 'Row 7'], 'Incorrect filtered items')
+        self.assertEqual(self.tv.row_count(), 3, 'Incorrect filtered row count')
+        self.assertEqual(len(self.built_rows), num_built, 'Existing items rebuilt when filtering')
+
+        self.tv.filter(None)
+        self.tk_root.update()
+        self.assertEqual(self.tv.get_children()[:len(first_item_ids)], first_item_ids,
+                         'Original items not reattached in order')
+        self.assertEqual(len(self.built_rows), num_built, 'Existing items rebuilt when filter reset')
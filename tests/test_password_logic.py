@@ -1,3 +1,6 @@
+import binascii
+import datetime as dt
+import hashlib
 from unittest import TestCase
 
 from processes import password_logic
@@ -10,7 +13,8 @@ class PasswordTest(TestCase):
         for pwd_str in self.test_pwd_list:
             hash_str = password_logic.hash_pwd_str(pwd_str)
             self.assertIsInstance(hash_str, str, 'Hash not a string')
-            self.assertEqual(len(hash_str), 128, 'Hash incorrect length')
+            self.assertLessEqual(len(hash_str), 128, 'Hash too long to store')
+            self.assertTrue(hash_str.startswith(f'{password_logic.DEFAULT_HASH_ALGORITHM}$'), 'Hash not versioned')
 
         with self.assertRaises(password_logic.PasswordError):
             password_logic.hash_pwd_str('a' * 101)  # 101 is longer than the 100 pwd len limit
@@ -26,3 +30,82 @@ class PasswordTest(TestCase):
         for pwd_str, pwd_hash in zip(('test') * len(self.test_pwd_list), pwd_hash_list):
             self.assertFalse(password_logic.verify_pwd_str(pwd_str, pwd_hash),
                              "Password verification should have failed but didn't")
+
+    def test_hash_pwd_strs(self):
+        pwd_list = [f'password {i}' for i in range(7)]
+        progress = list()
+        pwd_hashes = password_logic.hash_pwd_strs(pwd_list, max_workers=2, chunk_size=2,
+                                                  progress_callback=lambda *args: progress.append(args))
+        self.assertEqual(len(pwd_hashes), len(pwd_list), 'Incorrect number of hashes')
+        for pwd_str, pwd_hash in zip(pwd_list, pwd_hashes):
+            self.assertTrue(password_logic.verify_pwd_str(pwd_str, pwd_hash), 'Hashes not in input order')
+        self.assertEqual(len(progress), 4, 'Progress not reported once per chunk')
+        self.assertEqual(progress[-1], (len(pwd_list), len(pwd_list)), 'Incorrect final progress')
+
+        with self.assertRaises(password_logic.PasswordError):
+            password_logic.hash_pwd_strs(['password', 'a' * 101])
+
+    def test_hash_formats(self):
+        # a hash in the original fixed format: 64 hex chars of salt then 100000 iterations of pbkdf2_sha256
+        salt = '0' * 64
+        legacy_hash = salt + binascii.hexlify(hashlib.pbkdf2_hmac('sha256', b'Password1', salt.encode('ascii'),
+                                                                  100000)).decode('ascii')
+        scrypt_hash = password_logic.hash_pwd_str('Password1', algorithm='scrypt')
+        for pwd_hash in (legacy_hash, scrypt_hash):
+            self.assertTrue(password_logic.verify_pwd_str('Password1', pwd_hash), 'Older format not verified')
+            self.assertFalse(password_logic.verify_pwd_str('password1', pwd_hash), 'Older format wrongly verified')
+            self.assertTrue(password_logic.needs_rehash(pwd_hash), 'Outdated hash not detected')
+
+            is_verified, new_hash = password_logic.verify_and_update_pwd_str('Password1', pwd_hash)
+            self.assertTrue(is_verified, 'Outdated hash not verified')
+            self.assertFalse(password_logic.needs_rehash(new_hash), 'Outdated hash not replaced')
+            self.assertTrue(password_logic.verify_pwd_str('Password1', new_hash), 'Incorrect replacement hash')
+
+        current_hash = password_logic.hash_pwd_str('Password1')
+        self.assertEqual(password_logic.verify_and_update_pwd_str('Password1', current_hash), (True, None),
+                         'Current hash unnecessarily replaced')
+        self.assertEqual(password_logic.verify_and_update_pwd_str('wrong', legacy_hash), (False, None),
+                         'Hash replaced after incorrect password')
+        self.assertFalse(password_logic.verify_pwd_str('Password1', 'not a hash'), 'Malformed hash verified')
+
+
+class TestSessionCache(TestCase):
+    def setUp(self):
+        self.now = dt.datetime(2020, 1, 1)
+        self.cache = password_logic.SessionCache(dt.timedelta(minutes=30), max_sessions=2, clock=lambda: self.now)
+
+    def test_verify(self):
+        self.assertFalse(self.cache.verify('Staff', 'user1', 'Password1', 'hash1'), 'Verified without a session')
+        self.cache.issue('Staff', 'user1', 'Password1', 'hash1')
+        self.assertTrue(self.cache.verify('Staff', 'user1', 'Password1', 'hash1'), 'Session not verified')
+        self.assertFalse(self.cache.verify('Staff', 'user1', 'Password2', 'hash1'), 'Incorrect password verified')
+        self.assertFalse(self.cache.verify('Staff', 'user1', 'Password1', 'hash2'),
+                         'Verified after password hash changed')
+        self.assertFalse(self.cache.verify('Staff', 'user2', 'Password1', 'hash1'), 'Session verified for another user')
+
+        self.now += dt.timedelta(minutes=30)
+        self.assertFalse(self.cache.verify('Staff', 'user1', 'Password1', 'hash1'), 'Expired session verified')
+        self.assertEqual(len(self.cache), 0, 'Expired session not removed')
+
+    def test_user_types(self):
+        self.cache.issue('Staff', 'user1', 'Password1', 'hash1')
+        self.assertFalse(self.cache.verify('Student', 'user1', 'Password1', 'hash1'),
+                         'Staff session verified for a student with the same username')
+        self.cache.issue('Student', 'user1', 'Password1', 'hash1')
+        self.cache.revoke('Student', 'user1')
+        self.assertTrue(self.cache.verify('Staff', 'user1', 'Password1', 'hash1'),
+                        'Staff session revoked with a student session')
+
+    def test_revoke_and_eviction(self):
+        for username in ('user1', 'user2'):
+            self.cache.issue('Staff', username, 'Password1', 'hash1')
+        self.cache.revoke('Staff', 'user1')
+        self.assertFalse(self.cache.verify('Staff', 'user1', 'Password1', 'hash1'), 'Revoked session verified')
+
+        self.cache.issue('Staff', 'user1', 'Password1', 'hash1')
+        self.cache.verify('Staff', 'user2', 'Password1', 'hash1')  # user1 is now least recently used
+        self.cache.issue('Staff', 'user3', 'Password1', 'hash1')
+        self.assertEqual(len(self.cache), 2, 'Too many sessions kept')
+        self.assertFalse(self.cache.verify('Staff', 'user1', 'Password1', 'hash1'),
+                         'Least recently used session not dropped')
+        self.assertTrue(self.cache.verify('Staff', 'user2', 'Password1', 'hash1'), 'Recently used session dropped')
@@ -0,0 +1,69 @@
+import datetime as dt
+from unittest import TestCase
+
+from data_tables.data_handling import Resource, ResourceTable, Section, SectionTable, Student, StudentTable
+from data_tables.progress_view import ProgressView
+
+
+def new_section(section_id: int, start_date: dt.datetime) -> Section:
+    return Section.from_field_values({'section_id': section_id, 'activity_start_date': start_date,
+                                      'activity_timescale': '90'})
+
+
+class TestProgressView(TestCase):
+    def setUp(self):
+        self.student_table = StudentTable([Student(1, 12345, 'gold', 10, is_approved=1)])
+        self.section_table = SectionTable()
+        self.resource_table = ResourceTable()
+        self.now = dt.datetime.now()
+        self.view = ProgressView(self.student_table, self.section_table, self.resource_table,
+                                 check_consistency=True, clock=lambda: self.now)
+
+    def tearDown(self):
+        self.view.close()
+
+    def test_incremental_updates(self):
+        self.assertEqual(self.view.get(1).summary, 'None started', 'Incorrect initial progress')
+
+        self.section_table.add_row(new_section(1, dt.datetime(2020, 1, 1)))
+        self.student_table.row_dict[1].vol_info_id = 1
+        self.assertEqual(self.view.get(1)[:2], ('Partially in progress', 'Needs report'),
+                         'Progress not updated after section created')
+
+        self.resource_table.add_row(Resource(1, 'uploads\\report.pdf', 0, 'section_evidence', 1, '2020/10/10'))
+        self.resource_table.row_dict[1].is_section_report = 1
+        self.assertEqual(self.view.get(1)[:2], ('Partially complete', 'Fully completed'),
+                         'Progress not updated after report marked')
+
+        self.resource_table.delete_row(1)
+        self.assertEqual(self.view.get(1).vol_status, 'Needs report', 'Progress not updated after report deleted')
+        self.assertEqual(self.view.find_inconsistencies(), dict(), 'View inconsistent with tables')
+
+    def test_in_progress_expiry(self):
+        start_date = dt.datetime.now()
+        self.section_table.add_row(new_section(1, start_date))
+        self.student_table.row_dict[1].skill_info_id = 1
+        progress = self.view.get(1)
+        self.assertEqual(progress.skill_status, 'In progress', 'Incorrect section status')
+        self.assertEqual(progress.expiry_date, start_date + dt.timedelta(days=90), 'Incorrect expiry date')
+        self.assertEqual(self.view.run_deadlines(), 0, 'Progress expired early')
+
+        self.now = start_date + dt.timedelta(days=91)
+        self.assertEqual(self.view.run_deadlines(), 1, 'Progress not expired once end date passed')
+        self.assertEqual(self.view.get(1).skill_status, 'Needs report', 'Status not recalculated after end date')
+        self.assertEqual(self.view.run_deadlines(), 0, 'Progress expired twice')
+
+    def test_shared_state_unchanged(self):
+        self.section_table.add_row(new_section(1, dt.datetime(2020, 1, 1)))
+        self.student_table.row_dict[1].vol_info_id = 1
+        self.resource_table.cache_section_status(self.section_table.row_dict[1], 'Needs report')
+        self.view.get(1)
+        self.view.find_inconsistencies()
+        self.assertEqual(self.resource_table.clock, dt.datetime.now, 'Clock of resource table replaced')
+        self.assertEqual(self.resource_table.get_cached_section_status(self.section_table.row_dict[1]),
+                         'Needs report', 'Section status cache of resource table cleared')
+
+    def test_find_inconsistencies(self):
+        self.view.get(1)
+        self.view._progress_dict[1] = self.view._progress_dict[1]._replace(summary='Fully complete')
+        self.assertEqual(list(self.view.find_inconsistencies()), [1], 'Inconsistent progress not found')
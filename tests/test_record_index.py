@@ -0,0 +1,54 @@
+import tempfile
+from pathlib import Path
+from unittest import TestCase
+
+from data_tables.data_handling import StudentLogin, StudentLoginTable, StudentTable
+from data_tables.journal import Journal
+from data_tables.record_index import TableFileIndex
+from data_tables.storage import FileBackend
+
+
+class TestTableFileIndex(TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.txt_path = Path(self.temp_dir.name) / 'StudentLoginTable.txt'
+        self.journal_path = Path(self.temp_dir.name) / 'Journal.txt'
+
+        test_table = StudentLoginTable([StudentLogin(f'name {i}', 'test pwd hash', i) for i in range(1, 6)])
+        test_table.save_to_file(self.txt_path.open('w+'))
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_get_row(self):
+        with TableFileIndex(StudentLoginTable, self.txt_path) as index:
+            self.assertEqual(len(index), 5, 'Not all rows indexed')
+            self.assertEqual(index.get_row('name 3').student_id, 3, 'Incorrect row fetched by key')
+            self.assertNotIn('name 6', index, 'Index contains a key not in the file')
+            with self.assertRaises(KeyError):
+                index.get_row('name 6')
+
+    def test_journal_overlay(self):
+        journal = Journal(self.journal_path)
+        journal.open()
+        test_table = StudentLoginTable()
+        test_table.storage = FileBackend(Path(self.temp_dir.name), journal=journal)
+        test_table.add_row(StudentLogin('name 1', 'test pwd hash', 10))  # replaces row in file
+        test_table.add_row(StudentLogin('name 6', 'test pwd hash', 6))
+        test_table.delete_row('name 6')
+        test_table.add_row(StudentLogin('name 7', 'test pwd hash', 7))
+        journal.append('del', 'StudentLoginTable', 'name 2')
+        journal.close()
+
+        with TableFileIndex(StudentLoginTable, self.txt_path, self.journal_path) as index:
+            self.assertEqual(index.get_row('name 1').student_id, 10, 'Journaled update not used')
+            self.assertNotIn('name 2', index, 'Journaled deletion not used')
+            self.assertNotIn('name 6', index, 'Journaled deletion not used')
+            self.assertEqual(sorted(index.keys()), ['name 1', 'name 3', 'name 4', 'name 5', 'name 7'],
+                             'Incorrect keys after journaled changes')
+
+    def test_empty_file(self):
+        empty_path = Path(self.temp_dir.name) / 'StudentTable.txt'
+        empty_path.touch()
+        with TableFileIndex(StudentTable, empty_path) as index:
+            self.assertEqual(len(index), 0, 'Empty file should have no rows')
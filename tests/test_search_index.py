@@ -0,0 +1,57 @@
+from unittest import TestCase
+
+from data_tables.data_handling import Student, StudentLogin, StudentLoginTable, StudentTable
+from data_tables.search_index import StudentSearchIndex
+
+
+def new_student(student_id: int, fullname: str = '', email: str = '') -> Student:
+    student_fields = {field_name: '' for field_name in Student.fields}
+    student_fields.update(student_id=student_id, centre_id=12345, award_level='gold', year_group='10',
+                          fullname=fullname, email_primary=email)
+    return Student.from_field_values(student_fields)
+
+
+class TestStudentSearchIndex(TestCase):
+    def setUp(self):
+        self.student_table = StudentTable([
+            new_student(1, 'Anna Smith', 'anna.smith@school.org'),
+            new_student(2, 'Smithy Jones', 'sj@school.org'),
+            new_student(3, 'Bob Goldsmith'),
+            new_student(4, 'Smith'),
+        ])
+        self.login_table = StudentLoginTable([StudentLogin('bobsmith', 'hash', 3), StudentLogin('annas', 'hash', 1)])
+        self.index = StudentSearchIndex(self.student_table, self.login_table)
+
+    def tearDown(self):
+        self.index.close()
+
+    def test_search(self):
+        self.assertEqual(self.index.search('Smith')[0], 4, 'Exact match not ranked first')
+        self.assertEqual(set(self.index.search('smith')[1:3]), {1, 2}, 'Word prefix matches not ranked next')
+        self.assertEqual(self.index.search('smith')[3:], [3], 'Substring match not ranked last')
+        self.assertEqual(self.index.search('gOLDs'), [3], 'Search not case insensitive')
+        self.assertEqual(self.index.search('bobs'), [3], 'Username not searched')
+        self.assertIn(self.index.search('school.org', limit=1)[0], (1, 2), 'Email not searched')
+        self.assertEqual(set(self.index.search('s')), {1, 2, 4}, 'Short query not matched to word starts')
+        self.assertEqual(self.index.search('mithsmith'), [], 'Query matched by n-grams alone')
+        self.assertEqual(len(self.index.search('smith', limit=2)), 2, 'Limit ignored')
+        self.assertEqual(self.index.search('smith', limit=1, student_ids={2, 3}), [2],
+                         'Students outside student_ids returned or counted towards limit')
+
+    def test_incremental_updates(self):
+        self.student_table.add_row(new_student(5, 'Zoe Quinn'))
+        self.assertEqual(self.index.search('quinn'), [5], 'New student not indexed')
+
+        self.student_table.row_dict[2].fullname = 'Jo Jones'  # e.g. after enrolment
+        self.assertNotIn(2, self.index.search('smithy'), 'Old name still indexed')
+        self.assertEqual(self.index.search('jo jones'), [2], 'Updated name not indexed')
+
+        self.login_table.add_row(StudentLogin('zquinn', 'hash', 5))
+        self.assertEqual(self.index.search('zqu'), [5], 'New login not indexed')
+        self.login_table.row_dict['zquinn'].student_id = 2
+        self.assertEqual(self.index.search('zqu'), [2], 'Login not moved to its new student')
+        self.login_table.delete_row('zquinn')
+        self.assertEqual(self.index.search('zqu'), [], 'Deleted login still indexed')
+
+        self.student_table.delete_row(5)
+        self.assertEqual(self.index.search('quinn'), [], 'Deleted student still indexed')
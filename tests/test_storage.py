@@ -0,0 +1,83 @@
+import tempfile
+from pathlib import Path
+from unittest import TestCase
+
+from data_tables.data_handling import Database, Student, StudentLogin, StudentLoginTable
+from data_tables.storage import SqliteBackend
+from tests.temp_dir_test_case import TempDirTestCase
+
+
+class TestSqliteBackend(TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.storage = SqliteBackend(Path(self.temp_dir.name))
+
+    def tearDown(self):
+        self.storage.close()
+        self.temp_dir.cleanup()
+
+    def test_put_get_delete(self):
+        self.storage.put(StudentLoginTable, [StudentLogin('name 1', 'hash 1', 1), StudentLogin('name 2', 'hash 2', 2)])
+        self.storage.put(StudentLoginTable, [StudentLogin('name 1', 'new hash', 1)])  # upsert of an existing row
+        self.assertEqual(self.storage.get(StudentLoginTable, 'name 1').password_hash, 'new hash', 'Row not upserted')
+        self.assertEqual(self.storage.get(StudentLoginTable, 'name 2').student_id, 2, 'Integer field not parsed')
+
+        self.storage.delete(StudentLoginTable, ['name 2'])
+        self.assertEqual([row.username for row in self.storage.iterate(StudentLoginTable)], ['name 1'],
+                         'Incorrect rows after delete')
+        with self.assertRaises(KeyError):
+            self.storage.get(StudentLoginTable, 'name 2')
+
+    def test_save_load(self):
+        table = StudentLoginTable([StudentLogin('name 1', 'hash 1', 1), StudentLogin('name\n2', 'hash 2', 2)])
+        self.storage.save(table)
+
+        loaded_table = StudentLoginTable()
+        self.storage.load(loaded_table)
+        self.assertEqual(list(loaded_table.row_dict), ['name 1', 'name\n2'], 'Saved rows not loaded')
+        self.assertEqual(loaded_table.lookup('student_id', 2)[0].username, 'name\n2', 'Loaded rows not indexed')
+
+    def test_wal_mode(self):
+        journal_mode, = self.storage.connection.execute('PRAGMA journal_mode').fetchone()
+        self.assertEqual(journal_mode, 'wal', 'Write-ahead logging not enabled')
+
+
+class TestSqliteDatabase(TempDirTestCase):
+    def setUp(self):
+        super().setUp()
+        self.db = Database(table_format='sqlite')
+        self.db.get_table_by_name('StudentLoginTable').add_row(StudentLogin('test name', 'test pwd hash', 1))
+        self.db.save_state_to_file()
+
+    def tearDown(self):
+        self.db.close_journal()
+
+    def test_missing_database(self):
+        db = Database(table_format='sqlite')
+        with self.assertRaises(FileNotFoundError):
+            db.load_state_from_file(suffix=' (missing)')
+        self.assertFalse((db.get_txt_database_dir() / 'Database (missing).sqlite3').exists(),
+                         'Empty database file created by failed load')
+
+    def test_changes_stored_as_they_happen(self):
+        self.db.load_state_from_file()
+        self.db.open_journal()
+        self.db.get_table_by_name('StudentTable').add_row(Student(1, 12345, 'gold', 10))
+        self.db.get_table_by_name('StudentLoginTable').row_dict['test name'].password_hash = 'new hash'
+
+        # read back with a second connection, as if the program had crashed without saving
+        new_db = Database(table_format='sqlite')
+        new_db.load_state_from_file()
+        self.assertEqual(new_db.get_table_by_name('StudentTable').row_dict[1].award_level, 'gold',
+                         'Added row not stored')
+        self.assertEqual(new_db.get_table_by_name('StudentLoginTable').row_dict['test name'].password_hash,
+                         'new hash', 'Updated row not stored')
+
+    def test_convert_from_txt(self):
+        txt_db = Database()
+        txt_db.get_table_by_name('StudentLoginTable').add_row(StudentLogin('txt name', 'test pwd hash', 2))
+        txt_db.convert_table_format('sqlite', suffix=' (converted)')
+
+        new_db = Database(table_format='sqlite')
+        new_db.load_state_from_file(suffix=' (converted)', verify=True)
+        self.assertIn('txt name', new_db.get_table_by_name('StudentLoginTable').row_dict, 'Converted row not loaded')
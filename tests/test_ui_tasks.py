@@ -0,0 +1,116 @@
+import heapq
+import itertools
+import threading
+import time
+from unittest import TestCase
+
+from processes import password_logic
+from ui import BackgroundTaskExecutor
+
+
+class FakeRoot:
+    """
+    Stands in for a tk.Tk() root (so no display is needed): after() calls are run by run_until()
+    on the calling thread, like the tkinter event loop.
+    """
+    def __init__(self):
+        self.cursor = ''
+        self._scheduled = list()  # heap of (due time, order, func)
+        self._order = itertools.count()
+
+    def after(self, ms: int, func) -> None:
+        heapq.heappush(self._scheduled, (time.perf_counter() + ms / 1000, next(self._order), func))
+
+    def config(self, cursor: str) -> None:
+        self.cursor = cursor
+
+    def run_until(self, condition, timeout: float = 10) -> None:
+        end_time = time.perf_counter() + timeout
+        while not condition():
+            if time.perf_counter() > end_time:
+                raise TimeoutError('Condition not met before timeout')
+            if self._scheduled and self._scheduled[0][0] <= time.perf_counter():
+                heapq.heappop(self._scheduled)[2]()
+            else:
+                time.sleep(0.001)
+
+
+class FakeButton:
+    def __init__(self):
+        self.states = list()
+
+    def state(self, state_spec) -> None:
+        self.states.extend(state_spec)
+
+
+class TestBackgroundTaskExecutor(TestCase):
+    def setUp(self):
+        self.root = FakeRoot()
+        self.executor = BackgroundTaskExecutor(self.root, max_workers=4, poll_interval=5)
+
+    def tearDown(self):
+        self.executor.shutdown(wait=True)
+
+    def test_concurrent_logins(self):
+        password_hash = password_logic.hash_pwd_str('Password1')
+        results, callback_thread_ids = list(), set()
+        button = FakeButton()
+
+        def on_done(is_verified):
+            results.append(is_verified)
+            callback_thread_ids.add(threading.get_ident())
+
+        num_logins = 8
+        for i in range(num_logins):
+            self.executor.submit(password_logic.verify_pwd_str, ('Password1', 'wrong')[i % 2], password_hash,
+                                 on_done=on_done, busy_widgets=(button,))
+        self.assertEqual(self.root.cursor, 'watch', 'Busy cursor not shown')
+
+        # a heartbeat scheduled every 10ms measures how long the event loop is blocked for
+        heartbeat_times = [time.perf_counter()]
+
+        def heartbeat():
+            heartbeat_times.append(time.perf_counter())
+            self.root.after(10, heartbeat)
+
+        self.root.after(10, heartbeat)
+        self.root.run_until(lambda: len(results) == num_logins)
+
+        self.assertEqual(sorted(results), [False] * 4 + [True] * 4, 'Incorrect verification results')
+        self.assertEqual(callback_thread_ids, {threading.get_ident()}, 'Callbacks not run on event loop thread')
+        self.assertEqual(self.root.cursor, '', 'Busy cursor not reset')
+        self.assertEqual(button.states.count('!disabled'), num_logins, 'Busy widget not re-enabled')
+        self.assertGreater(len(heartbeat_times), 3, 'Event loop did not run while verifying')
+        max_gap = max(later - earlier for earlier, later in zip(heartbeat_times, heartbeat_times[1:]))
+        self.assertLess(max_gap, 0.2, 'Event loop blocked while verifying')
+
+    def test_error_callback(self):
+        errors = list()
+        self.executor.submit(password_logic.hash_pwd_str, 'a' * 101, on_done=self.fail, on_error=errors.append)
+        self.root.run_until(lambda: errors)
+        self.assertIsInstance(errors[0], password_logic.PasswordError, 'Exception not passed to on_error')
+        self.assertEqual(self.executor.pending_count, 0, 'Failed task still pending')
+
+    def test_shutdown_cancels_pending(self):
+        release_event = threading.Event()
+        executor = BackgroundTaskExecutor(self.root, max_workers=1)
+        running_future = executor.submit(release_event.wait)
+        pending_future = executor.submit(release_event.wait)
+
+        executor.shutdown()
+        release_event.set()
+        running_future.result(timeout=5)
+        self.assertTrue(pending_future.cancelled(), 'Task not started before shutdown not cancelled')
+
+    def test_cancelled_task_widgets_enabled(self):
+        release_event = threading.Event()
+        executor = BackgroundTaskExecutor(self.root, max_workers=1)
+        self.addCleanup(executor.shutdown, wait=True)
+        self.addCleanup(release_event.set)
+        button = FakeButton()
+        executor.submit(release_event.wait)
+        pending_future = executor.submit(release_event.wait, on_done=self.fail, busy_widgets=(button,))
+
+        self.assertTrue(pending_future.cancel(), 'Task not started could not be cancelled')
+        self.root.run_until(lambda: executor.pending_count == 1)
+        self.assertEqual(button.states, ['disabled', '!disabled'], 'Busy widget not re-enabled after cancel')
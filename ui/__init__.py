@@ -1,12 +1,15 @@
 from __future__ import annotations  # needed for typing of classes not yet defined
 
 import logging
+import queue
 import tkinter as tk
 import tkinter.ttk as ttk
+from concurrent.futures import Future, ThreadPoolExecutor
 from tkinter import font
-from typing import Iterable, Type, Callable
+from typing import Any, Dict, Iterable, Optional, Sequence, Set, Tuple, Type, Callable
 
 from data_tables import data_handling
+from processes import password_logic
 
 # Font constants
 BODY_FONT = 'TkTextFont'
@@ -163,12 +166,204 @@ class PasswordEntryFrame(ttk.Frame):
         self.password_entry.config(show='\u2022')
 
 
+class LazyTreeview(ttk.Treeview):
+    def __init__(self, master: tk.Widget = None, page_size: int = 100, load_threshold: float = 0.1, **kwargs):
+        """
+        A flat ttk.Treeview for showing a (possibly very long) precomputed list of rows,
+        which only creates the items the user can scroll to:
+        set_rows() inserts the first page_size items and the next page is added
+        each time the user scrolls near the end of the items created so far.
+        Items are only built (see set_rows()) when they are inserted, so the cost of showing the rows
+        doesn't grow with the number of rows.
+
+        The rows shown can be filtered with filter(). Items already created are kept and only
+        detached/reattached, so filtering never rebuilds them.
+
+        Use .scroll_callback (e.g. a scrollbar's .set) instead of the yscrollcommand option.
+
+        :param page_size: number of items to insert at a time - should be more than the number of visible rows
+        :param load_threshold: fraction of the created items left below the view at which the next page is added
+        """
+        super().__init__(master, yscrollcommand=self._on_scroll, **kwargs)
+        self.page_size = page_size
+        self.load_threshold = load_threshold
+        self.scroll_callback: Optional[Callable[[str, str], Any]] = None
+
+        self._rows: Sequence = ()
+        self._build_item: Callable[[Any], Tuple[str, tuple]] = lambda row: (str(row), ())
+        self._item_ids: Dict[int, str] = dict()  # row index: id of the item created for it (attached or not)
+        self._shown_indexes: Sequence[int] = range(0)  # indexes of the rows to show, in order
+        self._num_attached = 0  # number of self._shown_indexes (from the start) with attached items
+        self._is_load_scheduled = False
+
+    def set_rows(self, rows: Sequence, build_item: Callable[[Any], Tuple[str, tuple]]) -> None:
+        """
+        Replaces every item with items for rows (in order). Only the first page is created immediately.
+
+        :param rows: sequence of row data (e.g. Row objects), each shown as one item
+        :param build_item: function returning the (text, values) of the item to show for a row
+        """
+        self.delete(*self._item_ids.values())  # including detached items
+        self._item_ids.clear()
+        self._rows = rows
+        self._build_item = build_item
+        self.filter(None)
+
+    def filter(self, row_indexes: Optional[Sequence[int]]) -> None:
+        """
+        Only shows the rows at row_indexes (in the order given), or every row if None.
+        Attached items are detached in one call, then only the first page of rows is attached -
+        reattaching items created before rather than building them again.
+        """
+        self.detach(*self.get_children())
+        self._shown_indexes = range(len(self._rows)) if row_indexes is None else row_indexes
+        self._num_attached = 0
+        self.yview_moveto(0)
+        self.load_more()
+
+    def row_count(self) -> int:
+        """
+        Returns the total number of rows shown (or to be shown once scrolled to), ignoring those filtered out
+        """
+        return len(self._shown_indexes)
+
+    def load_more(self) -> int:
+        """
+        Attaches items for the next page of rows, only creating those that don't already exist.
+        Returns the number of items attached.
+        """
+        self._is_load_scheduled = False
+        next_indexes = self._shown_indexes[self._num_attached:self._num_attached + self.page_size]
+        for row_index in next_indexes:
+            item_id = self._item_ids.get(row_index)
+            if item_id is None:
+                text, values = self._build_item(self._rows[row_index])
+                self._item_ids[row_index] = self.insert(parent='', index='end', text=text, values=values)
+            else:
+                self.move(item_id, '', 'end')  # reattaches the detached item
+        self._num_attached += len(next_indexes)
+        return len(next_indexes)
+
+    def _on_scroll(self, first: str, last: str) -> None:
+        """
+        Called by tkinter with the fractions of the items at the top and bottom of the view whenever it changes
+        """
+        if self.scroll_callback is not None:
+            self.scroll_callback(first, last)
+
+        if (float(last) >= 1 - self.load_threshold and self._num_attached < len(self._shown_indexes)
+                and not self._is_load_scheduled):
+            # can't insert items while tkinter is updating the view, so waits until it's finished
+            self._is_load_scheduled = True
+            self.after_idle(self.load_more)
+
+
+class BackgroundTaskExecutor:
+    def __init__(self, tk_root: tk.Misc, max_workers: int = 2, poll_interval: int = 20):
+        """
+        Runs slow functions (e.g. password hashing) on background threads so that the tkinter
+        event loop (and so the window) doesn't freeze while they run.
+        tkinter isn't thread-safe, so the results are passed back to the main thread through a queue
+        which is polled with tk_root.after() - on_done/on_error callbacks can therefore safely update widgets.
+        While any task is running, the mouse cursor is shown as busy.
+
+        :param tk_root: the tkinter root (or any widget) to schedule polling and set the cursor of
+        :param max_workers: maximum number of tasks to run at the same time
+        :param poll_interval: milliseconds between checks for finished tasks
+        """
+        self.tk_root = tk_root
+        self.poll_interval = poll_interval
+
+        self._thread_pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='background_task')
+        # (future, on_done, on_error, busy_widgets) of each finished task, put by the worker threads
+        self._finished_queue = queue.SimpleQueue()
+        self._pending_futures: Set[Future] = set()  # so they can be cancelled by shutdown()
+        self.pending_count = 0
+        self._is_polling = False
+
+    def __repr__(self) -> str:
+        return f'<BackgroundTaskExecutor object with {self.pending_count} pending task(s)>'
+
+    def submit(self, func: Callable, *args,
+               on_done: Callable[[Any], None] = None,
+               on_error: Callable[[BaseException], None] = None,
+               busy_widgets: Iterable[ttk.Widget] = ()) -> Future:
+        """
+        Runs func(*args) on a background thread. func must not use any tkinter widgets.
+        Once it finishes, on_done(return value) or on_error(raised exception) is called on the main thread.
+        If on_error isn't given, exceptions are logged and ignored.
+
+        :param busy_widgets: ttk widgets (e.g. the button which started the task)
+            to disable until the task finishes
+        """
+        busy_widgets = tuple(busy_widgets)
+        for widget in busy_widgets:
+            widget.state(['disabled'])
+
+        if self.pending_count == 0:
+            self.tk_root.config(cursor='watch')
+        self.pending_count += 1
+
+        future = self._thread_pool.submit(func, *args)
+        self._pending_futures.add(future)
+        # called on the worker thread (or immediately if already finished), so only uses the thread-safe queue
+        future.add_done_callback(lambda done_future: self._finished_queue.put(
+            (done_future, on_done, on_error, busy_widgets)))
+
+        if not self._is_polling:
+            self._is_polling = True
+            self.tk_root.after(self.poll_interval, self._poll)
+        return future
+
+    def shutdown(self, wait: bool = False) -> None:
+        """
+        Stops accepting tasks and cancels those which haven't started. Their callbacks are never called
+        but their busy widgets are re-enabled (if the event loop is still running).
+        """
+        # ThreadPoolExecutor.shutdown() can only cancel them itself from Python 3.9
+        for future in self._pending_futures:
+            future.cancel()
+        self._thread_pool.shutdown(wait=wait)
+
+    def _poll(self) -> None:
+        """
+        Calls the callbacks of every finished task on the main thread (scheduled with tk_root.after())
+        """
+        while True:
+            try:
+                future, on_done, on_error, busy_widgets = self._finished_queue.get_nowait()
+            except queue.Empty:
+                break
+
+            self.pending_count -= 1
+            self._pending_futures.discard(future)
+            for widget in busy_widgets:  # even if the task was cancelled
+                widget.state(['!disabled'])
+            if future.cancelled():
+                continue
+
+            exception = future.exception()
+            if exception is None:
+                if on_done is not None:
+                    on_done(future.result())
+            elif on_error is not None:
+                on_error(exception)
+            else:
+                logging.error(f'Unhandled exception in background task: {exception!r}')
+
+        if self.pending_count > 0:
+            self.tk_root.after(self.poll_interval, self._poll)
+        else:
+            self._is_polling = False
+            self.tk_root.config(cursor='')
+
+
 # 'Page-based approach' adapted from the framework provided at
 # https://pythonprogramming.net/change-show-new-frame-tkinter/ and
 # https://stackoverflow.com/questions/7546050/switch-between-two-frames-in-tkinter
 class RootWindow:
     def __init__(self, tk_root: tk.Tk, db: data_handling.Database,
-                 padx: int = 10, pady: int = 5):
+                 padx: int = 10, pady: int = 5, session_cache: password_logic.SessionCache = None):
         """
         A wrapper for a tkinter 'root' which also contains the frame
         holding the actual application.
@@ -177,6 +372,7 @@ class RootWindow:
         :param db: main database object to manipulate throughout application
         :param padx: padx value to use in all .grid() calls
         :param pady: pady value to use in all .grid() calls
+        :param session_cache: if given, used so that repeat logins skip full password verification
         """
         self.tk_root = tk_root
 
@@ -185,6 +381,9 @@ class RootWindow:
         self.db = db
         self.padx = padx
         self.pady = pady
+        # runs slow tasks (e.g. password hashing) without freezing the window
+        self.task_executor = BackgroundTaskExecutor(self.tk_root)
+        self.session_cache = session_cache
 
         self.main_frame = ttk.Frame(self.tk_root)
         self.main_frame.pack()
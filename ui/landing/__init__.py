@@ -2,6 +2,7 @@ import logging
 import tkinter as tk
 import tkinter.messagebox as msg
 import tkinter.ttk as ttk
+from typing import Optional
 
 import ui
 import ui.staff
@@ -117,34 +118,78 @@ class Login(ui.GenericPage):
 
         if input_username in login_table_obj.row_dict.keys():  # if username is valid, verifies pwd
             login_obj = login_table_obj.row_dict[input_username]
-            if password_logic.verify_pwd_str(input_password, login_obj.password_hash):
-                logging.info(f'Username "{input_username}" '
-                             f'successfully logged into {user_type.lower()} application')
-
-                if user_type == 'Staff':
-                    self.pager_frame.change_to_page(
-                        destination_page=ui.staff.StudentOverview,
-                        staff=login_obj
-                    )
-
-                elif user_type == 'Student':
-                    # noinspection PyUnresolvedReferences
-                    user_id = login_obj.student_id
-
-                    # noinspection PyTypeChecker
-                    # gets Student obj specified by logged in username
-                    logged_in_student: data_handling.Student = db.get_table_by_name('StudentTable').row_dict[user_id]
-
-                    # changes page appropriately, providing StudentAwardDashboard
-                    # frame with the Student obj information to update text
-                    self.pager_frame.change_to_page(
-                        destination_page=ui.student.StudentAwardDashboard,
-                        student=logged_in_student,
-                        username=input_username,
-                    )
-
-                return  # ends function so error below is not displayed
+            session_cache = self.pager_frame.master_root.session_cache
+            if session_cache is not None and session_cache.verify(user_type, input_username, input_password,
+                                                                  login_obj.password_hash):
+                logging.debug(f'Username "{input_username}" verified by an existing session')
+                self.finish_login(True, None, login_obj, input_username)
+                return
+
+            # verifying takes a noticeable time, so is done in the background to keep the window responsive
+            self.pager_frame.master_root.task_executor.submit(
+                password_logic.verify_and_update_pwd_str, input_password, login_obj.password_hash,
+                on_done=lambda result: self.finish_login(*result, login_obj, input_username, input_password),
+                busy_widgets=(self.login_button, self.back_button)
+            )
+            return
+
+        self.show_login_failed()
+
+    def finish_login(self, is_verified: bool, new_password_hash: Optional[str],
+                     login_obj: data_handling.Row, input_username: str, input_password: str = None):
+        """
+        Called once the password entered by the user has been verified by login().
+        Advances the application to the appropriate page if is_verified, otherwise shows an error.
+        If new_password_hash is given, the user's outdated password hash is replaced by it
+        (see password_logic.verify_and_update_pwd_str()).
+        If input_password is given (i.e. it was fully verified) and session caching is enabled,
+        a session is issued so that the user's next login is faster.
+        """
+        if self.pager_frame.current_page is not self:  # the user somehow left the page while it was being verified
+            logging.debug(f'Login of username "{input_username}" abandoned as the login page was left')
+            return
+
+        if not is_verified:
+            self.show_login_failed()
+            return
+
+        if new_password_hash is not None:
+            login_obj.password_hash = new_password_hash  # saved/journaled by the row's table
+            logging.info(f'Outdated password hash of username "{input_username}" replaced')
+
+        user_type = ('Staff', 'Student')[int(self.is_student)]
+        session_cache = self.pager_frame.master_root.session_cache
+        if session_cache is not None and input_password is not None:
+            session_cache.issue(user_type, input_username, input_password, login_obj.password_hash)
 
+        db = self.pager_frame.master_root.db
+        logging.info(f'Username "{input_username}" '
+                     f'successfully logged into {user_type.lower()} application')
+
+        if user_type == 'Staff':
+            self.pager_frame.change_to_page(
+                destination_page=ui.staff.StudentOverview,
+                staff=login_obj
+            )
+
+        elif user_type == 'Student':
+            # noinspection PyUnresolvedReferences
+            user_id = login_obj.student_id
+
+            # noinspection PyTypeChecker
+            # gets Student obj specified by logged in username
+            logged_in_student: data_handling.Student = db.get_table_by_name('StudentTable').row_dict[user_id]
+
+            # changes page appropriately, providing StudentAwardDashboard
+            # frame with the Student obj information to update text
+            self.pager_frame.change_to_page(
+                destination_page=ui.student.StudentAwardDashboard,
+                student=logged_in_student,
+                username=input_username,
+            )
+
+    @staticmethod
+    def show_login_failed():
         msg.showerror('Login Failed', 'Username and/or password incorrect.\n'
                                       'Make sure you are on the correct login page')
 
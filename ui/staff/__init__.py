@@ -2,13 +2,18 @@ import logging
 import tkinter as tk
 import tkinter.messagebox as msg
 import tkinter.ttk as ttk
-from typing import List
+from typing import Dict, List, Tuple
 
 import ui
 import ui.landing
 from data_tables import data_handling
+from data_tables.progress_view import ProgressView
+from data_tables.search_index import StudentSearchIndex
 from ui.staff import student_info, create_student
 
+# maximum number of students shown by a search (the best matches) so broad queries stay fast
+SEARCH_RESULT_LIMIT = 200
+
 
 class StudentOverview(ui.GenericPage):
     page_name = 'STAFF_USERNAME - Student Overview Dashboard'
@@ -24,7 +29,14 @@ class StudentOverview(ui.GenericPage):
         self.import_export_button.grid(row=0, column=1, padx=self.padx, pady=self.pady)
 
         self.logout_button = ttk.Button(self, text='Logout', command=self.logout)
-        self.logout_button.grid(row=0, column=2, columnspan=2, padx=self.padx, pady=self.pady)
+        if self.pager_frame.master_root.session_cache is None:
+            self.logout_button.grid(row=0, column=2, columnspan=2, padx=self.padx, pady=self.pady)
+        else:
+            # leaves the staff member's session so they can log back in quickly (see logout())
+            self.logout_button.grid(row=0, column=2, padx=self.padx, pady=self.pady)
+            self.switch_user_button = ttk.Button(self, text='Switch User',
+                                                 command=lambda: self.logout(keep_session=True))
+            self.switch_user_button.grid(row=0, column=3, padx=self.padx, pady=self.pady)
 
         self.select_level_label = ttk.Label(self, text='Select level:')
         self.select_level_label.grid(row=1, column=0, sticky='e', padx=(self.padx, 0), pady=self.pady)
@@ -60,11 +72,12 @@ class StudentOverview(ui.GenericPage):
         self.treeview_frame = ttk.Frame(self)
         self.treeview_frame.grid(row=3, column=0, columnspan=5, sticky='we', padx=self.padx, pady=(0, self.pady))
 
-        self.student_info_treeview = ttk.Treeview(self.treeview_frame,
-                                                  columns=(
-                                                      'progress_summary', 'volunteering',
-                                                      'skill', 'physical', 'expedition'
-                                                  ))
+        # only creates items as they're scrolled to so showing thousands of students doesn't freeze the window
+        self.student_info_treeview = ui.LazyTreeview(self.treeview_frame,
+                                                     columns=(
+                                                         'progress_summary', 'volunteering',
+                                                         'skill', 'physical', 'expedition'
+                                                     ))
 
         self.student_info_treeview.heading('#0', text='Fullname/Username', anchor='w')
         self.student_info_treeview.column('#0', anchor='w')
@@ -87,7 +100,7 @@ class StudentOverview(ui.GenericPage):
         self.treeview_scroll = ttk.Scrollbar(self.treeview_frame, orient='vertical',
                                              command=self.student_info_treeview.yview)
         self.treeview_scroll.pack(side='right', fill='y')
-        self.student_info_treeview['yscrollcommand'] = self.treeview_scroll.set
+        self.student_info_treeview.scroll_callback = self.treeview_scroll.set
         # == end table config ==
 
         self.add_student_button = ttk.Button(self, text='Create new student',
@@ -115,8 +128,16 @@ class StudentOverview(ui.GenericPage):
         self.section_table: data_handling.SectionTable = db.get_table_by_name('SectionTable')
         # noinspection PyTypeChecker
         self.resource_table: data_handling.ResourceTable = db.get_table_by_name('ResourceTable')
+        # every student's progress, kept up to date as the tables change rather than recalculated on every search
+        self.progress_view = ProgressView(self.student_table, self.section_table, self.resource_table)
+        # names, usernames and emails of every student, kept up to date for the search box
+        self.search_index = StudentSearchIndex(self.student_table, self.student_login_table)
+
+        # (row name, student) of every student at the selected level, in the order they're shown
+        self.overview_rows: List[Tuple[str, data_handling.Student]] = list()
+        self.overview_row_indexes: Dict[int, int] = dict()  # student_id: index of their row in self.overview_rows
 
-        self.DEFAULT_SEARCH_PLACEHOLDER = 'Search names...'
+        self.DEFAULT_SEARCH_PLACEHOLDER = 'Search students...'
 
     def update_attributes(self, staff: data_handling.Staff) -> None:
         # updates attributes with submitted parameters
@@ -129,12 +150,20 @@ class StudentOverview(ui.GenericPage):
 
         self.repopulate_treeview_table()
 
-    def logout(self):
+    def logout(self, keep_session: bool = False):
         """
         Logs the staff member out of the page - returns them to Welcome page
+
+        :param keep_session: if True (i.e. switching user), the staff member's login session is kept so that
+            logging in again before it expires skips the full password check (see password_logic.SessionCache)
         """
         logging.info(f'Username "{self.staff.username}" '
-                     f'successfully logged out of staff application')
+                     f'successfully {"switched user from" if keep_session else "logged out of"} staff application')
+
+        session_cache = self.pager_frame.master_root.session_cache
+        if session_cache is not None and not keep_session:
+            # so the next login on this terminal needs the full password check
+            session_cache.revoke('Staff', self.staff.username)
 
         self.pager_frame.change_to_page(ui.landing.Welcome)
 
@@ -153,54 +182,43 @@ class StudentOverview(ui.GenericPage):
         return True
 
     def search(self):
-        self.initial_search_text_clear()  # prevent searching with 'Search names...'
+        self.initial_search_text_clear()  # prevent searching with the placeholder text
         query = self.search_query_var.get().lower()
         self.initial_search_text_clear()
 
+        # indexes (within self.overview_rows) of the students to show - None shows them all
+        result_indexes = None
         if query:
-            # wouldbenice: use detach and reattach instead (see link)
-            #   https://stackoverflow.com/questions/44565358/how-to-filter-a-ttk-treeview-in-python/47055786#47055786
-            self.repopulate_treeview_table()  # reset table so all values are searched
-
-            tv = self.student_info_treeview
-            # gets user/full names of all items visible in current treeview
-            current_item_dict = [tv.item(tv_item_id)['text'] for tv_item_id in tv.get_children()]
-
-            # builds dictionary of item_text (username removed) to treeview item id
-            searchable_dict = dict()
-            for item_text in current_item_dict:
-                org_label = item_text
-                # Removes '(Username) ' prefix if it exists
-                if '(Username)' in item_text:
-                    item_text = item_text.split(') ', maxsplit=1)[-1]
-
-                searchable_dict[item_text.lower()] = org_label
-
-            # set of all name (item_text) strings where *query* is present
-            matches = {item_text for item_text in searchable_dict.keys() if query in item_text}
-            # list of all treeview item ids corresponding to matches found above
-            results = [org_label for (item_text, org_label) in searchable_dict.items() if item_text in matches]
-
-            if not results:  # if result list is empty
+            # searches the names, usernames and emails of the students at the current level (best matches first)
+            # using the index, then filters the treeview (detaching/reattaching its existing items) to them
+            # one more than the limit is found to tell whether any matches weren't shown
+            result_ids = self.search_index.search(query, limit=SEARCH_RESULT_LIMIT + 1,
+                                                  student_ids=self.overview_row_indexes)
+            result_indexes = [self.overview_row_indexes[student_id]
+                              for student_id in result_ids[:SEARCH_RESULT_LIMIT]]
+            if len(result_ids) > SEARCH_RESULT_LIMIT:
+                logging.debug(f'Search for "{query}" limited to the best {SEARCH_RESULT_LIMIT} matches')
+                msg.showinfo('Search', f'Only the best {SEARCH_RESULT_LIMIT} matches are shown - '
+                                       f'enter more of the search query to narrow them down.')
+
+            if not result_indexes:  # if result list is empty
                 msg.showwarning('Search', f'No results found for search query for current award level: "{query}"')
                 self.search_query_var.set(self.DEFAULT_SEARCH_PLACEHOLDER)
+                result_indexes = None
 
         else:
             msg.showinfo('Search', 'No search query entered.')
-            results = []
 
-        self.repopulate_treeview_table(item_list=results)
+        self.student_info_treeview.filter(result_indexes)
 
         # wouldbenice: add 'reset' link when searching to clear box and reset results
-        # wouldbenice: search by different fields other than key field
 
-    def repopulate_treeview_table(self, tk_event: tk.Event = None, item_list: List[str] = None) -> None:
+    def repopulate_treeview_table(self, tk_event: tk.Event = None) -> None:
         """
         Populates the treeview (student overview) table with student usernames and details etc.
+        of every student at the selected level (see search() to filter them).
 
         :param tk_event: An event object generated by tkinter - automatically passed to function if called by tkinter
-        :param item_list: A list of strings (username/fullname field val) specifying items to show in the treeview
-        :return:
         """
         tv = self.student_info_treeview
         # clears search box on award level change triggered by Combobox
@@ -211,39 +229,35 @@ class StudentOverview(ui.GenericPage):
 
         selected_level = self.level_selection_var.get()
 
-        tv.delete(*tv.get_children())  # clear tree before repopulating
-        for student in self.student_table.row_dict.values():
-            if student.award_level == selected_level.lower():
-                username = student.get_login_username(self.student_login_table)
-                username_display_str = f'(Username) {username}'
-                row_name = student.fullname if student.fullname else username_display_str
-
-                progress_summary = student.get_progress_summary(self.section_table, self.resource_table)
-
-                vol_status = student.get_section_obj('vol', self.section_table)
-                vol_status = vol_status.get_activity_status(self.resource_table) if vol_status else 'Not started'
-                skill_status = student.get_section_obj('skill', self.section_table)
-                skill_status = skill_status.get_activity_status(self.resource_table) if skill_status else 'Not started'
-                phys_status = student.get_section_obj('phys', self.section_table)
-                phys_status = phys_status.get_activity_status(self.resource_table) if phys_status else 'Not started'
-
-                # todo: expedition status text and column
-
-                should_insert_item = False
-                if item_list:
-                    if row_name in item_list:
-                        should_insert_item = True
-                else:
-                    should_insert_item = True
-
-                if should_insert_item:
-                    tv.insert(
-                        parent='', index='end', text=row_name,
-                        values=(progress_summary, vol_status, skill_status, phys_status, 'Not Implemented - Null',
-                                # dictionary with extra info not shown - used within code.
-                                # tkinter saves this dict using repr() so use eval() to get the dict back
-                                {'id': student.student_id, 'username': username, 'fullname': student.fullname})
-                    )
+        # only names (cheap) are found for every student - the rest of each row is built by build_treeview_item()
+        # when the treeview creates its item
+        self.overview_rows = list()
+        self.overview_row_indexes = dict()
+        for student in self.student_table.select(where={'award_level': selected_level.lower()}):
+            if student.fullname:
+                row_name = student.fullname
+            else:
+                row_name = f'(Username) {student.get_login_username(self.student_login_table)}'
+            self.overview_row_indexes[student.student_id] = len(self.overview_rows)
+            self.overview_rows.append((row_name, student))
+
+        self.progress_view.run_deadlines()  # once per render rather than checking the time for every student
+        tv.set_rows(self.overview_rows, self.build_treeview_item)
+
+    def build_treeview_item(self, overview_row: Tuple[str, data_handling.Student]) -> Tuple[str, tuple]:
+        """
+        Returns the (text, values) of the treeview item showing a row of self.overview_rows
+        """
+        row_name, student = overview_row
+        username = student.get_login_username(self.student_login_table)
+        progress_summary, vol_status, skill_status, phys_status, _ = self.progress_view.get(student.student_id)
+
+        # todo: expedition status text and column
+
+        return row_name, (progress_summary, vol_status, skill_status, phys_status, 'Not Implemented - Null',
+                          # dictionary with extra info not shown - used within code.
+                          # tkinter saves this dict using repr() so use eval() to get the dict back
+                          {'id': student.student_id, 'username': username, 'fullname': student.fullname})
 
     # noinspection PyUnusedLocal
     def on_double_click(self, tk_event: tk.Event):
@@ -91,17 +91,39 @@ class CreateStudent(ui.GenericPage):
             msg.showerror('Error with field data', 'Passwords do not match')
             return
 
+        try:
+            password_logic.enforce_strength(password)
+        except password_logic.PasswordError as e:
+            msg.showerror('Error with field data', str(e))
+            return
+
+        # hashing takes a noticeable time, so is done in the background to keep the window responsive
+        self.pager_frame.master_root.task_executor.submit(
+            password_logic.hash_pwd_str, password,
+            on_done=lambda password_hash: self.finish_creation(username, password_hash,
+                                                               centre_id, award_level, year_group),
+            on_error=lambda e: msg.showerror('Error with field data', str(e)),
+            busy_widgets=(self.create_button, self.back_button)
+        )
+
+    def finish_creation(self, username: str, password_hash: str, centre_id: str, award_level: str, year_group: str):
+        """
+        Called once the password entered by the user has been hashed by attempt_creation().
+        Creates the new student and their login from the entered details.
+        """
+        if self.pager_frame.current_page is not self:  # the user somehow left the page while it was being hashed
+            logging.debug(f'Creation of student with username "{username}" abandoned as the page was left')
+            return
+
         db = self.pager_frame.master_root.db
         student_table = db.get_table_by_name('StudentTable')
         new_id = student_table.get_new_key_id()
 
         try:
-            password_logic.enforce_strength(password)
-
             # create objects first before adding to tables to validate inputs
             new_login = data_handling.StudentLogin(
                 username=username,
-                password_hash=password_logic.hash_pwd_str(password),
+                password_hash=password_hash,
                 student_id=new_id
             )
 
@@ -117,9 +139,6 @@ class CreateStudent(ui.GenericPage):
 
             student_table.add_row(new_student)
 
-        except password_logic.PasswordError as e:
-            msg.showerror('Error with field data', str(e))
-
         except validation.ValidationError as e:
             msg.showerror('Error with field data', str(e))
 
@@ -226,13 +226,12 @@ class StudentInfo(ui.GenericPage):
                                                  padx=self.padx, pady=self.pady, sticky='we')
 
                         added_resource_list = list()
-                        for resource in self.resource_table.row_dict.values():
-                            is_section_evidence = resource.resource_type == 'section_evidence'
-                            is_id_match = resource.parent_link_id == section_obj.section_id
-                            if is_section_evidence and is_id_match:
-                                added_resource_list.append(
-                                    (resource.is_section_report, resource.file_path.name)
-                                )
+                        for resource in self.resource_table.select(where={
+                            'parent_link_id': section_obj.section_id, 'resource_type': 'section_evidence'
+                        }):
+                            added_resource_list.append(
+                                (resource.is_section_report, resource.file_path.name)
+                            )
 
                         resource_list_string = ' , '.join(
                             map(lambda x: f'{"📝" if x[0] else ""}"{x[1]}"', added_resource_list)
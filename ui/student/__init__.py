@@ -18,6 +18,12 @@ class StudentAwardDashboard(ui.GenericPage):
         self.logout_button = ttk.Button(self, text='Logout', command=self.logout)
         self.logout_button.pack(padx=self.padx, pady=self.pady)
 
+        if self.pager_frame.master_root.session_cache is not None:
+            # leaves the student's session so they can log back in quickly (see logout())
+            self.switch_user_button = ttk.Button(self, text='Switch User',
+                                                 command=lambda: self.logout(keep_session=True))
+            self.switch_user_button.pack(padx=self.padx, pady=self.pady)
+
         # all variable fields start with a null value before being updated
         # with student info when update_attributes is called
         self.welcome_text_var = tk.StringVar()
@@ -162,12 +168,20 @@ class StudentAwardDashboard(ui.GenericPage):
                      f'They have {"already" if self.student.fullname else "not yet"} '
                      f'completed their enrolment.')
 
-    def logout(self):
+    def logout(self, keep_session: bool = False):
         """
         Logs the student out of the page - returns them to Welcome page
+
+        :param keep_session: if True (i.e. switching user), the student's login session is kept so that
+            logging in again before it expires skips the full password check (see password_logic.SessionCache)
         """
         logging.info(f'Username "{self.student_username}" '
-                     f'successfully logged out of student application')
+                     f'successfully {"switched user from" if keep_session else "logged out of"} student application')
+
+        session_cache = self.pager_frame.master_root.session_cache
+        if session_cache is not None and not keep_session:
+            # so the next login on this terminal needs the full password check
+            session_cache.revoke('Student', self.student_username)
 
         self.pager_frame.change_to_page(ui.landing.Welcome)
 
@@ -256,35 +256,35 @@ class SectionInfo(ui.GenericPage):
         Freshly populates the GUI's evidence list from the resource table.
         DOES NOT clear the list beforehand - use self.clear_evidence_list()
         """
-        for resource in self.resource_table.row_dict.values():
-            is_section_evidence = resource.resource_type == 'section_evidence'
-            is_id_match = resource.parent_link_id == self.section_obj.section_id
-            if is_section_evidence and is_id_match:
-                row_id = resource.resource_id
-
-                evidence_row = ttk.Frame(self.evidence_list_frame)
-                evidence_row.grid(sticky='we')
-
-                short_name = shorten_string(resource.file_path.stem, 15) + ' ' + resource.file_path.suffix
-                name_label = ttk.Label(evidence_row, text=short_name, width=20, justify='right')
-                name_label.grid(row=0, column=0)
-                ui.create_tooltip(name_label, resource.file_path.name)  # adds full path to tooltip
-
-                date_added = datetime_logic.datetime_to_str(resource.date_uploaded)
-                date_label = ttk.Label(evidence_row,  # 📝 marks section report
-                                       text=f'Uploaded {date_added}{" 📝" if resource.is_section_report else ""}',
-                                       width=22)
-                date_label.grid(row=0, column=1, sticky='we')
-
-                delete_button = ttk.Button(evidence_row, text='❌', width=3,
-                                           command=lambda x=row_id: self.delete_evidence(x))
-                delete_button.grid(row=0, column=2)
-                ui.create_tooltip(delete_button, 'Delete evidence')
-
-                report_button = ttk.Button(evidence_row, text='📝', width=3,
-                                           command=lambda x=row_id: self.mark_evidence_as_report(x))
-                report_button.grid(row=0, column=3)
-                ui.create_tooltip(report_button, 'Mark as section report')
+        section_evidence = self.resource_table.select(where={
+            'parent_link_id': self.section_obj.section_id, 'resource_type': 'section_evidence'
+        })
+        for resource in section_evidence:
+            row_id = resource.resource_id
+
+            evidence_row = ttk.Frame(self.evidence_list_frame)
+            evidence_row.grid(sticky='we')
+
+            short_name = shorten_string(resource.file_path.stem, 15) + ' ' + resource.file_path.suffix
+            name_label = ttk.Label(evidence_row, text=short_name, width=20, justify='right')
+            name_label.grid(row=0, column=0)
+            ui.create_tooltip(name_label, resource.file_path.name)  # adds full path to tooltip
+
+            date_added = datetime_logic.datetime_to_str(resource.date_uploaded)
+            date_label = ttk.Label(evidence_row,  # 📝 marks section report
+                                   text=f'Uploaded {date_added}{" 📝" if resource.is_section_report else ""}',
+                                   width=22)
+            date_label.grid(row=0, column=1, sticky='we')
+
+            delete_button = ttk.Button(evidence_row, text='❌', width=3,
+                                       command=lambda x=row_id: self.delete_evidence(x))
+            delete_button.grid(row=0, column=2)
+            ui.create_tooltip(delete_button, 'Delete evidence')
+
+            report_button = ttk.Button(evidence_row, text='📝', width=3,
+                                       command=lambda x=row_id: self.mark_evidence_as_report(x))
+            report_button.grid(row=0, column=3)
+            ui.create_tooltip(report_button, 'Mark as section report')
 
     def update_date_validation(self) -> True:
         """